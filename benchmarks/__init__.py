@@ -0,0 +1,7 @@
+"""
+Benchmarks de rendimiento para FastAPI User Template.
+
+Se ejecutan como módulos desde la raíz del repositorio, por ejemplo::
+
+    PYTHONPATH=src python -m benchmarks.bench_event_loop
+"""
@@ -0,0 +1,102 @@
+"""
+Throughput de lecturas: sesión síncrona en pool de hilos vs AsyncSession.
+
+Lanza ``--concurrency`` tareas que hacen ``--lookups`` consultas
+``get_user`` cada una (una sesión por consulta), primero con ``crud`` + ``run_in_db_thread`` (modo
+síncrono) y después con ``crud_async`` sobre el driver asíncrono
+equivalente (``sqlite+aiosqlite`` o ``postgresql+asyncpg``).
+
+Uso::
+
+    PYTHONPATH=src python -m benchmarks.bench_db_modes --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from .common import reset_database, setup_environment
+
+setup_environment()
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from fastapiusertemplate import crud, crud_async, schema  # noqa: E402
+from fastapiusertemplate.concurrency import run_in_db_thread  # noqa: E402
+from fastapiusertemplate.database import (  # noqa: E402
+    DATABASE_URL,
+    SessionLocal,
+    to_async_url,
+)
+
+
+def seed():
+    reset_database()
+    with SessionLocal() as db:
+        user = crud.create_user(
+            db,
+            schema.CreateUser(email="b@example.com", username="b", password="x"),
+            hashed_password="not-a-real-hash",
+        )
+        return user.id
+
+
+def sync_lookup(user_id):
+    with SessionLocal() as db:
+        return crud.get_user(db, user_id)
+
+
+async def sync_worker(user_id, lookups):
+    for _ in range(lookups):
+        await run_in_db_thread(sync_lookup, user_id)
+
+
+async def async_worker(session_factory, user_id, lookups):
+    for _ in range(lookups):
+        async with session_factory() as db:
+            await crud_async.get_user(db, user_id)
+
+
+async def measure(make_worker, concurrency, lookups):
+    start = time.perf_counter()
+    await asyncio.gather(*(make_worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 3),
+        "queries_per_second": round(concurrency * lookups / elapsed, 1),
+    }
+
+
+async def run(args):
+    user_id = seed()
+    sync_result = await measure(
+        lambda: sync_worker(user_id, args.lookups), args.concurrency, args.lookups
+    )
+
+    async_engine = create_async_engine(to_async_url(DATABASE_URL))
+    session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+    async_result = await measure(
+        lambda: async_worker(session_factory, user_id, args.lookups),
+        args.concurrency,
+        args.lookups,
+    )
+    await async_engine.dispose()
+    return {
+        "concurrency": args.concurrency,
+        "lookups_per_task": args.lookups,
+        "sync_threadpool": sync_result,
+        "async_session": async_result,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--lookups", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
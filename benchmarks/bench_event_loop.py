@@ -0,0 +1,94 @@
+"""
+Latencia de ``/me`` mientras ``/login`` está saturado.
+
+Mide la latencia de ``/me`` en reposo y con ``--login-concurrency`` clientes
+haciendo login en bucle. Si el trabajo de bcrypt y de la base de datos se
+ejecuta fuera del event loop, ambas distribuciones deben ser parecidas.
+
+Uso::
+
+    PYTHONPATH=src python -m benchmarks.bench_event_loop --login-concurrency 16
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from .common import reset_database, setup_environment, summarize
+
+setup_environment()
+
+import httpx  # noqa: E402
+
+from fastapiusertemplate.main import app  # noqa: E402
+
+USER = {"email": "bench@example.com", "username": "bench", "password": "benchpassword"}
+LOGIN = {"username": USER["username"], "password": USER["password"]}
+
+
+async def probe_me(client, samples, interval):
+    latencies = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        response = await client.get("/me")
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def login_loop(client, stop):
+    count = 0
+    while not stop.is_set():
+        response = await client.post("/login", json=LOGIN)
+        assert response.status_code == 200, response.text
+        count += 1
+    return count
+
+
+async def run(args):
+    reset_database()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as me_client:
+        assert (await me_client.post("/register", json=USER)).status_code == 200
+        assert (await me_client.post("/login", json=LOGIN)).status_code == 200
+
+        idle = await probe_me(me_client, args.samples, args.interval)
+
+        stop = asyncio.Event()
+        clients = [
+            httpx.AsyncClient(transport=transport, base_url="http://bench")
+            for _ in range(args.login_concurrency)
+        ]
+        started = time.perf_counter()
+        loops = [asyncio.create_task(login_loop(c, stop)) for c in clients]
+        await asyncio.sleep(0.2)
+        loaded = await probe_me(me_client, args.samples, args.interval)
+        stop.set()
+        logins = sum(await asyncio.gather(*loops))
+        elapsed = time.perf_counter() - started
+        for c in clients:
+            await c.aclose()
+
+    return {
+        "me_idle": summarize(idle),
+        "me_under_login_load": summarize(loaded),
+        "login_concurrency": args.login_concurrency,
+        "logins_per_second": round(logins / elapsed, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--login-concurrency", type=int, default=8)
+    parser.add_argument("--samples", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=0.01)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Coste de registrar métricas en el camino caliente.
+
+Mide el coste por operación de ``Counter.inc`` y ``Histogram.observe`` y el
+sobrecoste de ``MetricsMiddleware`` por petición (sobre una app ASGI vacía,
+para aislarlo del resto del trabajo de una ruta como ``/me``).
+
+Uso::
+
+    PYTHONPATH=src python -m benchmarks.bench_metrics --iterations 200000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from .common import setup_environment
+
+setup_environment()
+
+from fastapiusertemplate.metrics import (  # noqa: E402
+    Counter,
+    Histogram,
+    MetricsMiddleware,
+    Registry,
+)
+
+
+class _Route:
+    path = "/me"
+
+
+async def _empty_app(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _noop_send(message):
+    pass
+
+
+async def _time_requests(app, iterations):
+    scope = {"type": "http", "method": "GET", "path": "/me"}
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app(dict(scope), None, _noop_send)
+    return time.perf_counter() - start
+
+
+def _ns_per_op(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return round((time.perf_counter() - start) / iterations * 1e9, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    registry = Registry()
+    counter = Counter("bench_total", "Bench", ("route",), registry=registry)
+    histogram = Histogram("bench_seconds", "Bench", ("route",), registry=registry)
+
+    bare = asyncio.run(_time_requests(_empty_app, args.iterations))
+    instrumented = asyncio.run(
+        _time_requests(MetricsMiddleware(_empty_app), args.iterations)
+    )
+
+    print(
+        json.dumps(
+            {
+                "iterations": args.iterations,
+                "counter_inc_ns": _ns_per_op(
+                    lambda: counter.labels("/me").inc(), args.iterations
+                ),
+                "histogram_observe_ns": _ns_per_op(
+                    lambda: histogram.labels("/me").observe(0.003), args.iterations
+                ),
+                "middleware_overhead_us_per_request": round(
+                    (instrumented - bare) / args.iterations * 1e6, 3
+                ),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
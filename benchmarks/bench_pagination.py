@@ -0,0 +1,95 @@
+"""
+Latencia de la página N de ``GET /users``: OFFSET vs cursor (keyset).
+
+Inserta ``--rows`` usuarios y mide ``crud.get_users`` a distintas
+profundidades con ``skip`` (OFFSET) y con ``after`` (cursor). Con OFFSET la
+latencia crece linealmente con la profundidad; con cursor se mantiene plana.
+
+Uso::
+
+    PYTHONPATH=src python -m benchmarks.bench_pagination --rows 200000
+"""
+
+import argparse
+import json
+import time
+import uuid
+
+from .common import reset_database, setup_environment, summarize
+
+setup_environment()
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from fastapiusertemplate import crud, models  # noqa: E402
+from fastapiusertemplate.database import SessionLocal  # noqa: E402
+
+
+def seed(rows, batch=10_000):
+    reset_database()
+    with SessionLocal() as db:
+        for start in range(0, rows, batch):
+            db.execute(
+                insert(models.User),
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "email": f"user{i}@example.com",
+                        "username": f"user{i}",
+                        "hashed_password": "not-a-real-hash",
+                    }
+                    for i in range(start, min(start + batch, rows))
+                ],
+            )
+        db.commit()
+
+
+def time_page(fetch, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fetch()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)["p50_ms"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    pages = args.rows // args.limit
+    depths = sorted({1, pages // 100, pages // 10, pages // 2, pages - 1} - {0})
+
+    results = []
+    with SessionLocal() as db:
+        for page in depths:
+            skip = page * args.limit
+            after = db.scalar(
+                select(models.User.id).order_by(models.User.id).offset(skip - 1)
+            )
+            results.append(
+                {
+                    "page": page,
+                    "offset_p50_ms": time_page(
+                        lambda: crud.get_users(db, skip=skip, limit=args.limit),
+                        args.repeats,
+                    ),
+                    "cursor_p50_ms": time_page(
+                        lambda: crud.get_users(db, after=after, limit=args.limit),
+                        args.repeats,
+                    ),
+                }
+            )
+            db.expunge_all()
+
+    print(
+        json.dumps({"rows": args.rows, "limit": args.limit, "pages": results}, indent=2)
+    )
+
+
+if __name__ == "__main__":
+    main()
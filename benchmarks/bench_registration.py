@@ -0,0 +1,75 @@
+"""
+Latencia de registro en BD: pre-comprobaciones vs ``INSERT ... RETURNING``.
+
+Compara, con la contraseña ya hasheada para aislar el coste de la BD:
+
+- ``legacy``: ``get_user_by_email`` + ``get_user_by_username`` + INSERT +
+  ``commit`` + ``refresh`` (cuatro round trips).
+- ``insert_returning``: ``crud.create_user`` actual (un round trip más el
+  commit), con la unicidad garantizada por las restricciones de la BD.
+
+Uso::
+
+    PYTHONPATH=src python -m benchmarks.bench_registration --users 2000
+"""
+
+import argparse
+import json
+import time
+
+from .common import reset_database, setup_environment, summarize
+
+setup_environment()
+
+from fastapiusertemplate import crud, models, schema  # noqa: E402
+from fastapiusertemplate.database import SessionLocal  # noqa: E402
+
+HASHED = "not-a-real-hash"
+
+
+def legacy_create_user(db, user):
+    if crud.get_user_by_email(db, user.email):
+        raise crud.DuplicateUserError("email")
+    if crud.get_user_by_username(db, user.username):
+        raise crud.DuplicateUserError("username")
+    db_user = models.User(
+        email=user.email, username=user.username, hashed_password=HASHED
+    )
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
+
+def new_create_user(db, user):
+    return crud.create_user(db, user, HASHED)
+
+
+def measure(create, prefix, count):
+    samples = []
+    with SessionLocal() as db:
+        for i in range(count):
+            user = schema.CreateUser(
+                email=f"{prefix}{i}@example.com", username=f"{prefix}{i}", password="x"
+            )
+            start = time.perf_counter()
+            create(db, user)
+            samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    reset_database()
+    results = {
+        "legacy": measure(legacy_create_user, "legacy", args.users),
+        "insert_returning": measure(new_create_user, "new", args.users),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
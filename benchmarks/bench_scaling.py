@@ -0,0 +1,187 @@
+"""
+Escalado por núcleos: RPS del servidor de producción según el número de workers.
+
+Para cada valor de ``--workers`` lanza ``fastapiusertemplate.serve`` en un
+proceso aparte (HTTP real sobre localhost), espera a ``/ready`` y genera carga
+durante ``--seconds`` con ``--clients`` procesos, cada uno con
+``--concurrency`` conexiones keep-alive. Por defecto consulta
+``GET /users/{id}`` de un usuario sembrado (servido desde la caché de cada
+worker), así que mide sobre todo CPU de la aplicación y no de la BD.
+
+El generador de carga comparte las CPUs con el servidor: en una máquina con
+pocos núcleos la aceleración medida es una cota inferior.
+
+Uso::
+
+    PYTHONPATH=src python -m benchmarks.bench_scaling --workers 1,2,4 --seconds 10
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+from .common import reset_database, setup_environment, summarize
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed():
+    from fastapiusertemplate import crud, schema
+    from fastapiusertemplate.database import SessionLocal
+
+    reset_database()
+    with SessionLocal() as db:
+        user = crud.create_user(
+            db,
+            schema.CreateUser(email="s@example.com", username="s", password="x"),
+            hashed_password="not-a-real-hash",
+        )
+        return str(user.id)
+
+
+def start_server(workers: int, port: int):
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "fastapiusertemplate.serve",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+        ],
+        env=os.environ.copy(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    wait_until_ready(port, workers)
+    return server
+
+
+def wait_until_ready(port: int, workers: int, timeout: float = 60):
+    """Esperar varias respuestas 200 seguidas de /ready (una por worker)"""
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    ready = 0
+    while ready < workers * 2:
+        if time.monotonic() > deadline:
+            raise RuntimeError("server did not become ready")
+        try:
+            # Conexión nueva en cada intento para repartirlas entre workers
+            response = httpx.get(f"http://127.0.0.1:{port}/ready", timeout=2)
+            ready = ready + 1 if response.status_code == 200 else 0
+        except httpx.TransportError:
+            ready = 0
+        time.sleep(0.1)
+
+
+def stop_server(server):
+    server.send_signal(signal.SIGTERM)
+    server.wait(timeout=60)
+
+
+async def _client(url: str, concurrency: int, seconds: float):
+    import httpx
+
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def _run_client(args):
+    return asyncio.run(_client(*args))
+
+
+def measure(url: str, clients: int, concurrency: int, seconds: float) -> dict:
+    with multiprocessing.get_context("spawn").Pool(clients) as pool:
+        results = pool.map(_run_client, [(url, concurrency, seconds)] * clients)
+    latencies = [sample for samples, _ in results for sample in samples]
+    return {
+        "rps": round(len(latencies) / seconds, 1),
+        "errors": sum(errors for _, errors in results),
+        **summarize(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", default=None, help="p. ej. 1,2,4")
+    parser.add_argument("--clients", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--path", default="/users/{user_id}")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    worker_counts = (
+        [int(n) for n in args.workers.split(",")]
+        if args.workers
+        else sorted({1, *(2**i for i in range(cpus.bit_length()) if 2**i <= cpus)})
+    )
+
+    setup_environment()
+    user_id = seed()
+    results = {}
+    for workers in worker_counts:
+        port = _free_port()
+        server = start_server(workers, port)
+        try:
+            url = f"http://127.0.0.1:{port}" + args.path.format(user_id=user_id)
+            results[str(workers)] = measure(
+                url, args.clients, args.concurrency, args.seconds
+            )
+        finally:
+            stop_server(server)
+
+    base_rps = results[str(worker_counts[0])]["rps"] or 1
+    for result in results.values():
+        result["speedup"] = round(result["rps"] / base_rps, 2)
+    print(
+        json.dumps(
+            {
+                "cpus": cpus,
+                "clients": args.clients,
+                "concurrency": args.concurrency,
+                "seconds": args.seconds,
+                "path": args.path,
+                "workers": results,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Coste por página de ``GET /users``: response_model de FastAPI vs ruta rápida.
+
+Para una página de ``--limit`` usuarios mide, en microsegundos por página:
+
+- ``fetch``: entidades ORM completas vs filas de columnas (``crud.get_users``).
+- ``serialize``: el camino de FastAPI para ``response_model`` (validación,
+  conversión a tipos JSON y ``JSONResponse``/``ORJSONResponse``) vs
+  ``responses.user_page_response`` (adaptadores precompilados y
+  ``dump_json`` de pydantic-core).
+- ``total``: consulta más serialización, antes y después.
+
+Uso::
+
+    PYTHONPATH=src python -m benchmarks.bench_serialization --limit 100
+"""
+
+import argparse
+import json
+import time
+import uuid
+
+from .common import reset_database, setup_environment
+
+setup_environment()
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from fastapiusertemplate import crud, models, responses, schema  # noqa: E402
+from fastapiusertemplate.database import SessionLocal  # noqa: E402
+
+PAGE_FIELD = create_model_field(
+    name="Response_read_users", type_=schema.UserPage, mode="serialization"
+)
+
+
+def seed(rows):
+    reset_database()
+    with SessionLocal() as db:
+        db.execute(
+            insert(models.User),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "email": f"user{i}@example.com",
+                    "username": f"user{i}",
+                    "hashed_password": "$2b$12$" + "x" * 53,
+                }
+                for i in range(rows)
+            ],
+        )
+        db.commit()
+
+
+def fetch_orm(limit):
+    with SessionLocal() as db:
+        return db.scalars(
+            select(models.User).order_by(models.User.id).limit(limit)
+        ).all()
+
+
+def fetch_rows(limit):
+    with SessionLocal() as db:
+        return crud.get_users(db, limit=limit)
+
+
+def response_model_body(users, response_class=JSONResponse) -> bytes:
+    """Lo que hace FastAPI con un valor devuelto y ``response_model``"""
+    # Con rutas async la validación no sale del loop: la corrutina termina
+    # sin suspenderse y se ejecuta sin crear un event loop
+    coro = serialize_response(
+        field=PAGE_FIELD,
+        response_content={"items": users, "next_cursor": None},
+        is_coroutine=True,
+    )
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return response_class(done.value).body
+    raise RuntimeError("serialize_response suspended")
+
+
+def fast_body(rows) -> bytes:
+    return responses.user_page_response(rows, None).body
+
+
+def per_page_us(func, repeats):
+    func()  # calentamiento
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return round((time.perf_counter() - start) / repeats * 1e6, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=500)
+    args = parser.parse_args()
+
+    seed(args.limit)
+    orm_users = fetch_orm(args.limit)
+    rows = fetch_rows(args.limit)
+    assert json.loads(response_model_body(orm_users)) == json.loads(fast_body(rows))
+
+    results = {
+        "limit": args.limit,
+        "fetch": {
+            "orm_entities_us": per_page_us(lambda: fetch_orm(args.limit), args.repeats),
+            "column_rows_us": per_page_us(lambda: fetch_rows(args.limit), args.repeats),
+        },
+        "serialize": {
+            "response_model_json_us": per_page_us(
+                lambda: response_model_body(orm_users), args.repeats
+            ),
+            "response_model_orjson_us": per_page_us(
+                lambda: response_model_body(orm_users, ORJSONResponse), args.repeats
+            ),
+            "type_adapter_dump_json_us": per_page_us(
+                lambda: fast_body(rows), args.repeats
+            ),
+        },
+        "total": {
+            "before_us": per_page_us(
+                lambda: response_model_body(fetch_orm(args.limit)), args.repeats
+            ),
+            "after_us": per_page_us(
+                lambda: fast_body(fetch_rows(args.limit)), args.repeats
+            ),
+        },
+    }
+    results["total"]["speedup"] = round(
+        results["total"]["before_us"] / results["total"]["after_us"], 2
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Tiempo de arranque: importación de la aplicación y lifespan hasta estar listo.
+
+Cada ejecución es un proceso nuevo (como un worker recién lanzado) que mide:
+
+- ``import_ms``: ``import fastapiusertemplate.main``.
+- ``startup_ms``: el ``lifespan`` hasta que ``/ready`` respondería 200
+  (precalentamiento del pool y del backend de hashing).
+- ``import_to_ready_ms``: desde la importación del paquete hasta estar listo.
+
+Uso::
+
+    PYTHONPATH=src python -m benchmarks.bench_startup --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from .common import reset_database, setup_environment
+
+CHILD = """
+import asyncio, json, time
+start = time.perf_counter()
+from fastapiusertemplate import startup
+from fastapiusertemplate.main import app
+imported = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(boot())
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "import_to_ready_ms": startup.state.import_to_ready * 1000,
+}))
+"""
+
+
+def run_once():
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    setup_environment()
+    reset_database()
+    samples = [run_once() for _ in range(args.runs)]
+    print(
+        json.dumps(
+            {
+                "runs": args.runs,
+                **{
+                    key: {
+                        "median": round(statistics.median(s[key] for s in samples), 1),
+                        "max": round(max(s[key] for s in samples), 1),
+                    }
+                    for key in samples[0]
+                },
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Coste de ``auth.verify_token`` con y sin caché de tokens verificados.
+
+Genera ``--tokens`` access tokens distintos y una secuencia de
+``--requests`` verificaciones con reutilización tipo Zipf (unos pocos
+usuarios muy activos y una cola larga), que es como se presentan las cookies
+durante su vida útil.
+
+Uso::
+
+    PYTHONPATH=src python -m benchmarks.bench_verify_token --tokens 1000
+"""
+
+import argparse
+import json
+import random
+import time
+import uuid
+
+from .common import setup_environment
+
+setup_environment()
+
+from fastapiusertemplate import auth  # noqa: E402
+from fastapiusertemplate.cache import TTLLRUCache, token_cache  # noqa: E402
+
+
+def run_sequence(sequence):
+    start = time.perf_counter()
+    for token in sequence:
+        auth.verify_token(token)
+    elapsed = time.perf_counter() - start
+    return {
+        "total_seconds": round(elapsed, 4),
+        "us_per_verify": round(elapsed / len(sequence) * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--zipf", type=float, default=1.1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tokens = [
+        auth.create_access_token({"sub": str(uuid.uuid4())}) for _ in range(args.tokens)
+    ]
+    weights = [1 / (rank**args.zipf) for rank in range(1, args.tokens + 1)]
+    sequence = rng.choices(tokens, weights=weights, k=args.requests)
+
+    backend = token_cache.backend
+    token_cache.backend = None
+    uncached = run_sequence(sequence)
+
+    token_cache.backend = backend or TTLLRUCache()
+    token_cache.clear()
+    token_cache.hits = token_cache.misses = 0
+    cached = run_sequence(sequence)
+
+    print(
+        json.dumps(
+            {
+                "distinct_tokens": args.tokens,
+                "requests": args.requests,
+                "without_cache": uncached,
+                "with_cache": cached,
+                "cache": token_cache.stats(),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Utilidades compartidas por los benchmarks.
+
+``setup_environment`` debe llamarse antes de importar ``fastapiusertemplate``
+para que la aplicación use una base de datos SQLite temporal si no hay
+``DATABASE_URL`` configurada.
+"""
+
+import os
+import statistics
+import tempfile
+
+
+def setup_environment():
+    """Configurar variables de entorno por defecto para los benchmarks."""
+    if not os.getenv("DATABASE_URL"):
+        path = os.path.join(
+            tempfile.mkdtemp(prefix="fastapiusertemplate-bench-"), "bench.db"
+        )
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-at-least-32-bytes")
+    os.environ.setdefault("ALGORITHM", "HS256")
+
+
+def percentile(samples, pct):
+    """Percentil ``pct`` (0-100) por interpolación lineal."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+def summarize(samples):
+    """Resumen de latencias en milisegundos."""
+    ms = [s * 1000 for s in samples]
+    return {
+        "count": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(max(ms), 3) if ms else 0.0,
+    }
+
+
+def reset_database():
+    """Recrear las tablas de la base de datos de benchmark."""
+    from fastapiusertemplate.database import engine
+    from fastapiusertemplate.models import Base
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
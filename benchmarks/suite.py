@@ -0,0 +1,299 @@
+"""
+Suite de benchmarks reproducible: micro-benchmarks y carga HTTP en proceso.
+
+Micro-benchmarks (operaciones por segundo):
+
+- ``create_access_token``: firma de un access token
+- ``verify_token``: verificación sin caché de tokens y con caché
+- ``verify_password``: bcrypt con el coste de ``--bcrypt-rounds``
+- ``user_serialization``: ORM -> ``schema.User`` -> JSON
+
+Carga: un generador en proceso (``httpx.ASGITransport``, sin red) envía
+peticiones a ``/register``, ``/login``, ``/me``, ``/refresh`` y ``/users``
+con ``--concurrency`` clientes concurrentes y mide RPS y p50/p95/p99.
+
+Los resultados se guardan en JSON con ``--save`` y se comparan con una línea
+base con ``--compare``: el proceso termina con código 1 si alguna métrica
+empeora más de ``--threshold`` (menos operaciones/RPS o más latencia p95).
+
+Usa SQLite temporal por defecto; para Postgres basta con exportar
+``DATABASE_URL`` (p. ej. un contenedor efímero).
+
+Uso::
+
+    PYTHONPATH=src python -m benchmarks.suite --save baseline.json
+    PYTHONPATH=src python -m benchmarks.suite --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+import uuid
+
+from .common import reset_database, setup_environment, summarize
+
+DEFAULT_BCRYPT_ROUNDS = 4
+
+
+def _configure(args):
+    setup_environment()
+    # El coste de bcrypt domina /register y /login: se fija para que las
+    # cifras sean comparables entre ejecuciones y máquinas
+    os.environ["PASSWORD_HASH_ROUNDS"] = str(args.bcrypt_rounds)
+
+
+def _ops_per_second(func, iterations: int, repeat: int) -> dict:
+    """Mejor de ``repeat`` rondas, para reducir el ruido entre ejecuciones"""
+    func()  # calentamiento
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        timings.append(time.perf_counter() - start)
+    elapsed = min(timings)
+    return {
+        "iterations": iterations,
+        "ops_per_sec": round(iterations / elapsed, 1),
+        "us_per_op": round(elapsed / iterations * 1e6, 3),
+    }
+
+
+def run_micro(iterations: int, repeat: int = 3) -> dict:
+    from fastapiusertemplate import auth, models, schema
+    from fastapiusertemplate.cache import TTLLRUCache, token_cache
+
+    user_id = uuid.uuid4()
+    token = auth.create_access_token({"sub": str(user_id)})
+    hashed = auth.get_password_hash("benchmark-password")
+    row = models.User(
+        id=user_id,
+        email="bench@example.com",
+        username="bench",
+        hashed_password=hashed,
+    )
+
+    results = {
+        "create_access_token": _ops_per_second(
+            lambda: auth.create_access_token({"sub": str(user_id)}), iterations, repeat
+        ),
+        "user_serialization": _ops_per_second(
+            lambda: schema.User.model_validate(row).model_dump_json(),
+            iterations,
+            repeat,
+        ),
+        "verify_password": _ops_per_second(
+            lambda: auth.verify_password("benchmark-password", hashed),
+            max(10, iterations // 100),
+            repeat,
+        ),
+    }
+
+    backend = token_cache.backend
+    token_cache.backend = None
+    results["verify_token_uncached"] = _ops_per_second(
+        lambda: auth.verify_token(token), iterations, repeat
+    )
+    token_cache.backend = backend or TTLLRUCache()
+    results["verify_token_cached"] = _ops_per_second(
+        lambda: auth.verify_token(token), iterations, repeat
+    )
+    token_cache.backend = backend
+    return results
+
+
+def _cookie(name: str, value: str) -> dict:
+    return {"Cookie": f"{name}={value}"}
+
+
+async def _drive(client, make_request, requests: int, concurrency: int) -> dict:
+    """Lanzar ``requests`` peticiones con ``concurrency`` clientes a la vez"""
+    latencies, errors = [], 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    summary = summarize(latencies)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": summary["p50_ms"],
+        "p95_ms": summary["p95_ms"],
+        "p99_ms": summary["p99_ms"],
+    }
+
+
+async def run_load(requests: int, concurrency: int, users: int) -> dict:
+    import httpx
+
+    from fastapiusertemplate.main import app
+
+    reset_database()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        sessions = []
+        for i in range(users):
+            credentials = {"username": f"bench{i}", "password": "benchmark-password"}
+            await c.post(
+                "/register", json={**credentials, "email": f"bench{i}@example.com"}
+            )
+            response = await c.post("/login", json=credentials)
+            sessions.append(
+                (
+                    credentials,
+                    response.cookies["access_token"],
+                    response.cookies["refresh_token"],
+                )
+            )
+            c.cookies.clear()
+
+        def session(i):
+            return sessions[i % len(sessions)]
+
+        async def register(client, i):
+            return await client.post(
+                "/register",
+                json={
+                    "email": f"load{i}@example.com",
+                    "username": f"load{i}",
+                    "password": "benchmark-password",
+                },
+            )
+
+        async def login(client, i):
+            response = await client.post("/login", json=session(i)[0])
+            client.cookies.clear()
+            return response
+
+        async def me(client, i):
+            return await client.get(
+                "/me", headers=_cookie("access_token", session(i)[1])
+            )
+
+        # Los refresh tokens rotan: cada sesión usa el último emitido y sus
+        # refresh se serializan (reutilizar uno rotado revoca la sesión)
+        refresh_tokens = [refresh_token for _, _, refresh_token in sessions]
+        refresh_locks = [asyncio.Lock() for _ in sessions]
+
+        async def refresh(client, i):
+            slot = i % len(sessions)
+            async with refresh_locks[slot]:
+                response = await client.post(
+                    "/refresh", headers=_cookie("refresh_token", refresh_tokens[slot])
+                )
+                if "refresh_token" in response.cookies:
+                    refresh_tokens[slot] = response.cookies["refresh_token"]
+            client.cookies.clear()
+            return response
+
+        async def list_users(client, i):
+            return await client.get("/users", params={"limit": 50})
+
+        scenarios = {
+            "register": register,
+            "login": login,
+            "me": me,
+            "refresh": refresh,
+            "users": list_users,
+        }
+        return {
+            name: await _drive(c, make_request, requests, concurrency)
+            for name, make_request in scenarios.items()
+        }
+
+
+# Métricas comparadas: (sección, nombre de la métrica, True si más es mejor)
+COMPARED_METRICS = (
+    ("micro", "ops_per_sec", True),
+    ("load", "rps", True),
+    ("load", "p95_ms", False),
+)
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Regresiones de ``current`` respecto a ``baseline`` mayores que ``threshold``"""
+    regressions = []
+    for section, metric, higher_is_better in COMPARED_METRICS:
+        for name, result in current.get(section, {}).items():
+            before = baseline.get(section, {}).get(name, {}).get(metric)
+            after = result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = -change if higher_is_better else change
+            line = f"{section}.{name}.{metric}: {before} -> {after} ({change:+.1%})"
+            print(("REGRESSION " if worse > threshold else "ok         ") + line)
+            if worse > threshold:
+                regressions.append(line)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--bcrypt-rounds", type=int, default=DEFAULT_BCRYPT_ROUNDS)
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--save", help="Guardar los resultados en este JSON")
+    parser.add_argument("--compare", help="JSON de línea base con el que comparar")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Empeoramiento relativo tolerado (0.10 = 10%%)",
+    )
+    args = parser.parse_args(argv)
+    _configure(args)
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "bcrypt_rounds": args.bcrypt_rounds,
+            "concurrency": args.concurrency,
+        }
+    }
+    if not args.skip_micro:
+        results["micro"] = run_micro(args.iterations, args.repeat)
+    if not args.skip_load:
+        results["load"] = asyncio.run(
+            run_load(args.requests, args.concurrency, args.users)
+        )
+    print(json.dumps(results, indent=2))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
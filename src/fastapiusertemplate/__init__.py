@@ -1,4 +1,16 @@
 
 """
 fastapiusertemplate package initialization.
-"""    
\ No newline at end of file
+
+Carga ``.env`` una sola vez, antes de que cualquier módulo del paquete lea su
+configuración del entorno (las variables ya definidas tienen prioridad), y
+anota el instante de importación para medir el tiempo hasta estar listo.
+"""
+
+import time
+
+from dotenv import load_dotenv
+
+IMPORT_STARTED = time.perf_counter()
+
+load_dotenv()
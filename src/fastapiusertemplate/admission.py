@@ -0,0 +1,264 @@
+"""
+Control de admisión para las rutas caras de FastAPI User Template.
+
+``/login`` y ``/register`` gastan cientos de milisegundos de CPU en bcrypt.
+Para que un pico (o un ataque de credential stuffing) no deje sin capacidad
+al resto de la API, cada ruta protegida tiene:
+
+- Un limitador de concurrencia: como mucho ``CONCURRENCY`` peticiones en la
+  sección cara a la vez y una cola de espera acotada. Si la cola está llena o
+  la espera supera ``QUEUE_TIMEOUT`` se responde ``503`` con ``Retry-After``
+  de inmediato, en lugar de acumular trabajo que llegará tarde.
+- Limitadores de tasa por IP y por username (token bucket): al agotarse se
+  responde ``429`` con ``Retry-After``. Los buckets se guardan en memoria con
+  expulsión LRU para acotar la memoria ante muchas claves distintas.
+
+Los límites son por proceso (por worker). Las estadísticas se exponen en
+``/health/admission``.
+
+Variables de entorno (``<ROUTE>`` es ``LOGIN`` o ``REGISTER``):
+    ADMISSION_<ROUTE>_CONCURRENCY: Peticiones simultáneas en la sección cara
+        (por defecto PASSWORD_HASH_WORKERS o el número de CPUs; 0 desactiva)
+    ADMISSION_<ROUTE>_QUEUE: Peticiones en espera como máximo (por defecto
+        16 por hueco: con bcrypt a ~250 ms es lo que se puede atender antes
+        de QUEUE_TIMEOUT)
+    ADMISSION_<ROUTE>_QUEUE_TIMEOUT: Segundos máximos de espera (por defecto 5)
+    RATE_LIMIT_<ROUTE>_IP: Límite por IP como ``peticiones/segundos``, p. ej.
+        ``20/60`` (por defecto desactivado)
+    RATE_LIMIT_<ROUTE>_USERNAME: Límite por username, mismo formato
+    RATE_LIMIT_MAX_KEYS: Claves en memoria por limitador (por defecto 100000)
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Request, status
+
+PROTECTED_ROUTES = ("login", "register")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+
+class ConcurrencyLimiter:
+    """
+    Semáforo con cola de espera acotada y tiempo máximo de espera.
+
+    Se usa solo desde el event loop, por lo que no necesita locks. Al liberar
+    un hueco se entrega directamente al primer peticionario en espera (FIFO).
+    """
+
+    def __init__(self, limit: int, max_queue: int, queue_timeout: float):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _reject(self):
+        self.rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry",
+            headers={"Retry-After": str(max(1, math.ceil(self.queue_timeout)))},
+        )
+
+    async def acquire(self):
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._reject()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait([waiter], timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        if not waiter.done():
+            self._abandon(waiter)
+            self.timeouts += 1
+            self._reject()
+        self.admitted += 1
+
+    def _abandon(self, waiter: asyncio.Future):
+        """Salir de la cola; si ya se nos había cedido el hueco, devolverlo"""
+        if waiter.done():
+            self.release()
+        else:
+            waiter.cancel()
+            self._waiters.remove(waiter)
+
+    def release(self):
+        # El hueco pasa al siguiente en espera sin cambiar ``active``
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket por clave: ``burst`` peticiones seguidas y ``rate`` tokens
+    por segundo de reposición. Las claves inactivas se expulsan en orden LRU
+    al superar ``max_keys``.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+        self.evictions = 0
+
+    def hit(self, key: str) -> float:
+        """
+        Consumir un token de ``key``. Devuelve 0 si se permite la petición o
+        los segundos que faltan hasta el siguiente token.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+                self.allowed += 1
+            else:
+                wait = (1 - tokens) / self.rate
+                self.limited += 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "keys": len(self._buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "evictions": self.evictions,
+        }
+
+
+def parse_rate(value: str | None) -> TokenBucketLimiter | None:
+    """Crear un limitador desde ``peticiones/segundos`` (None si está vacío)"""
+    if not value:
+        return None
+    count, _, seconds = value.partition("/")
+    count, seconds = int(count), float(seconds or 1)
+    if count <= 0 or seconds <= 0:
+        raise ValueError(f"Invalid rate limit {value!r}: expected 'requests/seconds'")
+    return TokenBucketLimiter(rate=count / seconds, burst=count)
+
+
+@dataclass
+class RoutePolicy:
+    """Limitadores aplicados a una ruta; cualquiera puede ser None"""
+
+    concurrency: ConcurrencyLimiter | None = None
+    per_ip: TokenBucketLimiter | None = None
+    per_username: TokenBucketLimiter | None = None
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency and self.concurrency.stats(),
+            "rate_limit_ip": self.per_ip and self.per_ip.stats(),
+            "rate_limit_username": self.per_username and self.per_username.stats(),
+        }
+
+
+def load_policy(route: str) -> RoutePolicy:
+    """Construir la política de ``route`` a partir de las variables de entorno"""
+    prefix = route.upper()
+    default_workers = os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1))
+    limit = int(os.getenv(f"ADMISSION_{prefix}_CONCURRENCY", default_workers))
+    concurrency = None
+    if limit > 0:
+        concurrency = ConcurrencyLimiter(
+            limit,
+            max_queue=int(os.getenv(f"ADMISSION_{prefix}_QUEUE", str(16 * limit))),
+            queue_timeout=float(os.getenv(f"ADMISSION_{prefix}_QUEUE_TIMEOUT", "5")),
+        )
+    return RoutePolicy(
+        concurrency=concurrency,
+        per_ip=parse_rate(os.getenv(f"RATE_LIMIT_{prefix}_IP")),
+        per_username=parse_rate(os.getenv(f"RATE_LIMIT_{prefix}_USERNAME")),
+    )
+
+
+policies: dict[str, RoutePolicy] = {
+    route: load_policy(route) for route in PROTECTED_ROUTES
+}
+
+
+def _check_rate(limiter: TokenBucketLimiter | None, key: str | None):
+    if limiter is None or key is None:
+        return
+    wait = limiter.hit(key)
+    if wait > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+
+
+@asynccontextmanager
+async def admit(route: str, request: Request, username: str | None = None):
+    """
+    Aplicar la política de ``route`` alrededor de la sección cara:
+    primero los límites de tasa (429) y después la concurrencia (503).
+    """
+    policy = policies[route]
+    _check_rate(policy.per_ip, request.client.host if request.client else None)
+    _check_rate(policy.per_username, username and username.lower())
+    if policy.concurrency is None:
+        yield
+        return
+    await policy.concurrency.acquire()
+    try:
+        yield
+    finally:
+        policy.concurrency.release()
+
+
+def stats() -> dict:
+    return {route: policy.stats() for route, policy in policies.items()}
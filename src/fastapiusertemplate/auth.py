@@ -1,26 +1,42 @@
+import datetime
+import hmac
 import os
+import time
 import uuid
 
 import jwt
-from dotenv import load_dotenv
-from fastapi import Depends, HTTPException, Request, status
-from passlib.context import CryptContext
+from fastapi import Depends, Header, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from . import models
-from .database import get_db
-
-load_dotenv()
+from . import models, schema
+from .cache import token_cache, user_cache
+from .concurrency import run_in_db_thread, run_in_hash_executor
+from .database import get_session
+from .keys import load_keyring_from_env
+from .metrics import auth_logins, auth_token_failures, password_hash_duration
+from .passwords import pwd_context
+from .replicas import get_read_session
+from .sessions import revoked as revoked_sessions
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
-if not SECRET_KEY or not ALGORITHM or not isinstance(ALGORITHM, str):
-    raise ValueError(
-        "SECRET_KEY and ALGORITHM environment variables must be set and ALGORITHM must be a string"
-    )
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+# Modo "claims-only": el access token lleva los campos de schema.User y las
+# rutas de solo lectura construyen el usuario desde el token, sin BD
+AUTH_CLAIMS_ONLY = os.getenv("AUTH_CLAIMS_ONLY", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# Clave para las operaciones de administración (cabecera X-Admin-Token).
+# Sin configurar, las rutas de administración están desactivadas
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Claves de firma indexadas por kid (HMAC con SECRET_KEY o asimétricas)
+keyring = load_keyring_from_env()
 
 
 def verify_password(plain_password, hashed_password):
@@ -31,52 +47,239 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 
-def authenticate_user(db: Session, username: str, password: str):
+def verify_and_update_password(plain_password, hashed_password):
+    """
+    Verificar la contraseña y, si el hash almacenado está desactualizado
+    según la política de ``passwords``, devolver también el hash nuevo.
+
+    Returns:
+        tuple[bool, str | None]: (contraseña correcta, hash nuevo o None)
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def _timed_hash(operation: str, func, *args):
+    start = time.perf_counter()
+    try:
+        return await run_in_hash_executor(func, *args)
+    finally:
+        password_hash_duration.labels(operation).observe(time.perf_counter() - start)
+
+
+async def verify_password_async(plain_password, hashed_password):
+    """Verificar una contraseña en el executor de hashing, sin bloquear el loop"""
+    return await _timed_hash("verify", verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password):
+    """Hashear una contraseña en el executor de hashing, sin bloquear el loop"""
+    return await _timed_hash("hash", get_password_hash, password)
+
+
+async def verify_and_update_password_async(plain_password, hashed_password):
+    """Versión no bloqueante de verify_and_update_password"""
+    return await _timed_hash(
+        "verify", verify_and_update_password, plain_password, hashed_password
+    )
+
+
+async def _load_user(db: Session | AsyncSession, *criteria):
+    """Cargar un usuario con una sesión síncrona (en el pool de hilos) o asíncrona"""
+    stmt = select(models.User).where(*criteria)
+    if isinstance(db, AsyncSession):
+        return await db.scalar(stmt)
+    return await run_in_db_thread(db.scalar, stmt)
+
+
+def authenticate_user(db: Session, username: str, password: str, on_rehash=None):
     user = db.query(models.User).filter(models.User.username == username).first()
     if not user:
+        auth_logins.labels("failure").inc()
+        return False
+    valid, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not valid:
+        auth_logins.labels("failure").inc()
+        return False
+    auth_logins.labels("success").inc()
+    if new_hash is not None and on_rehash is not None:
+        on_rehash(user.id, new_hash)
+    return user
+
+
+async def authenticate_user_async(
+    db: Session | AsyncSession, username: str, password: str, on_rehash=None
+):
+    """
+    Versión no bloqueante de authenticate_user: la consulta se ejecuta en el
+    pool de hilos de BD (o con la sesión asíncrona) y bcrypt en el executor
+    de hashing.
+
+    Si el hash almacenado está desactualizado (esquema o coste distintos de
+    la política actual), se llama a ``on_rehash(user_id, new_hash)`` para que
+    quien llama programe la escritura fuera del camino crítico de la petición.
+    """
+    user = await _load_user(db, models.User.username == username)
+    if not user:
+        auth_logins.labels("failure").inc()
         return False
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await verify_and_update_password_async(
+        password, user.hashed_password
+    )
+    if not valid:
+        auth_logins.labels("failure").inc()
         return False
+    auth_logins.labels("success").inc()
+    if new_hash is not None and on_rehash is not None:
+        on_rehash(user.id, new_hash)
     return user
 
 
+def _encode(payload: dict) -> str:
+    """Firmar ``payload`` con la clave activa, indicando su kid en la cabecera"""
+    key = keyring.active
+    return jwt.encode(
+        payload, key.signing_key, algorithm=key.algorithm, headers={"kid": key.kid}
+    )
+
+
 def create_access_token(data: dict):
     to_encode = data.copy()
-    import datetime
-
     expire = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
         minutes=ACCESS_TOKEN_EXPIRE_MINUTES
     )
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({"exp": expire, "type": "access"})
+    encoded_jwt = _encode(to_encode)
     return encoded_jwt
 
 
-def create_refresh_token(data: dict):
-    to_encode = data.copy()
-    import datetime
+def refresh_token_expiry() -> datetime.datetime:
+    """Expiración de un refresh token emitido ahora (JWT y sesión en BD)"""
+    return datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
+        days=REFRESH_TOKEN_EXPIRE_DAYS
+    )
+
 
-    expire = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=7)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+def create_refresh_token(session):
+    """
+    Refresh token de una sesión de ``models.RefreshSession``: lleva su ``jti``
+    y la familia (``sid``) para poder rotarlo y revocarlo en el servidor
+    """
+    to_encode = {
+        "sub": str(session.user_id),
+        "jti": str(session.jti),
+        "sid": str(session.family_id),
+        "exp": session.expires_at,
+        "type": "refresh",
+    }
+    encoded_jwt = _encode(to_encode)
     return encoded_jwt
 
 
-def verify_token(token: str):
-    try:
-        payload = jwt.decode(
-            token, SECRET_KEY, algorithms=[ALGORITHM] if ALGORITHM else None
-        )
-        user_id_str: str = payload.get("sub")
-        if user_id_str is None:
+def access_token_claims(user, session=None) -> dict:
+    """
+    Claims del access token para ``user``. En modo AUTH_CLAIMS_ONLY incluye
+    los campos de schema.User necesarios para construir el usuario sin BD.
+    Con ``session`` incluye su familia (``sid``) para poder revocar el token.
+    """
+    claims = {"sub": str(user.id)}
+    if session is not None:
+        claims["sid"] = str(session.family_id)
+    if AUTH_CLAIMS_ONLY:
+        claims.update({"username": user.username, "email": user.email})
+    return claims
+
+
+def decode_token(token: str):
+    """
+    Verificar el token y devolver sus claims, o None si no es válido
+
+    Los tokens ya verificados se sirven desde la caché de tokens hasta su
+    expiración, sin repetir la verificación de la firma, mientras la clave que
+    los verificó siga en el anillo (retirar una clave invalida sus tokens en
+    caché). Los tokens de una sesión revocada se rechazan consultando el
+    índice en memoria de ``sessions``, también cuando vienen de la caché.
+    """
+    cached = token_cache.get(token)
+    if cached is not None:
+        key, payload = cached
+        if keyring.get(key.kid) is not key:
+            auth_token_failures.labels("unknown_kid").inc()
             return None
-        return uuid.UUID(user_id_str)
-    except jwt.PyJWTError:
+    else:
+        try:
+            key = keyring.get(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                auth_token_failures.labels("unknown_kid").inc()
+                return None
+            # El algoritmo lo fija la clave, nunca la cabecera del token
+            payload = jwt.decode(
+                token, key.verification_key, algorithms=[key.algorithm]
+            )
+        except jwt.ExpiredSignatureError:
+            auth_token_failures.labels("expired").inc()
+            return None
+        except jwt.PyJWTError:
+            auth_token_failures.labels("invalid").inc()
+            return None
+        token_cache.set(token, payload, key)
+    if payload.get("sid") in revoked_sessions:
+        auth_token_failures.labels("revoked").inc()
+        return None
+    return payload
+
+
+def _user_id_from_claims(payload: dict | None, token_type: str = "access"):
+    if payload is None:
+        return None
+    # Los tokens anteriores al claim "type" solo pueden ser access tokens
+    if payload.get("type", "access") != token_type:
+        auth_token_failures.labels("wrong_type").inc()
+        return None
+    user_id_str: str = payload.get("sub")
+    if user_id_str is None:
+        auth_token_failures.labels("invalid_subject").inc()
         return None
+    try:
+        return uuid.UUID(user_id_str)
     except ValueError:  # Invalid UUID format
+        auth_token_failures.labels("invalid_subject").inc()
+        return None
+
+
+def verify_token(token: str):
+    return _user_id_from_claims(decode_token(token))
+
+
+def verify_refresh_token(token: str):
+    """
+    Verificar un refresh token y devolver su ``jti`` y su familia (``sid``),
+    o None si no es válido. Que la sesión siga vigente lo decide la rotación
+    contra la BD.
+    """
+    payload = decode_token(token)
+    if _user_id_from_claims(payload, token_type="refresh") is None:
+        return None
+    try:
+        return uuid.UUID(payload["jti"]), uuid.UUID(payload["sid"])
+    except (KeyError, ValueError):
+        auth_token_failures.labels("invalid").inc()
         return None
 
 
+def require_admin(x_admin_token: str | None = Header(default=None)):
+    """
+    Exigir la clave de administración en la cabecera X-Admin-Token
+    """
+    if not ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin API is disabled"
+        )
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_API_KEY):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token"
+        )
+
+
 def get_token_from_cookie(request: Request):
     """
     Obtener token solo desde cookies
@@ -91,23 +294,91 @@ def get_token_from_cookie(request: Request):
     return token
 
 
-def get_current_user(request: Request, db: Session = Depends(get_db)):
-    """
-    Obtener el usuario actual desde el token en cookies
-    """
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    token = get_token_from_cookie(request)
-    user_id = verify_token(token)
-    if user_id is None:
-        raise credentials_exception
 
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+async def _resolve_user(db: Session | AsyncSession, user_id, use_cache: bool = True):
+    if use_cache:
+        cached_user = user_cache.get(user_id)
+        if cached_user is not None:
+            return cached_user
+
+    user = await _load_user(db, models.User.id == user_id)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
-    return user
+    current_user = schema.User.model_validate(user)
+    user_cache.set(current_user)
+    return current_user
+
+
+async def get_current_user(
+    request: Request, db: Session | AsyncSession = Depends(get_read_session)
+):
+    """
+    Obtener el usuario actual desde el token en cookies
+
+    Funciona tanto con la sesión síncrona como con la asíncrona, según
+    DATABASE_ASYNC. El usuario se sirve desde la caché de usuarios cuando
+    está disponible, evitando la consulta a la base de datos; si no, desde
+    una réplica de lectura (si hay configuradas).
+    """
+    user_id = verify_token(get_token_from_cookie(request))
+    if user_id is None:
+        raise _credentials_exception()
+    return await _resolve_user(db, user_id)
+
+
+async def get_fresh_user(
+    request: Request, db: Session | AsyncSession = Depends(get_session)
+):
+    """
+    Obtener el usuario actual siempre desde la base de datos
+
+    Ignora la caché, los claims del token y las réplicas: un usuario eliminado
+    recibe 401 y los datos reflejan el estado actual del primario. Es la
+    dependencia obligatoria para toda ruta que modifique datos o que autorice
+    según el estado actual de la cuenta.
+    """
+    user_id = verify_token(get_token_from_cookie(request))
+    if user_id is None:
+        raise _credentials_exception()
+    return await _resolve_user(db, user_id, use_cache=False)
+
+
+async def get_current_principal(
+    request: Request, db: Session | AsyncSession = Depends(get_read_session)
+):
+    """
+    Obtener el usuario actual para rutas de solo lectura
+
+    Con AUTH_CLAIMS_ONLY activado, el usuario se construye directamente desde
+    los claims verificados del access token, sin ninguna consulta. Los datos
+    pueden estar desfasados hasta ACCESS_TOKEN_EXPIRE_MINUTES (un usuario
+    eliminado o renombrado conserva el acceso hasta entonces), por lo que la
+    regla es:
+
+    - ``get_current_principal``: rutas de solo lectura sobre la identidad del
+      propio usuario (``/me``, ``/protected``).
+    - ``get_current_user``: resto de rutas autenticadas de lectura (caché +
+      réplica o BD).
+    - ``get_fresh_user``: toda ruta que modifique datos o dependa del estado
+      actual de la cuenta (primario, sin caché ni claims).
+
+    Los tokens sin claims de usuario (emitidos sin el modo activado) se
+    resuelven como en ``get_current_user``.
+    """
+    payload = decode_token(get_token_from_cookie(request))
+    user_id = _user_id_from_claims(payload)
+    if user_id is None:
+        raise _credentials_exception()
+    if AUTH_CLAIMS_ONLY and "username" in payload and "email" in payload:
+        return schema.User(
+            id=user_id, username=payload["username"], email=payload["email"]
+        )
+    return await _resolve_user(db, user_id)
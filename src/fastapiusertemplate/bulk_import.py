@@ -0,0 +1,267 @@
+"""
+Importación masiva de usuarios para FastAPI User Template.
+
+Acepta un flujo NDJSON (un usuario por línea) con ``email``, ``username`` y
+``password`` o ``hashed_password`` (ya hasheada con un esquema soportado por
+``auth.pwd_context``). Los usuarios se procesan por lotes:
+
+1. Una sola consulta por lote detecta emails/usernames ya registrados; los
+   duplicados dentro del propio flujo también se detectan.
+2. Las contraseñas en texto plano se hashean en paralelo (pool de procesos en
+   la CLI, executor de hashing en la API).
+3. Las filas válidas se insertan con un único ``INSERT`` multi-fila.
+
+Cada fila rechazada se informa con su número de línea y el motivo.
+
+Uso desde la línea de comandos::
+
+    python -m fastapiusertemplate.bulk_import usuarios.ndjson --workers 8
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models, schema
+from .auth import get_password_hash, pwd_context
+from .concurrency import run_in_db_thread, run_in_hash_executor
+from .crud import DuplicateUserError
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class ImportUser(schema.CreateUser):
+    """Usuario a importar: contraseña en texto plano o ya hasheada."""
+
+    password: str | None = None
+    hashed_password: str | None = None
+
+
+@dataclass
+class ImportRecord:
+    line: int
+    user: ImportUser
+    hashed_password: str | None = None
+
+
+@dataclass
+class ImportResult:
+    """
+    Resultado de una importación.
+
+    Attributes:
+        inserted (int): Usuarios insertados
+        rejected (list[dict]): Filas rechazadas con su línea y motivo
+    """
+
+    inserted: int = 0
+    rejected: list[dict] = field(default_factory=list)
+
+    def reject(self, line: int, reason: str, user: ImportUser | None = None):
+        entry = {"line": line, "reason": reason}
+        if user is not None:
+            entry.update({"email": user.email, "username": user.username})
+        self.rejected.append(entry)
+
+    def to_dict(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "rejected_count": len(self.rejected),
+            "rejected": self.rejected,
+        }
+
+
+def parse_line(line_number: int, line: str | bytes, result: ImportResult):
+    """Validar una línea NDJSON; devuelve un ImportRecord o None si se rechaza"""
+    try:
+        user = ImportUser.model_validate_json(line)
+    except ValidationError as exc:
+        result.reject(line_number, f"Invalid record: {exc.errors()[0]['msg']}")
+        return None
+    if user.hashed_password is not None:
+        if pwd_context.identify(user.hashed_password) is None:
+            result.reject(line_number, "Unsupported password hash", user)
+            return None
+    elif not user.password:
+        result.reject(line_number, "Missing password or hashed_password", user)
+        return None
+    return ImportRecord(line_number, user, user.hashed_password)
+
+
+def filter_conflicts(db: Session, records: list[ImportRecord], result: ImportResult):
+    """
+    Descartar los registros cuyo email o username ya existe en la BD o se
+    repite en el lote. Una sola consulta por lote.
+    """
+    emails = {record.user.email for record in records}
+    usernames = {record.user.username for record in records}
+    existing = db.execute(
+        select(models.User.email, models.User.username).where(
+            or_(models.User.email.in_(emails), models.User.username.in_(usernames))
+        )
+    ).all()
+    taken_emails = {row.email for row in existing}
+    taken_usernames = {row.username for row in existing}
+
+    accepted = []
+    for record in records:
+        if record.user.email in taken_emails:
+            result.reject(record.line, "Email already registered", record.user)
+        elif record.user.username in taken_usernames:
+            result.reject(record.line, "Username already registered", record.user)
+        else:
+            taken_emails.add(record.user.email)
+            taken_usernames.add(record.user.username)
+            accepted.append(record)
+    return accepted
+
+
+def insert_records(db: Session, records: list[ImportRecord], result: ImportResult):
+    """
+    Insertar los registros con un INSERT multi-fila. Si otra escritura
+    concurrente provoca un conflicto, se reintenta fila a fila para informar
+    exactamente qué filas fallaron.
+    """
+    if not records:
+        return
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "email": record.user.email,
+            "username": record.user.username,
+            "hashed_password": record.hashed_password,
+        }
+        for record in records
+    ]
+    try:
+        db.execute(insert(models.User), rows)
+        db.commit()
+        result.inserted += len(rows)
+        return
+    except IntegrityError:
+        db.rollback()
+
+    for record, row in zip(records, rows):
+        try:
+            db.execute(insert(models.User), [row])
+            db.commit()
+            result.inserted += 1
+        except IntegrityError as exc:
+            db.rollback()
+            detail = DuplicateUserError.from_integrity_error(exc).detail
+            result.reject(record.line, detail, record.user)
+
+
+def import_batch(
+    db: Session, records: list[ImportRecord], result: ImportResult, executor: Executor
+):
+    """Procesar un lote de forma síncrona, hasheando en ``executor``"""
+    records = filter_conflicts(db, records, result)
+    pending = [record for record in records if record.hashed_password is None]
+    hashes = executor.map(
+        get_password_hash,
+        [record.user.password for record in pending],
+        chunksize=max(1, len(pending) // 64),
+    )
+    for record, hashed in zip(pending, hashes):
+        record.hashed_password = hashed
+    insert_records(db, records, result)
+
+
+def import_lines(
+    db: Session, lines, executor: Executor, batch_size: int = DEFAULT_BATCH_SIZE
+) -> ImportResult:
+    """Importar un iterable de líneas NDJSON (usado por la CLI)"""
+    result = ImportResult()
+    batch = []
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        record = parse_line(line_number, line, result)
+        if record is not None:
+            batch.append(record)
+        if len(batch) >= batch_size:
+            import_batch(db, batch, result, executor)
+            batch = []
+    if batch:
+        import_batch(db, batch, result, executor)
+    return result
+
+
+async def _import_batch_async(db: Session, records, result: ImportResult):
+    records = await run_in_db_thread(filter_conflicts, db, records, result)
+    pending = [record for record in records if record.hashed_password is None]
+    hashes = await asyncio.gather(
+        *(run_in_hash_executor(get_password_hash, r.user.password) for r in pending)
+    )
+    for record, hashed in zip(pending, hashes):
+        record.hashed_password = hashed
+    await run_in_db_thread(insert_records, db, records, result)
+
+
+async def import_stream(
+    db: Session, chunks, batch_size: int = DEFAULT_BATCH_SIZE
+) -> ImportResult:
+    """
+    Importar un flujo asíncrono de bytes NDJSON (cuerpo de la petición) sin
+    bloquear el event loop: la BD va al pool de hilos y bcrypt al executor
+    de hashing.
+    """
+    result = ImportResult()
+    batch, buffer, line_number = [], b"", 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                record = parse_line(line_number, line, result)
+                if record is not None:
+                    batch.append(record)
+            if len(batch) >= batch_size:
+                await _import_batch_async(db, batch, result)
+                batch = []
+    if buffer.strip():
+        record = parse_line(line_number + 1, buffer, result)
+        if record is not None:
+            batch.append(record)
+    if batch:
+        await _import_batch_async(db, batch, result)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importar usuarios desde NDJSON")
+    parser.add_argument("file", help="Fichero NDJSON ('-' para la entrada estándar)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="Procesos de hashing")
+    args = parser.parse_args(argv)
+
+    from .database import SessionLocal
+
+    source = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+    start = time.perf_counter()
+    with source, SessionLocal() as db, ProcessPoolExecutor(args.workers) as executor:
+        result = import_lines(db, source, executor, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+
+    summary = result.to_dict()
+    summary["seconds"] = round(elapsed, 3)
+    summary["rows_per_second"] = round(result.inserted / elapsed, 1) if elapsed else 0
+    json.dump(summary, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0 if not result.rejected else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""
+Caché de usuarios autenticados para FastAPI User Template.
+
+``auth.get_current_user`` (y ``auth.get_current_principal`` con tokens sin
+claims de usuario) consulta esta caché antes de ir a la base de datos, de
+forma que las peticiones autenticadas habituales no necesitan un round trip a
+la BD. ``auth.get_fresh_user`` no la usa. Las entradas se invalidan explícitamente desde ``crud`` cuando un
+usuario cambia o se elimina.
+
+El almacenamiento es intercambiable mediante ``CacheBackend``: por defecto se
+usa ``TTLLRUCache`` en memoria del proceso, pero un backend compartido (p. ej.
+Redis) permite que varios workers compartan la caché. Los valores guardados
+son diccionarios serializables en JSON para que cualquier backend pueda
+almacenarlos.
+
+También contiene ``TokenCache``, que guarda los claims de tokens ya
+verificados hasta su expiración para evitar repetir ``jwt.decode`` (base64,
+JSON, HMAC y validación de claims) cada vez que se presenta la misma cookie.
+
+Variables de entorno:
+    USER_CACHE_ENABLED: Activar la caché (por defecto ``true``)
+    USER_CACHE_TTL_SECONDS: Tiempo de vida de cada entrada (por defecto 60;
+        5 si ``WEB_CONCURRENCY`` es mayor que 1)
+    USER_CACHE_MAX_SIZE: Número máximo de usuarios en memoria (por defecto 10000)
+    TOKEN_CACHE_ENABLED: Activar la caché de tokens (por defecto ``true``)
+    TOKEN_CACHE_MAX_SIZE: Número máximo de tokens en memoria (por defecto 10000)
+"""
+
+import hashlib
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from . import schema
+
+
+class CacheBackend(ABC):
+    """Interfaz mínima de un almacenamiento clave-valor con expiración."""
+
+    @abstractmethod
+    def get(self, key: str):
+        """Devolver el valor asociado a ``key`` o None si no existe o expiró."""
+
+    @abstractmethod
+    def set(self, key: str, value, ttl: float | None = None):
+        """Guardar ``value`` durante ``ttl`` segundos (o el TTL por defecto)."""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Eliminar ``key`` si existe."""
+
+    @abstractmethod
+    def clear(self):
+        """Vaciar el almacenamiento."""
+
+    def get_many(self, keys: list[str]) -> dict:
+        """
+        Devolver los valores existentes de ``keys``. Los backends remotos
+        pueden sobrescribirlo para resolverlo en un solo round trip (MGET).
+        """
+        values = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+
+class TTLLRUCache(CacheBackend):
+    """
+    Caché en memoria con expiración por entrada y desalojo LRU.
+
+    Attributes:
+        maxsize (int): Número máximo de entradas
+        ttl (float): Tiempo de vida por defecto en segundos
+        evictions (int): Entradas desalojadas por falta de espacio
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def get_many(self, keys: list[str]) -> dict:
+        now = time.monotonic()
+        values = {}
+        with self._lock:
+            for key in keys:
+                item = self._data.get(key)
+                if item is None:
+                    continue
+                expires_at, value = item
+                if expires_at <= now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)
+                values[key] = value
+        return values
+
+    def set(self, key: str, value, ttl: float | None = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class UserCache:
+    """
+    Caché de ``schema.User`` por id de usuario sobre un ``CacheBackend``.
+
+    Attributes:
+        backend (CacheBackend | None): Almacenamiento; None desactiva la caché
+        hits (int): Lecturas servidas desde la caché
+        misses (int): Lecturas que tuvieron que ir a la base de datos
+    """
+
+    def __init__(self, backend: CacheBackend | None):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: uuid.UUID) -> schema.User | None:
+        if self.backend is None:
+            return None
+        data = self.backend.get(str(user_id))
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return schema.User.model_validate(data)
+
+    def get_many(self, user_ids: list[uuid.UUID]) -> dict[uuid.UUID, schema.User]:
+        """Usuarios en caché de ``user_ids``, indexados por id"""
+        if self.backend is None:
+            return {}
+        found = self.backend.get_many([str(user_id) for user_id in user_ids])
+        self.hits += len(found)
+        self.misses += len(user_ids) - len(found)
+        return {
+            uuid.UUID(key): schema.User.model_validate(data)
+            for key, data in found.items()
+        }
+
+    def set(self, user: schema.User):
+        if self.backend is not None:
+            # ``version`` se excluye de las respuestas pero se guarda para
+            # poder responder a If-None-Match sin ir a la BD
+            data = user.model_dump(mode="json")
+            data["version"] = user.version
+            self.backend.set(str(user.id), data)
+
+    def invalidate(self, user_id: uuid.UUID):
+        if self.backend is not None:
+            self.backend.delete(str(user_id))
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        data = {
+            "enabled": self.backend is not None,
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+        if isinstance(self.backend, TTLLRUCache):
+            data.update(
+                {
+                    "size": len(self.backend),
+                    "max_size": self.backend.maxsize,
+                    "evictions": self.backend.evictions,
+                }
+            )
+        return data
+
+
+class TokenCache:
+    """
+    Caché de tokens verificados, indexada por el SHA-256 del token.
+
+    Cada entrada guarda los claims decodificados junto con la clave que
+    verificó la firma, y expira con el ``exp`` del token, de modo que nunca se
+    acepta un token caducado. Solo deben guardarse tokens cuya firma ya se ha
+    verificado. Es siempre local al proceso: un
+    backend compartido sería más lento que la propia verificación HMAC.
+
+    Attributes:
+        backend (TTLLRUCache | None): Almacenamiento; None desactiva la caché
+        hits (int): Verificaciones evitadas
+        misses (int): Tokens que hubo que verificar
+    """
+
+    def __init__(self, backend: TTLLRUCache | None):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> tuple[object, dict] | None:
+        """``(clave de verificación, claims)`` del token, o None"""
+        if self.backend is None:
+            return None
+        entry = self.backend.get(self._key(token))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def set(self, token: str, claims: dict, key):
+        if self.backend is None or "exp" not in claims:
+            return
+        ttl = claims["exp"] - time.time()
+        if ttl > 0:
+            self.backend.set(self._key(token), (key, claims), ttl=ttl)
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        data = {
+            "enabled": self.backend is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+        if self.backend is not None:
+            data.update(
+                {
+                    "size": len(self.backend),
+                    "max_size": self.backend.maxsize,
+                    "evictions": self.backend.evictions,
+                }
+            )
+        return data
+
+
+def _env_flag(name: str, default: str = "true") -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+def user_cache_ttl() -> float:
+    """
+    TTL de la caché de usuarios.
+
+    La caché en memoria es de cada proceso: ``crud`` solo invalida la del
+    worker que hace el cambio, así que los demás workers (y réplicas del
+    servicio) pueden seguir sirviendo un usuario modificado o eliminado, y
+    respondiendo 304 con su ETag, durante hasta el TTL. Con varios workers el
+    valor por defecto se reduce para acotar esa ventana.
+    """
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    default = "60" if workers <= 1 else "5"
+    return float(os.getenv("USER_CACHE_TTL_SECONDS", default))
+
+
+USER_CACHE_ENABLED = _env_flag("USER_CACHE_ENABLED")
+TOKEN_CACHE_ENABLED = _env_flag("TOKEN_CACHE_ENABLED")
+
+user_cache = UserCache(
+    TTLLRUCache(
+        maxsize=int(os.getenv("USER_CACHE_MAX_SIZE", "10000")),
+        ttl=user_cache_ttl(),
+    )
+    if USER_CACHE_ENABLED
+    else None
+)
+
+
+token_cache = TokenCache(
+    TTLLRUCache(maxsize=int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000")))
+    if TOKEN_CACHE_ENABLED
+    else None
+)
+
+
+def set_user_cache_backend(backend: CacheBackend | None):
+    """Sustituir el almacenamiento de la caché (p. ej. por uno compartido)."""
+    user_cache.backend = backend
+    user_cache.hits = 0
+    user_cache.misses = 0
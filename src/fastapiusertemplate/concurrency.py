@@ -0,0 +1,104 @@
+"""
+Modelo de ejecución para trabajo bloqueante en FastAPI User Template.
+
+Las rutas de la API son ``async def`` y se ejecutan en el event loop. Las
+consultas síncronas de SQLAlchemy y el hash de contraseñas con bcrypt son
+bloqueantes, así que nunca deben ejecutarse directamente en el loop:
+
+- El I/O de base de datos se ejecuta en el pool de hilos de anyio, limitado
+  por ``DB_THREADPOOL_SIZE`` hilos concurrentes.
+- El hash y la verificación de contraseñas se ejecutan en un executor
+  dedicado (hilos o procesos) para que un pico de logins no agote los
+  hilos reservados a la base de datos.
+
+Variables de entorno:
+    DB_THREADPOOL_SIZE: Máximo de operaciones de BD concurrentes (por defecto
+        DB_POOL_SIZE + DB_MAX_OVERFLOW, para no esperar conexiones con hilos)
+    PASSWORD_HASH_EXECUTOR: ``thread`` o ``process`` (por defecto ``thread``)
+    PASSWORD_HASH_WORKERS: Workers del executor de hashing (por defecto CPUs)
+"""
+
+import asyncio
+import functools
+import inspect
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+import anyio
+import anyio.to_thread
+
+from . import profiling
+
+_db_limiter: anyio.CapacityLimiter | None = None
+_hash_executor: Executor | None = None
+
+
+def get_db_limiter() -> anyio.CapacityLimiter:
+    """Limitador compartido por todas las operaciones de base de datos."""
+    global _db_limiter
+    if _db_limiter is None:
+        default = int(os.getenv("DB_POOL_SIZE", "5")) + int(
+            os.getenv("DB_MAX_OVERFLOW", "10")
+        )
+        _db_limiter = anyio.CapacityLimiter(
+            int(os.getenv("DB_THREADPOOL_SIZE", str(default)))
+        )
+    return _db_limiter
+
+
+def get_hash_executor() -> Executor:
+    """Executor dedicado al hash y verificación de contraseñas."""
+    global _hash_executor
+    if _hash_executor is None:
+        kind = os.getenv("PASSWORD_HASH_EXECUTOR", "thread").lower()
+        workers = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+        if kind == "process":
+            _hash_executor = ProcessPoolExecutor(max_workers=workers)
+        elif kind == "thread":
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="password-hash"
+            )
+        else:
+            raise ValueError("PASSWORD_HASH_EXECUTOR must be 'thread' or 'process'")
+    return _hash_executor
+
+
+async def run_in_db_thread(func, *args, **kwargs):
+    """Ejecutar una operación síncrona de base de datos fuera del event loop."""
+    return await anyio.to_thread.run_sync(
+        profiling.bind(functools.partial(func, *args, **kwargs), "db-thread"),
+        limiter=get_db_limiter(),
+    )
+
+
+async def run_db(func, *args, **kwargs):
+    """
+    Ejecutar una operación de base de datos según su tipo: las funciones
+    asíncronas (modo ``DATABASE_ASYNC``) se esperan directamente y las
+    síncronas se envían al pool de hilos de BD.
+    """
+    if inspect.iscoroutinefunction(func):
+        return await func(*args, **kwargs)
+    return await run_in_db_thread(func, *args, **kwargs)
+
+
+async def run_in_hash_executor(func, *args):
+    """
+    Ejecutar una función de hashing en el executor dedicado.
+
+    Con ``PASSWORD_HASH_EXECUTOR=process`` la función y sus argumentos deben
+    poder serializarse con pickle (funciones a nivel de módulo).
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_hash_executor()
+    if isinstance(executor, ThreadPoolExecutor):
+        func = profiling.bind(func, "password-hash")
+    return await loop.run_in_executor(executor, func, *args)
+
+
+def shutdown_executors():
+    """Liberar el executor de hashing (llamado al apagar la aplicación)."""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True)
+        _hash_executor = None
@@ -1,9 +1,66 @@
+import datetime
 import uuid
 
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from . import models, schema
 from .auth import get_password_hash
+from .cache import user_cache
+
+
+class DuplicateUserError(Exception):
+    """
+    El email o el username ya están registrados (violación de unicidad).
+
+    Attributes:
+        field (str): Columna duplicada, ``email`` o ``username``
+        detail (str): Mensaje de error para la respuesta HTTP
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self.detail = f"{field.capitalize()} already registered"
+        super().__init__(self.detail)
+
+    @classmethod
+    def from_integrity_error(cls, exc: IntegrityError):
+        # En PostgreSQL el mensaje incluye el valor duplicado (DETAIL: Key
+        # (email)=(...)), que puede contener "username": se usa el nombre de
+        # la restricción. SQLite solo da la columna: "UNIQUE constraint
+        # failed: users.username"
+        constraint = _constraint_name(exc.orig)
+        if constraint is not None:
+            return cls(UNIQUE_USER_CONSTRAINTS.get(constraint, "email"))
+        return cls("username" if "users.username" in str(exc.orig) else "email")
+
+
+# Índices únicos de users (PostgreSQL) y la columna que protege cada uno
+UNIQUE_USER_CONSTRAINTS = {"ix_users_username": "username", "ix_users_email": "email"}
+
+
+def _constraint_name(orig) -> str | None:
+    """Restricción violada según el driver de PostgreSQL; None en SQLite"""
+    diag = getattr(orig, "diag", None)  # psycopg2
+    if diag is not None:
+        return diag.constraint_name
+    # asyncpg: el adaptador de SQLAlchemy encadena la excepción original
+    return getattr(orig.__cause__, "constraint_name", None)
+
+
+def build_insert_user(user: schema.CreateUser, hashed_password: str):
+    """INSERT ... RETURNING de un usuario nuevo"""
+    return (
+        insert(models.User)
+        .values(
+            id=uuid.uuid4(),
+            email=user.email,
+            username=user.username,
+            hashed_password=hashed_password,
+        )
+        .returning(models.User)
+    )
 
 
 def get_user(db: Session, user_id: uuid.UUID):
@@ -18,26 +75,206 @@ def get_user_by_username(db: Session, username: str):
     return db.query(models.User).filter(models.User.username == username).first()
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.User).offset(skip).limit(limit).all()
+def get_users_by_ids(db: Session, user_ids: list[uuid.UUID]):
+    """Usuarios con id en ``user_ids`` en una sola consulta ``IN``"""
+    return db.scalars(select(models.User).where(models.User.id.in_(user_ids))).all()
 
 
-def create_user(db: Session, user: schema.CreateUser):
-    db_user = models.User(
-        email=user.email,
-        username=user.username,
-        hashed_password=get_password_hash(user.password),
+def user_row_columns(fields: tuple[str, ...] | None = None):
+    """
+    Columnas de las filas de usuario que se devuelven sin cargar entidades
+    ORM: ``fields`` (por defecto ``schema.USER_FIELDS``) más ``version`` para
+    los ETags. ``fields`` debe venir validado por ``schema.parse_user_fields``.
+    """
+    return (
+        *(getattr(models.User, name) for name in fields or schema.USER_FIELDS),
+        models.User.version,
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+
+
+def get_user_row(db: Session, user_id: uuid.UUID, fields: tuple[str, ...]):
+    """Solo las columnas ``fields`` (y version) de un usuario, o None"""
+    stmt = select(*user_row_columns(fields)).where(models.User.id == user_id)
+    return db.execute(stmt).first()
+
+
+def get_users(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after: uuid.UUID | None = None,
+    fields: tuple[str, ...] | None = None,
+):
+    """
+    Listar usuarios ordenados por id. Con ``after`` se usa paginación keyset
+    (``id > after``), cuyo coste no crece con la profundidad de la página.
+
+    Devuelve filas ligeras con las columnas de ``user_row_columns(fields)`` en
+    lugar de entidades ORM: sin identity map ni estado por objeto, y sin leer
+    ``hashed_password``.
+    """
+    stmt = select(*user_row_columns(fields)).order_by(models.User.id)
+    if after is not None:
+        stmt = stmt.where(models.User.id > after)
+    if skip:
+        stmt = stmt.offset(skip)
+    return db.execute(stmt.limit(limit)).all()
+
+
+def iter_users(db: Session, batch_size: int = 1000):
+    """
+    Iterar todos los usuarios (id, email, username) ordenados por id con un
+    cursor del lado del servidor, sin cargar la tabla entera en memoria.
+    """
+    stmt = (
+        select(models.User.id, models.User.email, models.User.username)
+        .order_by(models.User.id)
+        .execution_options(yield_per=batch_size)
+    )
+    yield from db.execute(stmt)
+
+
+def create_user(
+    db: Session, user: schema.CreateUser, hashed_password: str | None = None
+):
+    """
+    Crear un usuario. Si se pasa ``hashed_password`` se usa directamente, lo que
+    permite calcular el hash fuera de esta función (p. ej. en el executor de hashing).
+
+    Un único ``INSERT ... RETURNING``: la unicidad de email y username la
+    garantizan las restricciones de la BD, sin consultas previas ni carreras.
+
+    Raises:
+        DuplicateUserError: Si el email o el username ya existen
+    """
+    stmt = build_insert_user(user, hashed_password or get_password_hash(user.password))
+    try:
+        db_user = db.scalars(stmt).one()
+        # Fuera de la sesión, el commit no expira los atributos ya devueltos
+        # por RETURNING y no hace falta un SELECT adicional (db.refresh)
+        db.expunge(db_user)
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        raise DuplicateUserError.from_integrity_error(exc) from exc
     return db_user
 
 
+def update_password_hash(db: Session, user_id: uuid.UUID, hashed_password: str):
+    """Sustituir el hash de la contraseña (p. ej. al migrar de coste o esquema)"""
+    db.execute(
+        update(models.User)
+        .where(models.User.id == user_id)
+        .values(hashed_password=hashed_password, version=models.User.version + 1)
+    )
+    db.commit()
+    user_cache.invalidate(user_id)
+
+
 def delete_user(db: Session, user_id: uuid.UUID):
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if user:
         db.delete(user)
         db.commit()
+        user_cache.invalidate(user_id)
         return {"message": "User deleted successfully"}
     return {"message": "User not found"}
+
+
+def build_rotate_session(jti: uuid.UUID, new_jti: uuid.UUID):
+    """
+    UPDATE ... RETURNING que marca ``jti`` como reemplazado por ``new_jti``,
+    solo si sigue vigente (no rotado, no revocado, no expirado). La condición
+    hace la rotación atómica: de dos peticiones con el mismo token, solo una
+    obtiene fila.
+    """
+    session = models.RefreshSession
+    return (
+        update(session)
+        .where(
+            session.jti == jti,
+            session.replaced_by.is_(None),
+            session.revoked_at.is_(None),
+            session.expires_at > datetime.datetime.now(datetime.timezone.utc),
+        )
+        .values(replaced_by=new_jti)
+        .returning(session.family_id, session.user_id)
+    )
+
+
+def build_revoke_family(family_id: uuid.UUID):
+    """UPDATE que revoca las sesiones aún vigentes de una familia"""
+    session = models.RefreshSession
+    return (
+        update(session)
+        .where(session.family_id == family_id, session.revoked_at.is_(None))
+        .values(revoked_at=datetime.datetime.now(datetime.timezone.utc))
+    )
+
+
+def create_refresh_session(
+    db: Session,
+    user_id: uuid.UUID,
+    expires_at: datetime.datetime,
+    family_id: uuid.UUID | None = None,
+):
+    """
+    Registrar un refresh token nuevo. Sin ``family_id`` abre una familia
+    (sesión de login) nueva.
+    """
+    session = models.RefreshSession(
+        jti=uuid.uuid4(),
+        family_id=family_id or uuid.uuid4(),
+        user_id=user_id,
+        expires_at=expires_at,
+    )
+    db.add(session)
+    db.flush()
+    db.expunge(session)
+    db.commit()
+    return session
+
+
+def rotate_refresh_session(db: Session, jti: uuid.UUID, expires_at: datetime.datetime):
+    """
+    Rotar la sesión ``jti`` en una transacción: marcarla como reemplazada y
+    crear la siguiente de la misma familia.
+
+    Returns:
+        models.RefreshSession | None: La sesión nueva, o None si ``jti`` ya no
+        es válido (ver ``revoke_reused_family``)
+    """
+    new_jti = uuid.uuid4()
+    row = db.execute(build_rotate_session(jti, new_jti)).first()
+    if row is None:
+        db.rollback()
+        return None
+    session = models.RefreshSession(
+        jti=new_jti, family_id=row.family_id, user_id=row.user_id, expires_at=expires_at
+    )
+    db.add(session)
+    db.flush()
+    db.expunge(session)
+    db.commit()
+    return session
+
+
+def revoke_reused_family(db: Session, jti: uuid.UUID):
+    """
+    Si ``jti`` ya fue rotado, quien lo presenta usa un token robado (o lo
+    hace el cliente legítimo tras el robo): revocar la familia entera.
+
+    Returns:
+        uuid.UUID | None: Familia revocada, o None si no hubo reutilización
+    """
+    session = db.get(models.RefreshSession, jti)
+    if session is None or session.replaced_by is None:
+        return None
+    revoke_session_family(db, session.family_id)
+    return session.family_id
+
+
+def revoke_session_family(db: Session, family_id: uuid.UUID):
+    """Revocar todos los refresh tokens de una sesión de login (logout)"""
+    db.execute(build_revoke_family(family_id))
+    db.commit()
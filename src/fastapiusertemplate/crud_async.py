@@ -0,0 +1,160 @@
+"""
+Operaciones CRUD asíncronas para FastAPI User Template.
+
+Versiones con ``AsyncSession`` de las funciones de ``crud``, usadas cuando
+``DATABASE_ASYNC`` está activado. Mantienen los mismos nombres y firmas
+(salvo la sesión) para que las rutas puedan usar cualquiera de los dos módulos.
+"""
+
+import datetime
+import uuid
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models, schema
+from .auth import get_password_hash_async
+from .cache import user_cache
+from .crud import (
+    DuplicateUserError,
+    build_insert_user,
+    build_revoke_family,
+    build_rotate_session,
+    user_row_columns,
+)
+
+
+async def get_user(db: AsyncSession, user_id: uuid.UUID):
+    return await db.scalar(select(models.User).where(models.User.id == user_id))
+
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    return await db.scalar(select(models.User).where(models.User.email == email))
+
+
+async def get_user_by_username(db: AsyncSession, username: str):
+    return await db.scalar(select(models.User).where(models.User.username == username))
+
+
+async def get_users_by_ids(db: AsyncSession, user_ids: list[uuid.UUID]):
+    result = await db.scalars(select(models.User).where(models.User.id.in_(user_ids)))
+    return result.all()
+
+
+async def get_user_row(db: AsyncSession, user_id: uuid.UUID, fields: tuple[str, ...]):
+    stmt = select(*user_row_columns(fields)).where(models.User.id == user_id)
+    result = await db.execute(stmt)
+    return result.first()
+
+
+async def get_users(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    after: uuid.UUID | None = None,
+    fields: tuple[str, ...] | None = None,
+):
+    stmt = select(*user_row_columns(fields)).order_by(models.User.id)
+    if after is not None:
+        stmt = stmt.where(models.User.id > after)
+    if skip:
+        stmt = stmt.offset(skip)
+    result = await db.execute(stmt.limit(limit))
+    return result.all()
+
+
+async def iter_users(db: AsyncSession, batch_size: int = 1000):
+    """Iterar los usuarios en lotes de ``batch_size`` con un cursor en streaming"""
+    stmt = (
+        select(models.User.id, models.User.email, models.User.username)
+        .order_by(models.User.id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await db.stream(stmt)
+    async for rows in result.partitions():
+        yield rows
+
+
+async def create_user(
+    db: AsyncSession, user: schema.CreateUser, hashed_password: str | None = None
+):
+    stmt = build_insert_user(
+        user, hashed_password or await get_password_hash_async(user.password)
+    )
+    try:
+        db_user = (await db.scalars(stmt)).one()
+        db.expunge(db_user)
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        raise DuplicateUserError.from_integrity_error(exc) from exc
+    return db_user
+
+
+async def update_password_hash(
+    db: AsyncSession, user_id: uuid.UUID, hashed_password: str
+):
+    await db.execute(
+        update(models.User)
+        .where(models.User.id == user_id)
+        .values(hashed_password=hashed_password, version=models.User.version + 1)
+    )
+    await db.commit()
+    user_cache.invalidate(user_id)
+
+
+async def delete_user(db: AsyncSession, user_id: uuid.UUID):
+    user = await get_user(db, user_id)
+    if user:
+        await db.delete(user)
+        await db.commit()
+        user_cache.invalidate(user_id)
+        return {"message": "User deleted successfully"}
+    return {"message": "User not found"}
+
+
+async def create_refresh_session(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    expires_at: datetime.datetime,
+    family_id: uuid.UUID | None = None,
+):
+    session = models.RefreshSession(
+        jti=uuid.uuid4(),
+        family_id=family_id or uuid.uuid4(),
+        user_id=user_id,
+        expires_at=expires_at,
+    )
+    db.add(session)
+    await db.commit()
+    return session
+
+
+async def rotate_refresh_session(
+    db: AsyncSession, jti: uuid.UUID, expires_at: datetime.datetime
+):
+    new_jti = uuid.uuid4()
+    row = (await db.execute(build_rotate_session(jti, new_jti))).first()
+    if row is None:
+        await db.rollback()
+        return None
+    session = models.RefreshSession(
+        jti=new_jti, family_id=row.family_id, user_id=row.user_id, expires_at=expires_at
+    )
+    db.add(session)
+    await db.commit()
+    return session
+
+
+async def revoke_reused_family(db: AsyncSession, jti: uuid.UUID):
+    session = await db.get(models.RefreshSession, jti)
+    if session is None or session.replaced_by is None:
+        return None
+    await revoke_session_family(db, session.family_id)
+    return session.family_id
+
+
+async def revoke_session_family(db: AsyncSession, family_id: uuid.UUID):
+    await db.execute(build_revoke_family(family_id))
+    await db.commit()
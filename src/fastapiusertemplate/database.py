@@ -1,20 +1,170 @@
+"""
+Configuración de la base de datos para FastAPI User Template.
+
+Importar este módulo no abre conexiones ni crea los motores: ``get_engine`` y
+``get_async_engine`` los crean en el primer uso (normalmente el
+precalentamiento del arranque, ver ``startup``), y las sesiones de
+``SessionLocal`` y ``AsyncSessionLocal`` los piden al crearse. ``engine``,
+``async_engine``, ``pool_stats`` y ``async_pool_stats`` siguen disponibles como
+atributos del módulo y también crean el motor al accederse.
+"""
+
 import os
+import threading
 
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from .pool_stats import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    instrument_pool,
+)
+from .query_stats import instrument_engine
 
-load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
-print("Database URL:", DATABASE_URL)
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Modo asíncrono: AsyncEngine + AsyncSession en lugar del pool de hilos
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Convertir una URL síncrona en su equivalente con driver asíncrono"""
+    scheme, sep, rest = url.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+# Configuración del pool de conexiones
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+
+def pool_options(url: str, poolclass) -> dict:
+    """
+    Argumentos de pool para create_engine. SQLite en memoria usa un pool de
+    una sola conexión que no admite tamaño ni overflow.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (
+        None,
+        "",
+        ":memory:",
+    ):
+        return {"pool_pre_ping": DB_POOL_PRE_PING}
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def build_engine(url: str):
+    """Motor síncrono con el pool configurado e instrumentado; devuelve (motor, stats)"""
+    new_engine = create_engine(url, **pool_options(url, InstrumentedQueuePool))
+    stats = instrument_pool(new_engine.pool)
+    instrument_engine(new_engine)
+    return new_engine, stats
+
+
+def build_async_engine(url: str):
+    """Equivalente asíncrono de build_engine"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    new_engine = create_async_engine(
+        url, **pool_options(url, InstrumentedAsyncAdaptedQueuePool)
+    )
+    stats = instrument_pool(new_engine.sync_engine.pool)
+    instrument_engine(new_engine.sync_engine)
+    return new_engine, stats
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+_engines: dict[str, tuple] = {}
+_engines_lock = threading.Lock()
+
+
+def _lazy_engine(kind: str, build, url: str):
+    engine_and_stats = _engines.get(kind)
+    if engine_and_stats is None:
+        with _engines_lock:
+            engine_and_stats = _engines.get(kind)
+            if engine_and_stats is None:
+                engine_and_stats = _engines[kind] = build(url)
+    return engine_and_stats
+
+
+def get_engine():
+    """Motor síncrono del primario; se crea en el primer uso"""
+    return _lazy_engine("sync", build_engine, DATABASE_URL)[0]
+
+
+def get_async_engine():
+    """Motor asíncrono del primario (None sin DATABASE_ASYNC); se crea en el primer uso"""
+    if not DATABASE_ASYNC:
+        return None
+    return _lazy_engine("async", build_async_engine, ASYNC_DATABASE_URL)[0]
+
+
+def __getattr__(name):
+    if name == "engine":
+        return get_engine()
+    if name == "pool_stats":
+        return _lazy_engine("sync", build_engine, DATABASE_URL)[1]
+    if name == "async_engine":
+        return get_async_engine()
+    if name == "async_pool_stats":
+        if not DATABASE_ASYNC:
+            return None
+        return _lazy_engine("async", build_async_engine, ASYNC_DATABASE_URL)[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class LazySession(Session):
+    """Sesión que crea el motor del primario si no se indica otro"""
+
+    def __init__(self, bind=None, **kwargs):
+        super().__init__(bind=get_engine() if bind is None else bind, **kwargs)
+
+
+SessionLocal = sessionmaker(class_=LazySession, autocommit=False, autoflush=False)
 Base = declarative_base()
 
+AsyncSessionLocal = None
+if DATABASE_ASYNC:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    class LazyAsyncSession(AsyncSession):
+        """Equivalente asíncrono de LazySession"""
+
+        def __init__(self, bind=None, **kwargs):
+            super().__init__(
+                bind=get_async_engine() if bind is None else bind, **kwargs
+            )
+
+    AsyncSessionLocal = async_sessionmaker(
+        class_=LazyAsyncSession, autoflush=False, expire_on_commit=False
+    )
+
 
 def get_db():
     db = SessionLocal()
@@ -22,3 +172,35 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependencia de sesión seleccionada por configuración (DATABASE_ASYNC)
+get_session = get_async_db if DATABASE_ASYNC else get_db
+
+
+async def dispose_engines():
+    """
+    Cerrar las conexiones de los pools ya creados (apagado del lifespan). Los
+    motores siguen siendo utilizables: abrirían conexiones nuevas.
+    """
+    if "async" in _engines:
+        await _engines["async"][0].dispose()
+    if "sync" in _engines:
+        _engines["sync"][0].dispose()
+
+
+def get_pool_status() -> dict:
+    """Estado e instrumentación de los pools de conexiones ya creados"""
+    status = {}
+    if "sync" in _engines:
+        sync_engine, stats = _engines["sync"]
+        status["sync"] = stats.snapshot(sync_engine.pool)
+    if "async" in _engines:
+        async_engine, stats = _engines["async"]
+        status["async"] = stats.snapshot(async_engine.sync_engine.pool)
+    return status
@@ -0,0 +1,71 @@
+"""
+Peticiones condicionales (ETag / If-None-Match) para FastAPI User Template.
+
+Los ETags de usuario se derivan de ``id`` y ``version`` de la fila, sin
+serializar la respuesta, de modo que la comparación con ``If-None-Match`` se
+puede resolver con la versión guardada en la caché de usuarios. Las páginas
+de ``/users`` usan un hash de los pares (id, versión) y del cursor siguiente.
+
+Una proyección (``fields=``) es otra representación del mismo recurso, así que
+los campos pedidos forman parte del ETag.
+"""
+
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+def user_etag(user, fields: tuple[str, ...] | None = None) -> str | None:
+    """ETag fuerte de un usuario; None si no se conoce su versión"""
+    if getattr(user, "version", None) is None:
+        return None
+    if fields is not None:
+        return f'"{user.id}.{user.version}.{"+".join(fields)}"'
+    return f'"{user.id}.{user.version}"'
+
+
+def page_etag(
+    users, next_cursor: str | None, fields: tuple[str, ...] | None = None
+) -> str:
+    """ETag fuerte de una página de usuarios"""
+    digest = hashlib.sha256()
+    if fields is not None:
+        digest.update(f"fields={'+'.join(fields)};".encode())
+    for user in users:
+        digest.update(f"{user.id}.{user.version};".encode())
+    digest.update((next_cursor or "").encode())
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Comparar ``If-None-Match`` con ``etag`` (comparación débil, RFC 9110):
+    admite listas separadas por comas, ``W/`` y ``*``.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(request: Request, etag: str | None, cache_control: str):
+    """
+    Respuesta 304 si el cliente ya tiene ``etag``; None si hay que enviar el
+    cuerpo completo.
+    """
+    if etag is None or not etag_matches(request.headers.get("if-none-match"), etag):
+        return None
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
+
+
+def set_etag(response: Response, etag: str | None, cache_control: str):
+    """Añadir ``ETag`` y ``Cache-Control`` a una respuesta completa"""
+    if etag is not None:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = cache_control
@@ -0,0 +1,78 @@
+"""
+Exportación masiva de usuarios en streaming para FastAPI User Template.
+
+Los usuarios se leen con un cursor del lado del servidor (``yield_per``) y se
+escriben en bloques NDJSON o CSV a medida que llegan, de modo que la memoria
+usada es constante independientemente del tamaño de la tabla.
+
+El generador abre su propia sesión: la sesión de la dependencia ``get_db`` se
+cierra antes de que ``StreamingResponse`` termine de enviar el cuerpo.
+"""
+
+import csv
+import io
+import json
+
+from . import crud, crud_async
+from .database import DATABASE_ASYNC, AsyncSessionLocal, SessionLocal
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+CSV_COLUMNS = ("id", "email", "username")
+
+
+def _encode_chunk(rows, fmt: str) -> str:
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps(
+                {"id": str(row.id), "email": row.email, "username": row.username}
+            )
+            + "\n"
+            for row in rows
+        )
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows((str(row.id), row.email, row.username) for row in rows)
+    return buffer.getvalue()
+
+
+def _header(fmt: str) -> str | None:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(CSV_COLUMNS)
+        return buffer.getvalue()
+    return None
+
+
+def iter_export(fmt: str, batch_size: int = 1000):
+    """Generador síncrono de bloques de texto (lo itera Starlette en un hilo)"""
+    header = _header(fmt)
+    if header:
+        yield header
+    with SessionLocal() as db:
+        rows = []
+        for row in crud.iter_users(db, batch_size=batch_size):
+            rows.append(row)
+            if len(rows) >= batch_size:
+                yield _encode_chunk(rows, fmt)
+                rows.clear()
+        if rows:
+            yield _encode_chunk(rows, fmt)
+
+
+async def aiter_export(fmt: str, batch_size: int = 1000):
+    """Generador asíncrono de bloques de texto para el modo DATABASE_ASYNC"""
+    header = _header(fmt)
+    if header:
+        yield header
+    async with AsyncSessionLocal() as db:
+        async for rows in crud_async.iter_users(db, batch_size=batch_size):
+            yield _encode_chunk(rows, fmt)
+
+
+def stream_users(fmt: str, batch_size: int = 1000):
+    """Iterador de exportación adecuado para el modo de base de datos activo"""
+    if DATABASE_ASYNC:
+        return aiter_export(fmt, batch_size)
+    return iter_export(fmt, batch_size)
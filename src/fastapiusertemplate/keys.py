@@ -0,0 +1,199 @@
+"""
+Gestión de claves de firma JWT para FastAPI User Template.
+
+Mantiene un índice en memoria ``kid`` → clave con una clave activa de firma y
+cualquier número de claves de verificación (claves anteriores en rotación).
+Con algoritmos asimétricos (EdDSA, ES256, RS256, ...) las claves públicas se
+publican en ``/.well-known/jwks.json`` para que otros servicios verifiquen los
+tokens localmente sin conocer ningún secreto.
+
+Variables de entorno:
+    ALGORITHM: Algoritmo de firma (HS256, EdDSA, ES256, RS256, ...)
+    SECRET_KEY: Secreto compartido, solo para algoritmos HMAC (HS*)
+    JWT_PRIVATE_KEY_FILE: Clave privada PEM de firma (algoritmos asimétricos)
+    JWT_KEY_ID: ``kid`` de la clave activa (por defecto, huella de la clave)
+    JWT_VERIFICATION_KEYS: Claves públicas anteriores aún válidas, en formato
+        ``kid=ruta.pem,kid2=ruta2.pem``
+
+Generar una clave nueva::
+
+    python -m fastapiusertemplate.keys EdDSA > jwt-key.pem
+"""
+
+import hashlib
+import os
+import sys
+import threading
+from dataclasses import dataclass
+
+from jwt.algorithms import get_default_algorithms, has_crypto
+
+HMAC_ALGORITHMS = ("HS256", "HS384", "HS512")
+
+
+@dataclass(frozen=True)
+class JWTKey:
+    """
+    Clave del anillo de claves.
+
+    Attributes:
+        kid (str): Identificador publicado en la cabecera ``kid`` del token
+        algorithm (str): Algoritmo JWT de la clave
+        signing_key: Clave privada (o secreto HMAC); None si solo verifica
+        verification_key: Clave pública (o secreto HMAC)
+    """
+
+    kid: str
+    algorithm: str
+    signing_key: object | None
+    verification_key: object
+
+    @property
+    def is_asymmetric(self) -> bool:
+        return self.algorithm not in HMAC_ALGORITHMS
+
+    def to_jwk(self) -> dict:
+        jwk = get_default_algorithms()[self.algorithm].to_jwk(
+            self.verification_key, as_dict=True
+        )
+        jwk.update({"kid": self.kid, "alg": self.algorithm, "use": "sig"})
+        return jwk
+
+
+class KeyRing:
+    """Índice ``kid`` → clave con una clave activa para firmar."""
+
+    def __init__(self):
+        self._keys: dict[str, JWTKey] = {}
+        self._active_kid: str | None = None
+        self._lock = threading.Lock()
+
+    def add(self, key: JWTKey, activate: bool = False):
+        """Añadir una clave; con ``activate`` pasa a ser la clave de firma."""
+        if activate and key.signing_key is None:
+            raise ValueError(f"Key {key.kid!r} has no signing material")
+        with self._lock:
+            self._keys[key.kid] = key
+            if activate:
+                self._active_kid = key.kid
+
+    def rotate(self, key: JWTKey):
+        """Activar ``key`` para firmar; las claves anteriores siguen verificando."""
+        self.add(key, activate=True)
+
+    def retire(self, kid: str):
+        """Dejar de aceptar tokens firmados con ``kid``."""
+        with self._lock:
+            if kid == self._active_kid:
+                raise ValueError("Cannot retire the active signing key")
+            self._keys.pop(kid, None)
+
+    @property
+    def active(self) -> JWTKey:
+        return self._keys[self._active_kid]
+
+    def get(self, kid: str | None) -> JWTKey | None:
+        """Clave de verificación para ``kid``; sin ``kid`` se usa la activa."""
+        if kid is None:
+            return self._keys.get(self._active_kid)
+        return self._keys.get(kid)
+
+    def jwks(self) -> dict:
+        """Conjunto de claves públicas en formato JWKS (RFC 7517)."""
+        return {
+            "keys": [key.to_jwk() for key in self._keys.values() if key.is_asymmetric]
+        }
+
+
+def _key_thumbprint(public_key) -> str:
+    from cryptography.hazmat.primitives import serialization
+
+    der = public_key.public_bytes(
+        serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return hashlib.sha256(der).hexdigest()[:16]
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def load_private_key(algorithm: str, pem: bytes, kid: str | None = None) -> JWTKey:
+    """Crear una clave de firma a partir de una clave privada PEM."""
+    from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
+    private_key = load_pem_private_key(pem, password=None)
+    public_key = private_key.public_key()
+    return JWTKey(
+        kid or _key_thumbprint(public_key), algorithm, private_key, public_key
+    )
+
+
+def load_public_key(algorithm: str, pem: bytes, kid: str) -> JWTKey:
+    """Crear una clave solo de verificación a partir de una clave pública PEM."""
+    from cryptography.hazmat.primitives.serialization import load_pem_public_key
+
+    return JWTKey(kid, algorithm, None, load_pem_public_key(pem))
+
+
+def generate_private_key_pem(algorithm: str) -> bytes:
+    """Generar una clave privada PEM adecuada para ``algorithm``."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+    if algorithm == "EdDSA":
+        key = ed25519.Ed25519PrivateKey.generate()
+    elif algorithm.startswith("ES"):
+        curves = {"ES256": ec.SECP256R1, "ES384": ec.SECP384R1, "ES512": ec.SECP521R1}
+        key = ec.generate_private_key(curves[algorithm]())
+    elif algorithm.startswith(("RS", "PS")):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        raise ValueError(f"Unsupported asymmetric algorithm: {algorithm}")
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+
+def load_keyring_from_env() -> KeyRing:
+    """Construir el anillo de claves a partir de las variables de entorno."""
+    algorithm = os.getenv("ALGORITHM")
+    if (
+        not algorithm
+        or algorithm == "none"
+        or algorithm not in get_default_algorithms()
+    ):
+        raise ValueError(
+            "ALGORITHM environment variable must be a supported JWT algorithm"
+        )
+
+    keyring = KeyRing()
+    kid = os.getenv("JWT_KEY_ID")
+    if algorithm in HMAC_ALGORITHMS:
+        secret = os.getenv("SECRET_KEY")
+        if not secret:
+            raise ValueError("SECRET_KEY environment variable must be set for HMAC")
+        keyring.add(JWTKey(kid or "default", algorithm, secret, secret), activate=True)
+        return keyring
+
+    if not has_crypto:
+        raise ValueError(f"{algorithm} requires the 'cryptography' package")
+    private_key_file = os.getenv("JWT_PRIVATE_KEY_FILE")
+    if not private_key_file:
+        raise ValueError(f"JWT_PRIVATE_KEY_FILE must be set to sign with {algorithm}")
+    for entry in filter(None, os.getenv("JWT_VERIFICATION_KEYS", "").split(",")):
+        old_kid, _, path = entry.strip().partition("=")
+        keyring.add(load_public_key(algorithm, _read(path), old_kid))
+    keyring.add(
+        load_private_key(algorithm, _read(private_key_file), kid), activate=True
+    )
+    return keyring
+
+
+if __name__ == "__main__":
+    sys.stdout.write(
+        generate_private_key_pem(sys.argv[1] if len(sys.argv) > 1 else "EdDSA").decode()
+    )
@@ -1,12 +1,165 @@
+import asyncio
+import contextlib
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
 from uuid import UUID
 
-from fastapi import Depends, FastAPI, HTTPException, Request, Response, status
+from fastapi import (
+    BackgroundTasks,
+    Depends,
+    FastAPI,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from . import auth, crud, models, schema
-from .database import engine, get_db
+from . import (
+    admission,
+    auth,
+    bulk_import,
+    crud,
+    crud_async,
+    etags,
+    export,
+    metrics,
+    profiling,
+    query_stats,
+    replicas,
+    responses,
+    schema,
+    sessions,
+    startup,
+)
+from .cache import token_cache, user_cache
+from .concurrency import run_db, run_in_db_thread, shutdown_executors
+from .database import (
+    DATABASE_ASYNC,
+    SessionLocal,
+    dispose_engines,
+    get_db,
+    get_pool_status,
+    get_session,
+)
+from .pagination import decode_cursor, encode_cursor
+from .replicas import get_read_session
+
+# Tiempo que los clientes pueden cachear el JWKS
+JWKS_MAX_AGE = int(os.getenv("JWKS_MAX_AGE", "300"))
+
+# Límites de paginación de GET /users
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "100"))
+# FastAPI no valida el valor por defecto de Query: nunca por encima del máximo
+DEFAULT_PAGE_SIZE = min(100, MAX_PAGE_SIZE)
+MAX_SKIP = int(os.getenv("MAX_SKIP", "10000"))
+# Cache-Control de las respuestas con ETag: los clientes pueden guardarlas
+# pero deben revalidarlas con If-None-Match
+USER_CACHE_CONTROL = "no-cache"
+ME_CACHE_CONTROL = "private, no-cache"
+
+# Implementación CRUD según el modo de base de datos configurado
+users_crud = crud_async if DATABASE_ASYNC else crud
+
+
+def rehash_password(user_id: UUID, hashed_password: str):
+    """
+    Guardar el hash regenerado en el login. Se ejecuta como tarea en segundo
+    plano, tras enviar la respuesta, con su propia sesión.
+    """
+    with SessionLocal() as db:
+        crud.update_password_hash(db, user_id, hashed_password)
+
+
+def _pool_connections():
+    pools = get_pool_status()
+    for replica in replicas.replica_set.status():
+        pools[replica["name"]] = replica["pool"]
+    for pool, snapshot in pools.items():
+        for state in ("checked_out", "checked_in", "overflow_in_use"):
+            yield (pool, state), snapshot.get(state)
+
+
+def _cache_lookups():
+    for name, cache in (("user", user_cache), ("token", token_cache)):
+        yield (name, "hit"), cache.hits
+        yield (name, "miss"), cache.misses
+
+
+def _admission_rejections():
+    for route, policy in admission.policies.items():
+        if policy.concurrency is not None:
+            yield (route, "busy"), policy.concurrency.rejected
+        if policy.per_ip is not None:
+            yield (route, "rate_limit_ip"), policy.per_ip.limited
+        if policy.per_username is not None:
+            yield (route, "rate_limit_username"), policy.per_username.limited
+
+
+def _admission_slots():
+    for route, policy in admission.policies.items():
+        if policy.concurrency is not None:
+            yield (route, "active"), policy.concurrency.active
+            yield (route, "waiting"), policy.concurrency.waiting
+
+
+metrics.CallbackGauge(
+    "db_pool_connections",
+    "Conexiones del pool por estado",
+    ("pool", "state"),
+    _pool_connections,
+)
+metrics.CallbackCounter(
+    "cache_lookups_total",
+    "Búsquedas en las cachés por resultado",
+    ("cache", "result"),
+    _cache_lookups,
+)
+metrics.CallbackCounter(
+    "admission_rejected_total",
+    "Peticiones rechazadas por el control de admisión",
+    ("route", "reason"),
+    _admission_rejections,
+)
+metrics.CallbackGauge(
+    "auth_revoked_sessions",
+    "Sesiones revocadas en el índice en memoria",
+    (),
+    lambda: [((), len(sessions.revoked))],
+)
+metrics.CallbackGauge(
+    "admission_requests",
+    "Peticiones en la sección protegida o esperando hueco",
+    ("route", "state"),
+    _admission_slots,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if replicas.replica_set:
+        # Comprobar las réplicas antes de enrutarles lecturas
+        await run_in_db_thread(replicas.replica_set.check_all)
+    # Sin efectos al importar: conexiones, esquema y bcrypt se preparan aquí
+    await startup.startup()
+    # Recarga del índice de sesiones revocadas y poda de sesiones expiradas
+    tasks = [asyncio.create_task(sessions.maintain())]
+    if replicas.replica_set:
+        tasks.append(asyncio.create_task(replicas.monitor()))
+    yield
+    startup.shutdown()
+    for task in tasks:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    # Las peticiones en curso ya han terminado: cerrar las conexiones del pool
+    await dispose_engines()
+    await replicas.replica_set.dispose()
+    shutdown_executors()
 
-models.Base.metadata.create_all(bind=engine)
 
 # Metadata para la documentación de la API
 app = FastAPI(
@@ -76,90 +229,252 @@ app = FastAPI(
             "description": "Endpoints de estado y verificación del servicio",
         },
     ],
+    lifespan=lifespan,
+    default_response_class=responses.default_response_class(),
 )
+if profiling.PROFILING_ENABLED:
+    app.add_middleware(
+        profiling.ProfilingMiddleware, admin_key=lambda: auth.ADMIN_API_KEY
+    )
+app.add_middleware(query_stats.QueryStatsMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+
+
+@app.get("/users/export", tags=["users"], dependencies=[Depends(auth.require_admin)])
+async def export_users(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    batch_size: int = Query(1000, ge=1, le=10000),
+):
+    """
+    Exportar todos los usuarios en streaming (requiere X-Admin-Token)
+
+    - **format**: `ndjson` (una línea JSON por usuario) o `csv`
+    - **batch_size**: Filas leídas del cursor por bloque
+
+    La memoria usada es constante independientemente del tamaño de la tabla.
+    """
+    return StreamingResponse(
+        export.stream_users(export_format, batch_size),
+        media_type=export.EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="users.{export_format}"'
+        },
+    )
+
+
+@app.post("/users/import", tags=["users"], dependencies=[Depends(auth.require_admin)])
+async def import_users(
+    request: Request,
+    batch_size: int = Query(bulk_import.DEFAULT_BATCH_SIZE, ge=1, le=10000),
+    db: Session = Depends(get_db),
+):
+    """
+    Importar usuarios en bloque desde NDJSON (requiere X-Admin-Token)
+
+    Cada línea del cuerpo es un usuario con `email`, `username` y `password`
+    o `hashed_password`. Se insertan por lotes con un único INSERT multi-fila
+    y se informa de cada fila rechazada (duplicados, datos inválidos).
+
+    Usa siempre la sesión síncrona, también con DATABASE_ASYNC.
+    """
+    result = await bulk_import.import_stream(
+        db, request.stream(), batch_size=batch_size
+    )
+    return result.to_dict()
+
+
+@app.post("/users/batch", response_model=schema.UserBatch, tags=["users"])
+async def read_users_batch(
+    batch: schema.UserBatchRequest, db: Session = Depends(get_read_session)
+):
+    """
+    Obtener varios usuarios por ID en una sola petición
+
+    - **ids**: Lista de IDs (máximo configurable con MAX_BATCH_IDS; más IDs
+      responden 422 al validar el cuerpo)
+
+    Los usuarios en caché se sirven sin consulta y el resto se resuelve con
+    un único `WHERE id IN (...)`. Los IDs inexistentes se listan en `missing`.
+    """
+    user_ids = list(dict.fromkeys(batch.ids))
+    users = user_cache.get_many(user_ids)
+    pending = [user_id for user_id in user_ids if user_id not in users]
+    if pending:
+        for db_user in await run_db(users_crud.get_users_by_ids, db, pending):
+            user = schema.User.model_validate(db_user)
+            user_cache.set(user)
+            users[user.id] = user
+    return {
+        "users": {user_id: users[user_id] for user_id in user_ids if user_id in users},
+        "missing": [user_id for user_id in user_ids if user_id not in users],
+    }
+
+
+def user_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="Campos a devolver separados por comas "
+        f"({', '.join(schema.USER_FIELDS)}); `id` se incluye siempre",
+    ),
+) -> tuple[str, ...] | None:
+    """Dependencia: proyección pedida con ``fields=`` (None = todos los campos)"""
+    try:
+        return schema.parse_user_fields(fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
 
 
 @app.get("/users/{user_id}", response_model=schema.User, tags=["users"])
 async def read_user(
     user_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    fields: tuple[str, ...] | None = Depends(user_fields),
+    db: Session = Depends(get_read_session),
 ):
-    """Obtener información de un usuario específico por ID"""
-    user = crud.get_user(db, user_id)
-    if user:
-        return user
-    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    """
+    Obtener información de un usuario específico por ID
+
+    - **fields**: Campos a devolver (p. ej. `id,username`)
 
+    Responde con un `ETag` fuerte; con `If-None-Match` devuelve 304 sin
+    cuerpo si el usuario no ha cambiado. Si el usuario está en la caché, la
+    comprobación no consulta la base de datos; si no, con `fields` solo se
+    leen esas columnas (y el resultado parcial no se guarda en la caché).
+    """
+    user = user_cache.get(user_id)
+    if user is None and fields is not None:
+        user = await run_db(users_crud.get_user_row, db, user_id, fields)
+    elif user is None:
+        db_user = await run_db(users_crud.get_user, db, user_id)
+        if db_user is not None:
+            user = schema.User.model_validate(db_user)
+            user_cache.set(user)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+
+    etag = etags.user_etag(user, fields)
+    not_modified = etags.not_modified(request, etag, USER_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
+    response = responses.user_response(user, fields)
+    etags.set_etag(response, etag, USER_CACHE_CONTROL)
+    return response
+
+
+@app.get("/users", response_model=schema.UserPage, tags=["users"])
+async def read_users(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    skip: int = Query(0, ge=0, le=MAX_SKIP, deprecated=True),
+    fields: tuple[str, ...] | None = Depends(user_fields),
+    db: Session = Depends(get_read_session),
+):
+    """
+    Listar todos los usuarios (paginado por cursor)
+
+    - **cursor**: Valor de `next_cursor` de la página anterior
+    - **limit**: Usuarios por página (máximo configurable con MAX_PAGE_SIZE)
+    - **skip**: Obsoleto; paginación por offset, solo sin cursor
+    - **fields**: Campos a devolver (p. ej. `id,username`); la consulta solo
+      lee esas columnas
+
+    Cada página lleva un `ETag`; con `If-None-Match` devuelve 304 sin
+    serializar la página si ningún usuario ha cambiado.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+    users = await run_db(
+        users_crud.get_users,
+        db,
+        skip=0 if after else skip,
+        limit=limit + 1,
+        after=after,
+        fields=fields,
+    )
+    next_cursor = encode_cursor(users[limit - 1].id) if len(users) > limit else None
+    users = users[:limit]
 
-@app.get("/users", response_model=list[schema.User], tags=["users"])
-async def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Listar todos los usuarios (paginado)"""
-    users = crud.get_users(db, skip=skip, limit=limit)
-    return users
+    etag = etags.page_etag(users, next_cursor, fields)
+    not_modified = etags.not_modified(request, etag, USER_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
+    response = responses.user_page_response(users, next_cursor, fields)
+    etags.set_etag(response, etag, USER_CACHE_CONTROL)
+    return response
 
 
 @app.get("/me", response_model=schema.User, tags=["users"])
-async def read_users_me(current_user: schema.User = Depends(auth.get_current_user)):
-    """Obtener perfil del usuario autenticado"""
-    return current_user
+async def read_users_me(
+    request: Request,
+    current_user: schema.User = Depends(auth.get_current_principal),
+):
+    """
+    Obtener perfil del usuario autenticado
+
+    Responde con un `ETag` (salvo en modo AUTH_CLAIMS_ONLY, donde la versión
+    no se conoce); con `If-None-Match` devuelve 304 sin cuerpo.
+    """
+    etag = etags.user_etag(current_user)
+    not_modified = etags.not_modified(request, etag, ME_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
+    response = responses.user_response(current_user)
+    etags.set_etag(response, etag, ME_CACHE_CONTROL)
+    return response
 
 
 @app.post("/register", response_model=schema.User, tags=["authentication"])
-async def create_user(user: schema.CreateUser, db: Session = Depends(get_db)):
+async def create_user(
+    user: schema.CreateUser,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_session),
+):
     """
     Registrar un nuevo usuario
 
     - **email**: Email único del usuario
     - **username**: Nombre de usuario único
     - **password**: Contraseña (será hasheada automáticamente)
-    """
-    # Verificar si el email ya existe
-    existing_user = crud.get_user_by_email(db, user.email)
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
-        )
-
-    # Verificar si el username ya existe
-    existing_username = crud.get_user_by_username(db, user.username)
-    if existing_username:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already registered",
-        )
 
-    db_user = crud.create_user(db, user)
+    Sujeto a control de admisión: 429 o 503 con `Retry-After` si se superan
+    los límites configurados.
+    """
+    async with admission.admit("register", request, user.username):
+        hashed_password = await auth.get_password_hash_async(user.password)
+    # Unicidad garantizada por la BD: un solo INSERT ... RETURNING
+    try:
+        db_user = await run_db(users_crud.create_user, db, user, hashed_password)
+    except crud.DuplicateUserError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=exc.detail)
+    replicas.pin_primary(response)
     return db_user
 
 
 @app.delete("/users/{user_id}", tags=["users"])
-async def delete_user(user_id: UUID, db: Session = Depends(get_db)):
+async def delete_user(
+    user_id: UUID, response: Response, db: Session = Depends(get_session)
+):
     """Eliminar un usuario por ID"""
-    result = crud.delete_user(db, user_id)
+    result = await run_db(users_crud.delete_user, db, user_id)
+    replicas.pin_primary(response)
     return result
 
 
-@app.post("/login", response_model=schema.LoginResponse, tags=["authentication"])
-async def login(
-    form_data: schema.Login, response: Response, db: Session = Depends(get_db)
-):
-    """
-    Iniciar sesión con credenciales
-
-    - **username**: Nombre de usuario o email
-    - **password**: Contraseña del usuario
-
-    Retorna cookies HTTP-only con tokens de acceso y refresh.
-    """
-    user = auth.authenticate_user(db, form_data.username, form_data.password)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    access_token = auth.create_access_token(data={"sub": str(user.id)})
-    refresh_token = auth.create_refresh_token(data={"sub": str(user.id)})
+def set_session_cookies(response: Response, user, session):
+    """Emitir access y refresh token de ``session`` en cookies HTTP-only"""
+    access_token = auth.create_access_token(
+        data=auth.access_token_claims(user, session)
+    )
+    refresh_token = auth.create_refresh_token(session)
 
     # Establecer cookies HTTP-only para mayor seguridad
     response.set_cookie(
@@ -176,8 +491,66 @@ async def login(
         httponly=True,
         secure=False,  # True en producción con HTTPS
         samesite="lax",
-        max_age=7 * 24 * 60 * 60,  # 7 días
+        max_age=auth.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
+    )
+
+
+def _session_family(request: Request) -> UUID | None:
+    """Familia de sesión del refresh token o, en su defecto, del access token"""
+    refresh_token = request.cookies.get("refresh_token")
+    claims = auth.verify_refresh_token(refresh_token) if refresh_token else None
+    if claims is not None:
+        return claims[1]
+    access_token = request.cookies.get("access_token")
+    payload = auth.decode_token(access_token) if access_token else None
+    try:
+        return UUID(payload["sid"])
+    except (TypeError, KeyError, ValueError):
+        return None
+
+
+@app.post("/login", response_model=schema.LoginResponse, tags=["authentication"])
+async def login(
+    form_data: schema.Login,
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_session),
+):
+    """
+    Iniciar sesión con credenciales
+
+    - **username**: Nombre de usuario o email
+    - **password**: Contraseña del usuario
+
+    Retorna cookies HTTP-only con tokens de acceso y refresh. Si el hash de
+    la contraseña no cumple la política actual, se regenera en segundo plano.
+
+    Sujeto a control de admisión: 429 o 503 con `Retry-After` si se superan
+    los límites configurados.
+    """
+    async with admission.admit("login", request, form_data.username):
+        user = await auth.authenticate_user_async(
+            db,
+            form_data.username,
+            form_data.password,
+            on_rehash=lambda user_id, new_hash: background_tasks.add_task(
+                rehash_password, user_id, new_hash
+            ),
+        )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    # Copia desacoplada de la sesión: el commit de la sesión de refresh
+    # expiraría el objeto ORM y forzaría otro SELECT
+    user = schema.User.model_validate(user)
+    session = await run_db(
+        users_crud.create_refresh_session, db, user.id, auth.refresh_token_expiry()
     )
+    set_session_cookies(response, user, session)
 
     # Solo devolver información del usuario, NO los tokens
     return {"message": "Login successful", "user": user}
@@ -185,12 +558,15 @@ async def login(
 
 @app.post("/refresh", tags=["authentication"])
 async def refresh_token_(
-    request: Request, response: Response, db: Session = Depends(get_db)
+    request: Request, response: Response, db: Session = Depends(get_session)
 ):
     """
     Renovar token de acceso usando refresh token
 
     Utiliza el refresh token almacenado en cookies para generar un nuevo access token.
+
+    El refresh token se rota en cada llamada. Presentar uno ya rotado se trata
+    como un robo: se revoca la sesión entera y se responde 401.
     """
     # Leer refresh token desde cookie
     refresh_token = request.cookies.get("refresh_token")
@@ -200,55 +576,74 @@ async def refresh_token_(
             detail="Refresh token not found in cookies",
         )
 
-    user_id = auth.verify_token(refresh_token)
-    if user_id is None:
+    claims = auth.verify_refresh_token(refresh_token)
+    if claims is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
         )
+    jti, _ = claims
 
-    user = crud.get_user(db, user_id)
+    # Rotación: el token presentado deja de ser válido
+    session = await run_db(
+        users_crud.rotate_refresh_session, db, jti, auth.refresh_token_expiry()
+    )
+    if session is None:
+        reused_family = await run_db(users_crud.revoke_reused_family, db, jti)
+        if reused_family is not None:
+            sessions.revoked.add(reused_family)
+            metrics.auth_token_failures.labels("reused").inc()
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token reuse detected",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+        )
+
+    user = user_cache.get(session.user_id)
+    if user is None:
+        user = await run_db(users_crud.get_user, db, session.user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    # Crear nuevos tokens
-    new_access_token = auth.create_access_token(data={"sub": str(user.id)})
-    new_refresh_token = auth.create_refresh_token(data={"sub": str(user.id)})
-
-    # Actualizar cookies
-    response.set_cookie(
-        key="access_token",
-        value=new_access_token,
-        httponly=True,
-        secure=False,  # True en producción
-        samesite="lax",
-        max_age=15 * 60,  # 15 minutos
-    )
-    response.set_cookie(
-        key="refresh_token",
-        value=new_refresh_token,
-        httponly=True,
-        secure=False,  # True en producción
-        samesite="lax",
-        max_age=7 * 24 * 60 * 60,  # 7 días
-    )
-
+    set_session_cookies(response, user, session)
     return {"message": "Tokens refreshed successfully"}
 
 
 @app.post("/logout", tags=["authentication"])
-async def logout(response: Response):
+async def logout(
+    request: Request, response: Response, db: Session = Depends(get_session)
+):
     """
     Cerrar sesión del usuario
 
-    Elimina las cookies de autenticación (access_token y refresh_token).
+    Revoca la sesión en el servidor (el refresh token y los access tokens
+    emitidos en ella dejan de ser válidos) y elimina las cookies de
+    autenticación (access_token y refresh_token).
     """
+    family_id = _session_family(request)
+    if family_id is not None:
+        await run_db(users_crud.revoke_session_family, db, family_id)
+        sessions.revoked.add(family_id)
     response.delete_cookie(key="access_token")
     response.delete_cookie(key="refresh_token")
     return {"message": "Successfully logged out"}
 
 
+@app.get("/.well-known/jwks.json", tags=["authentication"])
+async def jwks(response: Response):
+    """
+    Claves públicas de verificación (JWKS)
+
+    Permite a otros servicios verificar los tokens localmente usando el
+    ``kid`` de la cabecera. Vacío cuando se firma con HMAC (HS*).
+    """
+    response.headers["Cache-Control"] = f"public, max-age={JWKS_MAX_AGE}"
+    return auth.keyring.jwks()
+
+
 # Endpoints de salud y testing
 @app.get("/", tags=["health"])
 async def root():
@@ -266,8 +661,106 @@ async def root():
     }
 
 
+@app.get("/ready", tags=["health"])
+async def readiness(response: Response):
+    """
+    Disponibilidad para recibir tráfico (readiness)
+
+    503 mientras el proceso arranca o se apaga, o si la base de datos no
+    responde. Incluye el tiempo desde la importación hasta estar listo.
+    """
+    ready = startup.state.ready and await startup.database_available()
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {
+        "status": "ready" if ready else "unavailable",
+        "import_to_ready_seconds": startup.state.import_to_ready,
+        "startup_seconds": startup.state.startup_seconds,
+    }
+
+
+@app.get("/health/db", tags=["health"])
+async def database_health():
+    """
+    Estado del pool de conexiones
+
+    Conexiones en uso, overflow, histograma de espera de checkout y ritmo de
+    creación de conexiones. Útil para dimensionar max_connections por réplica.
+    Incluye el estado (salud, retraso, lecturas) de las réplicas de lectura.
+    """
+    return {
+        "status": "healthy",
+        "pools": get_pool_status(),
+        "replicas": replicas.replica_set.status(),
+    }
+
+
+@app.get("/health/cache", tags=["health"])
+async def cache_health():
+    """
+    Estado de las cachés
+
+    Aciertos, fallos y ocupación de las cachés de usuarios y de tokens
+    verificados usadas por las rutas autenticadas.
+    """
+    return {
+        "status": "healthy",
+        "user_cache": user_cache.stats(),
+        "token_cache": token_cache.stats(),
+    }
+
+
+@app.get("/health/admission", tags=["health"])
+async def admission_health():
+    """
+    Estado del control de admisión
+
+    Concurrencia activa, cola de espera, rechazos (503) y limitación de tasa
+    (429) de cada ruta protegida.
+    """
+    return {"status": "healthy", "routes": admission.stats()}
+
+
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """
+    Métricas en formato de texto de Prometheus
+
+    Peticiones y latencia por ruta y código, peticiones en curso, logins,
+    tokens rechazados, tiempo de bcrypt, consultas SQL, pool, cachés y
+    control de admisión. Los valores son por proceso (por worker).
+    """
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get(
+    "/debug/profiles",
+    tags=["health"],
+    response_class=PlainTextResponse,
+    dependencies=[Depends(auth.require_admin)],
+)
+async def debug_profiles(route: Optional[str] = None):
+    """
+    Perfiles de peticiones muestreadas (requiere X-Admin-Token)
+
+    - **route**: Filtrar por plantilla de ruta (p. ej. `/login`)
+
+    Devuelve las pilas agregadas en formato "collapsed stacks", listo para
+    `flamegraph.pl` o speedscope. Requiere `PROFILING_ENABLED`; las peticiones
+    se perfilan según `PROFILING_SAMPLE_RATE` o con la cabecera
+    `X-Profile-Token` igual a la clave de administración.
+    """
+    if not profiling.PROFILING_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profiling is disabled"
+        )
+    return PlainTextResponse(profiling.collapsed(route))
+
+
 @app.get("/protected", tags=["health"])
-async def protected_route(current_user: schema.User = Depends(auth.get_current_user)):
+async def protected_route(
+    current_user: schema.User = Depends(auth.get_current_principal),
+):
     """
     Endpoint protegido de ejemplo
 
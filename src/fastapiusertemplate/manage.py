@@ -0,0 +1,30 @@
+"""
+Comandos de administración de FastAPI User Template.
+
+La aplicación no crea tablas al importarse ni (por defecto) al arrancar; el
+esquema se crea una vez por despliegue con::
+
+    fastapiusertemplate-manage create-schema
+    python -m fastapiusertemplate.manage create-schema
+"""
+
+import argparse
+import sys
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Administración de la aplicación")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("create-schema", help="Crear las tablas que falten")
+    args = parser.parse_args(argv)
+
+    if args.command == "create-schema":
+        from .startup import create_schema
+
+        create_schema()
+        print("Schema created")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""
+Métricas en formato de texto de Prometheus, sin dependencias externas.
+
+Las métricas se registran en ``registry`` y se sirven en ``/metrics``. Para
+que registrar sea barato incluso desde varios hilos (pool de BD, executor de
+hashing), cada serie guarda un fragmento por hilo que solo escribe ese hilo:
+no hay locks en el camino caliente y los fragmentos se suman al exportar.
+
+Classes:
+    Counter: Contador monótono
+    Gauge: Valor que sube y baja
+    Histogram: Histograma acumulativo con buckets fijos
+    CallbackGauge: Gauge calculado al exportar (estado del pool, cachés, ...)
+    CallbackCounter: Contador calculado al exportar
+    MetricsMiddleware: Middleware ASGI con peticiones, latencia y en curso
+"""
+
+import bisect
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Registry:
+    """Conjunto de métricas exportadas en ``/metrics``."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Duplicate metric {metric.name!r}")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class _Series:
+    """Valores de una combinación de etiquetas, fragmentados por hilo."""
+
+    __slots__ = ("_shards", "_size")
+
+    def __init__(self, size: int):
+        self._shards = {}
+        self._size = size
+
+    def _shard(self) -> list:
+        ident = threading.get_ident()
+        shard = self._shards.get(ident)
+        if shard is None:
+            shard = self._shards[ident] = [0.0] * self._size
+        return shard
+
+    def totals(self) -> list:
+        totals = [0.0] * self._size
+        for shard in list(self._shards.values()):
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames=(), registry=registry):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        registry.register(self)
+
+    def labels(self, *values):
+        """Serie para los valores de etiqueta dados (en el orden declarado)"""
+        series = self._series.get(values)
+        if series is None:
+            series = self._series.setdefault(values, self._new_series())
+        return series
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def render(self):
+        raise NotImplementedError
+
+
+class _CounterSeries(_Series):
+    __slots__ = ()
+
+    def inc(self, amount: float = 1.0):
+        self._shard()[0] += amount
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_series(self):
+        return _CounterSeries(1)
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def render(self):
+        for values, series in list(self._series.items()):
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}{labels} {_format_value(series.totals()[0])}"
+
+
+class _GaugeSeries(_CounterSeries):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0):
+        self._shard()[0] -= amount
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def _new_series(self):
+        return _GaugeSeries(1)
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+
+class _HistogramSeries(_Series):
+    # Fragmento: [cuenta por bucket..., cuenta +Inf, suma]
+    __slots__ = ("_buckets",)
+
+    def __init__(self, buckets):
+        super().__init__(len(buckets) + 2)
+        self._buckets = buckets
+
+    def observe(self, value: float):
+        shard = self._shard()
+        shard[bisect.bisect_left(self._buckets, value)] += 1
+        shard[-1] += value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames=(),
+        buckets=LATENCY_BUCKETS,
+        registry=registry,
+    ):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help, labelnames, registry)
+
+    def _new_series(self):
+        return _HistogramSeries(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def render(self):
+        for values, series in list(self._series.items()):
+            totals = series.totals()
+            running = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), totals[:-1]):
+                running += count
+                labels = _format_labels(
+                    self.labelnames, values, f'le="{_format_value(bound)}"'
+                )
+                yield f"{self.name}_bucket{labels} {_format_value(running)}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(totals[-1])}"
+            yield f"{self.name}_count{labels} {_format_value(running)}"
+
+
+class CallbackGauge(_Metric):
+    """
+    Gauge cuyo valor se calcula al exportar. ``callback`` devuelve pares
+    ``(valores de etiqueta, valor)``.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames, callback, registry=registry):
+        self.callback = callback
+        super().__init__(name, help, labelnames, registry)
+
+    def render(self):
+        for values, value in self.callback():
+            if value is not None:
+                labels = _format_labels(self.labelnames, values)
+                yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class CallbackCounter(CallbackGauge):
+    """Como CallbackGauge, para contadores mantenidos en otro módulo."""
+
+    type = "counter"
+
+
+# Métricas HTTP (MetricsMiddleware)
+http_requests = Counter(
+    "http_requests_total",
+    "Peticiones HTTP por ruta, método y código de estado",
+    ("method", "route", "status"),
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Latencia de las peticiones HTTP por ruta, método y código de estado",
+    ("method", "route", "status"),
+)
+http_in_flight = Gauge(
+    "http_requests_in_flight", "Peticiones HTTP en curso en este proceso"
+)
+
+# Métricas de base de datos (query_stats.instrument_engine)
+db_queries = Counter(
+    "db_queries_total", "Consultas SQL ejecutadas por tipo", ("operation",)
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds",
+    "Duración de las consultas SQL por tipo",
+    ("operation",),
+    buckets=QUERY_BUCKETS,
+)
+
+
+# Métricas de autenticación (auth)
+auth_logins = Counter(
+    "auth_login_attempts_total", "Intentos de login por resultado", ("result",)
+)
+auth_token_failures = Counter(
+    "auth_token_verification_failures_total",
+    "Tokens rechazados al verificarlos, por motivo",
+    ("reason",),
+)
+password_hash_duration = Histogram(
+    "password_hash_duration_seconds",
+    "Tiempo de hash/verificación de contraseñas, incluida la espera en el executor",
+    ("operation",),
+    buckets=HASH_BUCKETS,
+)
+
+
+def route_label(scope) -> str:
+    """Plantilla de la ruta resuelta (``/users/{user_id}``) o ``unmatched``"""
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro: cuenta peticiones y mide su latencia etiquetadas
+    por la plantilla de la ruta (``/users/{user_id}``), no por la URL, para
+    mantener acotado el número de series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = http_in_flight.labels()
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight.dec()
+            labels = (scope["method"], route_label(scope), str(status_code))
+            http_requests.labels(*labels).inc()
+            http_request_duration.labels(*labels).observe(elapsed)
@@ -6,11 +6,12 @@ utilizados por la aplicación para gestionar usuarios y autenticación.
 
 Classes:
     User: Modelo principal de usuario con autenticación
+    RefreshSession: Refresh token emitido (rotación y revocación de sesiones)
 """
 
 import uuid
 
-from sqlalchemy import UUID, Column, String
+from sqlalchemy import UUID, Column, DateTime, ForeignKey, Integer, String
 
 from .database import Base
 
@@ -28,11 +29,16 @@ class User(Base):
         email (str): Email único del usuario, usado para login
         username (str): Nombre de usuario único, también usado para login
         hashed_password (str): Contraseña hasheada con bcrypt
+        version (int): Versión de la fila; el ORM la incrementa en cada
+            UPDATE y se usa para los ETags de las respuestas
 
     Note:
-        - El email y username deben ser únicos en la base de datos
+        - El email y username son únicos en la base de datos (índices únicos);
+          el registro depende de estas restricciones para detectar duplicados
         - La contraseña se almacena hasheada por seguridad
         - Se usa UUID como primary key para mejor escalabilidad
+        - Las actualizaciones con ``update()`` de Core deben incrementar
+          ``version`` explícitamente
     """
 
     __tablename__ = "users"
@@ -45,5 +51,41 @@ class User(Base):
         nullable=False,
     )
     email = Column(String, unique=True, index=True)
-    username = Column(String, index=True)
+    username = Column(String, unique=True, index=True)
     hashed_password = Column(String)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+class RefreshSession(Base):
+    """
+    Refresh token emitido, identificado por su ``jti``.
+
+    Cada ``/refresh`` marca la sesión como reemplazada y crea la siguiente de
+    la misma familia (rotación). Presentar un token ya reemplazado indica que
+    ha sido robado y revoca la familia entera.
+
+    Attributes:
+        jti (UUID): Identificador del refresh token (claim ``jti``)
+        family_id (UUID): Sesión de login a la que pertenece el token (claim
+            ``sid`` de los access y refresh tokens)
+        user_id (UUID): Usuario de la sesión
+        expires_at (datetime): Expiración del refresh token
+        replaced_by (UUID): ``jti`` del token que lo sustituyó al rotar
+        revoked_at (datetime): Momento de la revocación (logout o reutilización)
+    """
+
+    __tablename__ = "refresh_sessions"
+
+    jti = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    family_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    replaced_by = Column(UUID(as_uuid=True))
+    revoked_at = Column(DateTime(timezone=True), index=True)
@@ -0,0 +1,26 @@
+"""
+Paginación por cursor (keyset) para FastAPI User Template.
+
+En lugar de ``OFFSET``, cada página continúa a partir del último ``id`` de la
+anterior (``WHERE id > :cursor ORDER BY id LIMIT :limit``), de modo que la
+base de datos usa el índice de la primary key y el coste de una página no
+depende de su profundidad. El cursor es opaco para los clientes.
+"""
+
+import base64
+import binascii
+import uuid
+
+
+def encode_cursor(user_id: uuid.UUID) -> str:
+    """Cursor opaco que apunta al usuario ``user_id``"""
+    return base64.urlsafe_b64encode(user_id.bytes).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> uuid.UUID:
+    """Recuperar el id de un cursor; ValueError si el cursor no es válido"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return uuid.UUID(bytes=raw)
+    except (binascii.Error, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
@@ -0,0 +1,152 @@
+"""
+Política de hashing de contraseñas para FastAPI User Template.
+
+El esquema y el coste se configuran por entorno. Los hashes almacenados con
+un esquema obsoleto o con un coste distinto del configurado se marcan como
+desactualizados (``needs_update``) y se regeneran de forma transparente en el
+siguiente login correcto, sin migraciones masivas: basta con cambiar
+``PASSWORD_HASH_ROUNDS`` para subir o bajar el coste.
+
+Variables de entorno:
+    PASSWORD_HASH_SCHEMES: Esquemas aceptados separados por comas; el primero
+        se usa para los hashes nuevos y el resto se migran al verificarse
+        (por defecto ``bcrypt``)
+    PASSWORD_HASH_ROUNDS: Coste del esquema principal (``rounds`` de passlib;
+        para bcrypt, log2 de las iteraciones). Sin configurar se usa el valor
+        por defecto de passlib
+
+Calibrar el coste para una latencia objetivo en esta máquina::
+
+    python -m fastapiusertemplate.passwords calibrate --target-ms 250
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from passlib.context import CryptContext
+
+# Rango de costes que se prueban al calibrar cada esquema
+CALIBRATION_ROUNDS = {"bcrypt": range(4, 17), "sha256_crypt": range(5000, 10**6, 5000)}
+
+PASSWORD_HASH_SCHEMES = [
+    scheme.strip()
+    for scheme in os.getenv("PASSWORD_HASH_SCHEMES", "bcrypt").split(",")
+    if scheme.strip()
+]
+PASSWORD_HASH_ROUNDS = (
+    int(os.environ["PASSWORD_HASH_ROUNDS"])
+    if os.getenv("PASSWORD_HASH_ROUNDS")
+    else None
+)
+
+
+def build_context(schemes: list[str], rounds: int | None = None) -> CryptContext:
+    """
+    Crear el contexto de hashing para ``schemes`` (el primero es el activo).
+
+    Con ``rounds``, los hashes del esquema activo con otro coste (mayor o
+    menor) se consideran desactualizados.
+    """
+    settings = {}
+    if rounds is not None:
+        scheme = schemes[0]
+        settings = {
+            f"{scheme}__default_rounds": rounds,
+            f"{scheme}__min_rounds": rounds,
+            f"{scheme}__max_rounds": rounds,
+        }
+    return CryptContext(schemes=schemes, deprecated="auto", **settings)
+
+
+pwd_context = build_context(PASSWORD_HASH_SCHEMES, PASSWORD_HASH_ROUNDS)
+
+
+def load_backends():
+    """
+    Cargar el backend de cada esquema (p. ej. la librería bcrypt y sus
+    comprobaciones iniciales) sin hashear nada, para que no lo pague el
+    primer login. Se ejecuta en cada worker del executor de hashing al arrancar.
+    """
+    for scheme in pwd_context.schemes():
+        handler = pwd_context.handler(scheme)
+        if hasattr(handler, "get_backend"):
+            handler.get_backend()
+
+
+def _timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(scheme: str, rounds: int, samples: int = 3) -> dict:
+    """Medir la mediana en ms de hash y verificación con ``scheme``/``rounds``"""
+    context = build_context([scheme], rounds)
+    hashed = context.hash("calibration-password")
+    return {
+        "rounds": rounds,
+        "hash_ms": round(
+            statistics.median(
+                _timed(context.hash, "calibration-password") for _ in range(samples)
+            ),
+            2,
+        ),
+        "verify_ms": round(
+            statistics.median(
+                _timed(context.verify, "calibration-password", hashed)
+                for _ in range(samples)
+            ),
+            2,
+        ),
+    }
+
+
+def calibrate(target_ms: float, scheme: str = "bcrypt", samples: int = 3) -> dict:
+    """
+    Medir costes crecientes hasta superar ``target_ms`` por verificación y
+    recomendar el mayor coste que no lo supera (el mínimo probado si ninguno).
+    """
+    if scheme not in CALIBRATION_ROUNDS:
+        raise ValueError(f"Calibration not supported for scheme {scheme!r}")
+    measurements = []
+    for rounds in CALIBRATION_ROUNDS[scheme]:
+        measurements.append(measure(scheme, rounds, samples))
+        if measurements[-1]["verify_ms"] > target_ms:
+            break
+    within = [m for m in measurements if m["verify_ms"] <= target_ms]
+    recommended = (within[-1] if within else measurements[0])["rounds"]
+    return {
+        "scheme": scheme,
+        "target_ms": target_ms,
+        "recommended_rounds": recommended,
+        "current_rounds": PASSWORD_HASH_ROUNDS,
+        "measurements": measurements,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Política de hashing de contraseñas")
+    commands = parser.add_subparsers(dest="command", required=True)
+    calibrate_parser = commands.add_parser(
+        "calibrate", help="Recomendar un coste para una latencia objetivo"
+    )
+    calibrate_parser.add_argument("--target-ms", type=float, default=250.0)
+    calibrate_parser.add_argument("--scheme", default=PASSWORD_HASH_SCHEMES[0])
+    calibrate_parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    report = calibrate(args.target_ms, args.scheme, args.samples)
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write(
+        f"\n\nPASSWORD_HASH_SCHEMES={args.scheme}"
+        f"\nPASSWORD_HASH_ROUNDS={report['recommended_rounds']}\n"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
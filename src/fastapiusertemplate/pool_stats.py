@@ -0,0 +1,158 @@
+"""
+Instrumentación del pool de conexiones de SQLAlchemy.
+
+Registra eventos del pool (``connect``, ``checkout``, ``checkin``) y mide el
+tiempo de espera para obtener una conexión, de modo que se pueda dimensionar
+``max_connections`` de PostgreSQL por réplica con datos reales.
+
+Classes:
+    Histogram: Histograma acumulativo de latencias
+    PoolStats: Contadores y métricas de un pool
+    InstrumentedQueuePool: QueuePool que mide la espera de checkout
+    InstrumentedAsyncAdaptedQueuePool: Equivalente para el motor asíncrono
+"""
+
+import bisect
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+WAIT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class Histogram:
+    """Histograma con buckets fijos (límites superiores en segundos)."""
+
+    def __init__(self, buckets=WAIT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = self.count
+        return {"buckets": cumulative, "sum": round(self.sum, 6), "count": self.count}
+
+
+class PoolStats:
+    """Métricas acumuladas de un pool de conexiones."""
+
+    RATE_WINDOW_SECONDS = 60
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections_created = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.checkout_wait = Histogram()
+        self._recent_connects = deque()
+
+    def record_connect(self):
+        now = time.monotonic()
+        with self._lock:
+            self.connections_created += 1
+            self._recent_connects.append(now)
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkout_wait.observe(seconds)
+
+    def connections_per_minute(self) -> int:
+        cutoff = time.monotonic() - self.RATE_WINDOW_SECONDS
+        with self._lock:
+            while self._recent_connects and self._recent_connects[0] < cutoff:
+                self._recent_connects.popleft()
+            return len(self._recent_connects)
+
+    def snapshot(self, pool) -> dict:
+        data = {
+            "pool_class": type(pool).__name__,
+            "connections_created_total": self.connections_created,
+            "connections_created_last_minute": self.connections_per_minute(),
+            "checkouts_total": self.checkouts,
+            "checkins_total": self.checkins,
+        }
+        if isinstance(pool, QueuePool):
+            data.update(
+                {
+                    "size": pool.size(),
+                    "checked_out": pool.checkedout(),
+                    "checked_in": pool.checkedin(),
+                    "overflow_in_use": max(pool.overflow(), 0),
+                }
+            )
+        with self._lock:
+            data["checkout_wait_seconds"] = self.checkout_wait.snapshot()
+        return data
+
+
+class _CheckoutTimingMixin:
+    """Mide el tiempo que tarda el pool en entregar una conexión."""
+
+    stats: PoolStats | None = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.stats is not None:
+                self.stats.record_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        new_pool = super().recreate()
+        new_pool.stats = self.stats
+        return new_pool
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_pool(pool) -> PoolStats:
+    """Registrar los eventos de instrumentación en ``pool`` y devolver sus métricas."""
+    stats = PoolStats()
+    if isinstance(pool, _CheckoutTimingMixin):
+        pool.stats = stats
+    event.listen(pool, "connect", lambda *args: stats.record_connect())
+    event.listen(pool, "checkout", lambda *args: stats.record_checkout())
+    event.listen(pool, "checkin", lambda *args: stats.record_checkin())
+    return stats
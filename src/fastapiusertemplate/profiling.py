@@ -0,0 +1,233 @@
+"""
+Profiler por muestreo opcional para peticiones en producción.
+
+Desactivado por defecto: sin ``PROFILING_ENABLED`` no se instala el
+middleware ni se arranca ningún hilo, así que el coste es nulo.
+
+Activado, se perfila una fracción de las peticiones (``PROFILING_SAMPLE_RATE``)
+y cualquier petición con la cabecera ``X-Profile-Token`` igual a
+``ADMIN_API_KEY``. Mientras dura la petición, un hilo muestreador lee las
+pilas con ``sys._current_frames()`` cada ``PROFILING_INTERVAL_MS``:
+
+- Del hilo del event loop, solo cuando la tarea en ejecución es la de la
+  petición perfilada (las demás peticiones comparten ese hilo).
+- De los hilos del pool de BD y del executor de hashing mientras ejecutan
+  trabajo de la petición (``concurrency`` los marca con ``bind``). Con
+  ``PASSWORD_HASH_EXECUTOR=process`` el hashing no se muestrea.
+
+Las ``PROFILING_TOP_STACKS`` pilas más frecuentes de cada petición se guardan
+en un buffer circular de ``PROFILING_BUFFER_SIZE`` perfiles y se exponen en
+``/debug/profiles`` en formato "collapsed stacks" (``flamegraph.pl``,
+speedscope, ...).
+"""
+
+import asyncio
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from .metrics import route_label
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "2"))
+PROFILING_BUFFER_SIZE = int(os.getenv("PROFILING_BUFFER_SIZE", "100"))
+PROFILING_TOP_STACKS = int(os.getenv("PROFILING_TOP_STACKS", "50"))
+
+PROFILE_HEADER = b"x-profile-token"
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{code.co_name} ({module}:{code.co_firstlineno})"
+
+
+def collapse(frame) -> str:
+    """Pila de ``frame`` en formato collapsed: raíz primero, separada por ``;``"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class RequestProfile:
+    """Muestras de una petición en curso."""
+
+    def __init__(self, task: asyncio.Task, loop_thread: int):
+        self.task = task
+        self.loop_thread = loop_thread
+        self.threads: dict[int, str] = {}
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+    def sample(self, frames: dict):
+        current = asyncio.current_task(self.task.get_loop())
+        if current is self.task and self.loop_thread in frames:
+            self.stacks[collapse(frames[self.loop_thread])] += 1
+            self.samples += 1
+        for ident, name in list(self.threads.items()):
+            if ident in frames:
+                self.stacks[f"{name};{collapse(frames[ident])}"] += 1
+                self.samples += 1
+
+
+@dataclass
+class ProfileRecord:
+    """Perfil terminado guardado en el buffer circular."""
+
+    method: str
+    route: str
+    status: int
+    duration_ms: float
+    samples: int
+    stacks: list[tuple[str, int]]
+
+
+class Sampler:
+    """Hilo que muestrea las pilas mientras haya peticiones perfiladas."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._active: set[RequestProfile] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._active.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="profiling-sampler", daemon=True
+                )
+                self._thread.start()
+            self._wake.set()
+
+    def remove(self, profile: RequestProfile):
+        with self._lock:
+            self._active.discard(profile)
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            self._wake.wait()
+            with self._lock:
+                profiles = list(self._active)
+                if not profiles:
+                    self._wake.clear()
+                    continue
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            frames.pop(own, None)
+            for profile in profiles:
+                profile.sample(frames)
+
+
+_current: ContextVar[RequestProfile | None] = ContextVar("profile", default=None)
+sampler = Sampler(PROFILING_INTERVAL_MS / 1000)
+profiles: deque[ProfileRecord] = deque(maxlen=PROFILING_BUFFER_SIZE)
+
+
+def bind(func, thread_label: str):
+    """
+    Envolver ``func`` para que el hilo que la ejecute se muestree como parte
+    de la petición perfilada en curso. Sin perfil activo devuelve ``func``.
+    """
+    if not PROFILING_ENABLED:
+        return func
+    profile = _current.get()
+    if profile is None:
+        return func
+
+    def wrapper(*args, **kwargs):
+        ident = threading.get_ident()
+        profile.threads[ident] = thread_label
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.threads.pop(ident, None)
+
+    return wrapper
+
+
+def collapsed(route: str | None = None) -> str:
+    """
+    Pilas agregadas de los perfiles guardados, una por línea con su número de
+    muestras. La raíz de cada pila es ``MÉTODO ruta``.
+    """
+    totals = Counter()
+    for record in list(profiles):
+        if route is not None and record.route != route:
+            continue
+        for stack, count in record.stacks:
+            totals[f"{record.method} {record.route};{stack}"] += count
+    return "".join(f"{stack} {count}\n" for stack, count in totals.most_common())
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI que perfila las peticiones muestreadas o autorizadas.
+
+    ``admin_key`` es una función que devuelve la clave de administración
+    vigente (o None) para validar la cabecera ``X-Profile-Token``.
+    """
+
+    def __init__(self, app, admin_key=lambda: None):
+        self.app = app
+        self.admin_key = admin_key
+
+    def _should_profile(self, scope) -> bool:
+        if PROFILING_SAMPLE_RATE and random.random() < PROFILING_SAMPLE_RATE:
+            return True
+        key = self.admin_key()
+        if not key:
+            return False
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return hmac.compare_digest(value, key.encode())
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        profile = RequestProfile(asyncio.current_task(), threading.get_ident())
+        token = _current.set(profile)
+        sampler.add(profile)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.remove(profile)
+            _current.reset(token)
+            profiles.append(
+                ProfileRecord(
+                    method=scope["method"],
+                    route=route_label(scope),
+                    status=status_code,
+                    duration_ms=round((time.perf_counter() - start) * 1000, 3),
+                    samples=profile.samples,
+                    stacks=profile.stacks.most_common(PROFILING_TOP_STACKS),
+                )
+            )
@@ -0,0 +1,199 @@
+"""
+Contabilidad de consultas SQL por petición para FastAPI User Template.
+
+``QueryStatsMiddleware`` abre un contexto por petición (``contextvars``, que
+se propaga al pool de hilos de BD y a las sesiones asíncronas) y los eventos
+de cursor de SQLAlchemy suman en él las consultas y su duración. Al terminar
+la petición:
+
+- Se registra el número de consultas por ruta en la métrica
+  ``http_request_db_queries``.
+- Se avisa en el log si una misma sentencia se repite más de
+  ``QUERY_REPEAT_THRESHOLD`` veces (patrón N+1).
+
+Independientemente de la petición, cada consulta suma en las métricas
+``db_queries_total`` y ``db_query_duration_seconds``, y toda consulta que
+tarde más de ``SLOW_QUERY_MS`` se registra en el log con su sentencia. Un
+único par de eventos (y una sola medida de tiempo) alimenta todo ello.
+
+Para tests, ``capture_queries`` y ``assert_max_queries`` capturan todas las
+consultas ejecutadas mientras están activos (en cualquier hilo), de modo que
+funcionan con ``TestClient``::
+
+    with assert_max_queries(1):
+        client.get("/me")
+
+Las consultas de tareas de mantenimiento en segundo plano (dentro de
+``background_queries``) no pertenecen a ninguna petición y no se capturan.
+
+Variables de entorno:
+    SLOW_QUERY_MS: Umbral de consulta lenta en milisegundos (por defecto 200)
+    QUERY_REPEAT_THRESHOLD: Repeticiones de una sentencia en una petición a
+        partir de las cuales se avisa de un posible N+1 (por defecto 10)
+"""
+
+import logging
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+
+from .metrics import Histogram, db_queries, db_query_duration, route_label
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "10"))
+
+request_queries = Histogram(
+    "http_request_db_queries",
+    "Consultas SQL emitidas por petición",
+    ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+
+
+@dataclass
+class QueryLog:
+    """
+    Consultas registradas en un ámbito (una petición o una captura de test).
+
+    Attributes:
+        count (int): Número de consultas
+        duration (float): Tiempo total en la BD en segundos
+        statements (Counter): Repeticiones de cada sentencia SQL
+    """
+
+    count: int = 0
+    duration: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.duration += elapsed
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Sentencias ejecutadas más de ``threshold`` veces"""
+        return [(sql, n) for sql, n in self.statements.items() if n > threshold]
+
+
+_current: ContextVar[QueryLog | None] = ContextVar("request_queries", default=None)
+_captures: list[QueryLog] = []
+_background: ContextVar[bool] = ContextVar("background_queries", default=False)
+
+
+def current_queries() -> QueryLog | None:
+    """Consultas de la petición en curso (None fuera de una petición)"""
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_stats_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_stats_start"].pop()
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+    db_queries.labels(operation).inc()
+    db_query_duration.labels(operation).observe(elapsed)
+    log = _current.get()
+    if log is not None:
+        log.record(statement, elapsed)
+    if not _background.get():
+        for capture in _captures:
+            capture.record(statement, elapsed)
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, statement)
+
+
+def _handle_error(exception_context):
+    # La consulta falló: after_cursor_execute no se llamará
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_stats_start"):
+        conn.info["query_stats_start"].pop()
+
+
+def instrument_engine(engine):
+    """
+    Medir las consultas de ``engine`` (motor síncrono subyacente): métricas
+    Prometheus, consultas por petición y consultas lentas
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class QueryStatsMiddleware:
+    """Middleware ASGI que abre el contexto de consultas de cada petición."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log = QueryLog()
+        token = _current.set(log)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            method, route = scope["method"], route_label(scope)
+            request_queries.labels(method, route).observe(log.count)
+            logger.debug(
+                "%s %s: %d queries in %.1f ms",
+                method,
+                route,
+                log.count,
+                log.duration * 1000,
+            )
+            for statement, times in log.repeated(QUERY_REPEAT_THRESHOLD):
+                logger.warning(
+                    "Possible N+1 in %s %s: statement executed %d times: %s",
+                    method,
+                    route,
+                    times,
+                    statement,
+                )
+
+
+@contextmanager
+def background_queries():
+    """Marcar las consultas del bloque como mantenimiento en segundo plano"""
+    token = _background.set(True)
+    try:
+        yield
+    finally:
+        _background.reset(token)
+
+
+@contextmanager
+def capture_queries():
+    """Capturar todas las consultas ejecutadas dentro del bloque (tests)"""
+    log = QueryLog()
+    _captures.append(log)
+    try:
+        yield log
+    finally:
+        _captures.remove(log)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """Fallar si el bloque ejecuta más de ``limit`` consultas"""
+    with capture_queries() as log:
+        yield log
+    if log.count > limit:
+        statements = "\n".join(
+            f"  {times}x {sql}" for sql, times in log.statements.items()
+        )
+        raise AssertionError(
+            f"Expected at most {limit} queries, got {log.count}:\n{statements}"
+        )
@@ -0,0 +1,233 @@
+"""
+Enrutado de lecturas a réplicas de la base de datos.
+
+Con ``DATABASE_REPLICA_URLS`` configurado, las dependencias de solo lectura
+(``get_read_session``) obtienen una sesión de una réplica elegida por turnos
+entre las sanas; sin réplicas, o si ninguna está sana, usan el primario. Las
+escrituras y las rutas que deben leer lo recién escrito siguen usando
+``database.get_session``.
+
+Salud y retraso:
+
+- Una tarea en segundo plano comprueba cada réplica cada
+  ``REPLICA_CHECK_SECONDS`` y la retira si no responde o si su retraso de
+  replicación supera ``REPLICA_MAX_LAG_SECONDS`` (en PostgreSQL, el tiempo
+  desde la última transacción aplicada con WAL pendiente de aplicar).
+- Un error de desconexión durante una petición la retira de inmediato hasta
+  la siguiente comprobación correcta.
+
+Leer lo escrito: tras una escritura, ``pin_primary`` añade una cookie que
+envía las lecturas de ese cliente al primario durante
+``REPLICA_PIN_SECONDS``.
+
+Variables de entorno:
+    DATABASE_REPLICA_URLS: URLs de las réplicas separadas por comas; las
+        asíncronas se derivan como ``ASYNC_DATABASE_URL``
+    REPLICA_MAX_LAG_SECONDS: Retraso máximo tolerado (por defecto 5)
+    REPLICA_CHECK_SECONDS: Intervalo de comprobación (por defecto 5)
+    REPLICA_PIN_SECONDS: Lecturas en el primario tras escribir (por defecto
+        REPLICA_MAX_LAG_SECONDS)
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+
+from fastapi import Request, Response
+from sqlalchemy import event, make_url, text
+from sqlalchemy.orm import sessionmaker
+
+from . import query_stats
+from .concurrency import run_in_db_thread
+from .database import (
+    DATABASE_ASYNC,
+    AsyncSessionLocal,
+    SessionLocal,
+    build_async_engine,
+    build_engine,
+    to_async_url,
+)
+
+logger = logging.getLogger(__name__)
+
+DATABASE_REPLICA_URLS = [
+    url.strip()
+    for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_CHECK_SECONDS = float(os.getenv("REPLICA_CHECK_SECONDS", "5"))
+REPLICA_PIN_SECONDS = int(
+    os.getenv("REPLICA_PIN_SECONDS", str(int(REPLICA_MAX_LAG_SECONDS)))
+)
+
+PRIMARY_PIN_COOKIE = "db_primary"
+
+# Retraso de replicación en segundos por backend; 0 si el WAL recibido ya
+# está aplicado (un primario sin escrituras no cuenta como retraso)
+LAG_QUERIES = {
+    "postgresql": """
+        SELECT CASE
+            WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(
+                EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+            )
+        END
+    """,
+}
+DEFAULT_LAG_QUERY = "SELECT 0"
+
+
+class Replica:
+    """Una réplica de lectura con sus motores y su estado de salud."""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = url
+        self.engine, self.pool_stats = build_engine(url)
+        self.SessionLocal = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine
+        )
+        self.async_engine = None
+        self.AsyncSessionLocal = None
+        if DATABASE_ASYNC:
+            from sqlalchemy.ext.asyncio import async_sessionmaker
+
+            self.async_engine, _ = build_async_engine(to_async_url(url))
+            self.AsyncSessionLocal = async_sessionmaker(
+                self.async_engine, autoflush=False, expire_on_commit=False
+            )
+        self.lag_query = text(
+            LAG_QUERIES.get(make_url(url).get_backend_name(), DEFAULT_LAG_QUERY)
+        )
+        self.healthy = True
+        self.lag: float | None = None
+        self.error: str | None = None
+        self.reads = 0
+        for target in filter(None, (self.engine, self.async_engine)):
+            sync_engine = getattr(target, "sync_engine", target)
+            event.listen(sync_engine, "handle_error", self._on_error)
+
+    def _on_error(self, context):
+        if context.is_disconnect:
+            self.eject(str(context.original_exception))
+
+    def eject(self, reason: str):
+        if self.healthy:
+            logger.warning("Replica %s ejected: %s", self.name, reason)
+        self.healthy = False
+        self.error = reason
+
+    def check(self):
+        """Comprobar conectividad y retraso (en un hilo, bloqueante)"""
+        try:
+            with self.engine.connect() as conn:
+                lag = float(conn.execute(self.lag_query).scalar() or 0)
+        except Exception as exc:
+            self.eject(str(exc))
+            return
+        self.lag = lag
+        if lag > REPLICA_MAX_LAG_SECONDS:
+            self.eject(f"replication lag {lag:.1f}s")
+            return
+        if not self.healthy:
+            logger.info("Replica %s is healthy again", self.name)
+        self.healthy = True
+        self.error = None
+
+    async def dispose(self):
+        if self.async_engine is not None:
+            await self.async_engine.dispose()
+        self.engine.dispose()
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "error": self.error,
+            "reads": self.reads,
+            "pool": self.pool_stats.snapshot(self.engine.pool),
+        }
+
+
+class ReplicaSet:
+    """Réplicas configuradas y selección por turnos entre las sanas."""
+
+    def __init__(self, urls):
+        self.replicas = [Replica(f"replica-{i}", url) for i, url in enumerate(urls)]
+        self._turn = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self, request: Request | None = None) -> Replica | None:
+        """
+        Réplica para una lectura, o None para usar el primario (sin réplicas
+        sanas o con el cliente fijado al primario tras escribir)
+        """
+        if not self.replicas:
+            return None
+        if request is not None and PRIMARY_PIN_COOKIE in request.cookies:
+            return None
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        replica = healthy[next(self._turn) % len(healthy)]
+        replica.reads += 1
+        return replica
+
+    def check_all(self):
+        for replica in self.replicas:
+            replica.check()
+
+    async def dispose(self):
+        for replica in self.replicas:
+            await replica.dispose()
+
+    def status(self) -> list[dict]:
+        return [replica.status() for replica in self.replicas]
+
+
+replica_set = ReplicaSet(DATABASE_REPLICA_URLS)
+
+
+def pin_primary(response: Response):
+    """Enviar al primario las lecturas del cliente durante REPLICA_PIN_SECONDS"""
+    if replica_set:
+        response.set_cookie(
+            key=PRIMARY_PIN_COOKIE,
+            value="1",
+            httponly=True,
+            samesite="lax",
+            max_age=REPLICA_PIN_SECONDS,
+        )
+
+
+def get_read_db(request: Request):
+    replica = replica_set.choose(request)
+    db = (replica.SessionLocal if replica else SessionLocal)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    replica = replica_set.choose(request)
+    async with (replica.AsyncSessionLocal if replica else AsyncSessionLocal)() as db:
+        yield db
+
+
+# Dependencia de sesión de solo lectura seleccionada por DATABASE_ASYNC
+get_read_session = get_async_read_db if DATABASE_ASYNC else get_read_db
+
+
+async def monitor():
+    """Tarea en segundo plano (lifespan): comprobar las réplicas periódicamente"""
+    with query_stats.background_queries():
+        while True:
+            await run_in_db_thread(replica_set.check_all)
+            await asyncio.sleep(REPLICA_CHECK_SECONDS)
@@ -0,0 +1,70 @@
+"""
+Serialización rápida de las respuestas de usuario.
+
+Con ``response_model``, FastAPI valida el valor devuelto, lo convierte en
+tipos JSON de Python y lo codifica con ``json.dumps``. Las rutas de usuarios
+devuelven en su lugar una respuesta ya codificada: validan con los adaptadores
+precompilados de ``schema`` y generan los bytes JSON directamente en
+pydantic-core. Las rutas conservan su ``response_model``, así que el esquema
+OpenAPI no cambia.
+
+Con ``fields`` (ver ``schema.parse_user_fields``) se serializan solo los
+campos pedidos con los modelos de ``schema.user_projection``.
+
+Variables de entorno:
+    JSON_RESPONSE: Clase de respuesta por defecto del resto de rutas: ``json``
+        (por defecto) u ``orjson`` (``ORJSONResponse``, requiere el paquete
+        ``orjson``, extra ``fast-json``)
+"""
+
+import importlib.util
+import os
+
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+
+from . import schema
+
+JSON_RESPONSE = os.getenv("JSON_RESPONSE", "json").lower()
+
+
+def default_response_class():
+    """Clase de respuesta por defecto de la aplicación según JSON_RESPONSE"""
+    if JSON_RESPONSE == "json":
+        return JSONResponse
+    if JSON_RESPONSE == "orjson":
+        if importlib.util.find_spec("orjson") is None:
+            raise ValueError("JSON_RESPONSE=orjson requires the 'orjson' package")
+        return ORJSONResponse
+    raise ValueError("JSON_RESPONSE must be 'json' or 'orjson'")
+
+
+class EncodedJSONResponse(Response):
+    """Respuesta cuyo contenido ya son bytes JSON"""
+
+    media_type = "application/json"
+
+
+def user_response(user, fields: tuple[str, ...] | None = None) -> Response:
+    """``schema.User`` completo, o la proyección ``fields`` de un usuario o fila"""
+    if fields is None:
+        return EncodedJSONResponse(schema.user_adapter.dump_json(user))
+    projection = schema.user_projection(fields).model_validate(user)
+    return EncodedJSONResponse(projection.model_dump_json())
+
+
+def user_page_response(
+    rows, next_cursor: str | None, fields: tuple[str, ...] | None = None
+) -> Response:
+    """Página de ``/users`` a partir de las filas de ``crud.get_users``"""
+    # Validar diccionarios es varias veces más rápido que leer cada campo como
+    # atributo de un Row (from_attributes)
+    keys = rows[0]._fields if rows else ()
+    items = [dict(zip(keys, row)) for row in rows]
+    if fields is None:
+        page = schema.UserPage.model_construct(
+            items=schema.user_list_adapter.validate_python(items),
+            next_cursor=next_cursor,
+        )
+    else:
+        page = schema.user_projection_page(fields)(items=items, next_cursor=next_cursor)
+    return EncodedJSONResponse(page.model_dump_json())
@@ -9,14 +9,32 @@ Classes:
     CreateUser: Esquema para creación de nuevos usuarios
     Login: Esquema para datos de autenticación
     Token: Esquema para tokens JWT
+    UserPage: Página de usuarios con cursor para la siguiente
+    UserBatchRequest: Ids de usuario a resolver en bloque
+    UserBatch: Usuarios resueltos en bloque e ids inexistentes
     LoginResponse: Esquema de respuesta para login exitoso
     RefreshRequest: Esquema para solicitud de refresh de tokens
+
+Adapters:
+    user_adapter, user_list_adapter: TypeAdapters precompilados de ``User`` y
+        ``list[User]`` para la ruta rápida de serialización (ver ``responses``)
+
+Proyecciones (``fields=``):
+    USER_FIELDS: Campos de usuario que se pueden pedir (lista permitida)
+    parse_user_fields: Validar el parámetro ``fields``
+    user_projection, user_projection_page: Modelos con solo los campos pedidos
 """
 
+import functools
+import os
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, TypeAdapter, create_model
+
+# Máximo de ids por petición en POST /users/batch; se valida al parsear el
+# cuerpo, antes de convertir cada id
+MAX_BATCH_IDS = int(os.getenv("MAX_BATCH_IDS", "1000"))
 
 
 class User(BaseModel):
@@ -30,16 +48,58 @@ class User(BaseModel):
         id (UUID): Identificador único del usuario
         email (str): Email del usuario
         username (str): Nombre de usuario
+        version (Optional[int]): Versión de la fila para los ETags; no se
+            incluye en las respuestas (None si el usuario viene de claims)
     """
 
     id: UUID
     email: str
     username: str
+    version: Optional[int] = Field(default=None, exclude=True)
 
     class Config:
         from_attributes = True
 
 
+class UserPage(BaseModel):
+    """
+    Página de usuarios con paginación por cursor.
+
+    Attributes:
+        items (list[User]): Usuarios de la página, ordenados por id
+        next_cursor (Optional[str]): Cursor opaco de la siguiente página,
+            None si no hay más resultados
+    """
+
+    items: list[User]
+    next_cursor: Optional[str] = None
+
+
+class UserBatchRequest(BaseModel):
+    """
+    Ids de usuario a resolver en bloque.
+
+    Attributes:
+        ids (list[UUID]): Ids a resolver, como máximo MAX_BATCH_IDS (los
+            duplicados se ignoran)
+    """
+
+    ids: list[UUID] = Field(min_length=1, max_length=MAX_BATCH_IDS)
+
+
+class UserBatch(BaseModel):
+    """
+    Resultado de una consulta de usuarios en bloque.
+
+    Attributes:
+        users (dict[UUID, User]): Usuarios encontrados, indexados por id
+        missing (list[UUID]): Ids solicitados que no existen
+    """
+
+    users: dict[UUID, User]
+    missing: list[UUID]
+
+
 class CreateUser(BaseModel):
     """
     Esquema para la creación de nuevos usuarios.
@@ -120,3 +180,56 @@ class RefreshRequest(BaseModel):
     """
 
     refresh_token: Optional[str] = None  # Opcional porque lo leeremos de cookie
+
+
+# Construir un TypeAdapter compila su validador y su serializador: se crean una
+# vez al importar y las rutas los reutilizan en cada petición
+user_adapter = TypeAdapter(User)
+user_list_adapter = TypeAdapter(list[User])
+
+
+# Campos de usuario que un cliente puede pedir con ``fields=``. Es una lista
+# permitida: cualquier otro nombre (p. ej. ``hashed_password``) se rechaza
+USER_FIELDS = ("id", "email", "username")
+
+
+def parse_user_fields(value: str | None) -> tuple[str, ...] | None:
+    """
+    Validar ``fields`` (nombres separados por comas) contra USER_FIELDS.
+
+    Devuelve los campos en el orden de USER_FIELDS, siempre con ``id``, o None
+    si no se pidió una proyección o se pidieron todos los campos.
+
+    Raises:
+        ValueError: Si la lista está vacía o algún campo no está en USER_FIELDS
+    """
+    if value is None:
+        return None
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    if not requested:
+        raise ValueError("No fields requested")
+    unknown = requested - set(USER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    fields = tuple(name for name in USER_FIELDS if name == "id" or name in requested)
+    return None if fields == USER_FIELDS else fields
+
+
+@functools.lru_cache(maxsize=None)
+def user_projection(fields: tuple[str, ...]) -> type[BaseModel]:
+    """Modelo de usuario con solo ``fields`` (resultado de parse_user_fields)"""
+    return create_model(
+        "User_" + "_".join(fields),
+        __config__={"from_attributes": True},
+        **{name: (User.model_fields[name].annotation, ...) for name in fields},
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def user_projection_page(fields: tuple[str, ...]) -> type[BaseModel]:
+    """Equivalente de UserPage con items de ``user_projection(fields)``"""
+    return create_model(
+        "UserPage_" + "_".join(fields),
+        items=(list[user_projection(fields)], ...),
+        next_cursor=(Optional[str], None),
+    )
@@ -0,0 +1,140 @@
+"""
+Servidor de producción de FastAPI User Template.
+
+Lanza uvicorn con varios procesos worker (por defecto uno por CPU), el event
+loop ``uvloop`` y el parser HTTP ``httptools`` si están instalados (extra
+``server``), y sin el vigilante de ficheros de ``--reload``::
+
+    fastapiusertemplate-serve
+    fastapiusertemplate-serve --workers 4 --port 8080
+    fastapiusertemplate-serve --reload          # desarrollo: un proceso
+
+Cada worker importa la aplicación por separado (la importación no abre
+conexiones, ver ``startup``), así que cada uno tiene su propio pool: el máximo
+de conexiones a la BD es ``workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)``.
+
+Apagado ordenado: con SIGTERM/SIGINT cada worker deja de aceptar conexiones,
+espera a las peticiones en curso hasta ``SERVER_GRACEFUL_SHUTDOWN_SECONDS`` y
+ejecuta el apagado del ``lifespan``, que cierra los pools de conexiones.
+
+Variables de entorno:
+    HOST / PORT: Dirección de escucha (por defecto ``0.0.0.0:8000``)
+    WEB_CONCURRENCY: Procesos worker (por defecto número de CPUs)
+    SERVER_KEEPALIVE_SECONDS: Keep-alive de conexiones inactivas (por defecto
+        75, por encima del timeout de inactividad habitual de los balanceadores)
+    SERVER_BACKLOG: Cola de conexiones pendientes del socket (por defecto 2048)
+    SERVER_LIMIT_CONCURRENCY: Conexiones simultáneas por worker antes de
+        responder 503 (por defecto 0, sin límite)
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: Espera máxima a las peticiones en curso
+        al apagar (por defecto 30)
+    SERVER_ACCESS_LOG: Log de acceso de uvicorn (por defecto ``false``; la
+        latencia por ruta ya está en ``/metrics``)
+"""
+
+import argparse
+import importlib.util
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+APP = "fastapiusertemplate.main:app"
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+SERVER_KEEPALIVE_SECONDS = int(os.getenv("SERVER_KEEPALIVE_SECONDS", "75"))
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))
+SERVER_LIMIT_CONCURRENCY = int(os.getenv("SERVER_LIMIT_CONCURRENCY", "0"))
+SERVER_GRACEFUL_SHUTDOWN_SECONDS = int(
+    os.getenv("SERVER_GRACEFUL_SHUTDOWN_SECONDS", "30")
+)
+SERVER_ACCESS_LOG = os.getenv("SERVER_ACCESS_LOG", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def event_loop() -> str:
+    """``uvloop`` si está instalado; si no, el loop de asyncio"""
+    return "uvloop" if _installed("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    """``httptools`` si está instalado; si no, h11 (Python puro)"""
+    return "httptools" if _installed("httptools") else "h11"
+
+
+def server_options(args) -> dict:
+    """Argumentos de ``uvicorn.run`` para los argumentos de línea de comandos"""
+    workers = 1 if args.reload else max(1, args.workers)
+    return {
+        "host": args.host,
+        "port": args.port,
+        "workers": workers,
+        "reload": args.reload,
+        "loop": event_loop(),
+        "http": http_protocol(),
+        "timeout_keep_alive": SERVER_KEEPALIVE_SECONDS,
+        "backlog": SERVER_BACKLOG,
+        "limit_concurrency": SERVER_LIMIT_CONCURRENCY or None,
+        "timeout_graceful_shutdown": SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        "access_log": SERVER_ACCESS_LOG,
+        "proxy_headers": True,
+    }
+
+
+def export_worker_count(workers: int):
+    """
+    Publicar el número de workers en WEB_CONCURRENCY para que cada proceso lo
+    herede (p. ej. el TTL por defecto de ``cache.user_cache``).
+    """
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+
+
+def split_hash_workers(workers: int):
+    """
+    Repartir las CPUs entre los executors de hashing de los workers: sin esto
+    cada proceso lanzaría un hilo de bcrypt por CPU. Se hereda por entorno.
+    """
+    if "PASSWORD_HASH_WORKERS" not in os.environ:
+        per_worker = max(1, (os.cpu_count() or 1) // workers)
+        os.environ["PASSWORD_HASH_WORKERS"] = str(per_worker)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de producción")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    parser.add_argument(
+        "--reload", action="store_true", help="Recargar al cambiar el código"
+    )
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    options = server_options(args)
+    export_worker_count(options["workers"])
+    split_hash_workers(options["workers"])
+    logging.basicConfig(level=logging.INFO)
+    logger.info(
+        "Starting %d worker(s) on %s:%d (loop=%s, http=%s)",
+        options["workers"],
+        options["host"],
+        options["port"],
+        options["loop"],
+        options["http"],
+    )
+    uvicorn.run(APP, **options)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
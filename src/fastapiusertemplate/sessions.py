@@ -0,0 +1,132 @@
+"""
+Índice en memoria de sesiones revocadas y mantenimiento de ``refresh_sessions``.
+
+Los access tokens llevan el claim ``sid`` (familia de la sesión de login). Tras
+un logout o una reutilización detectada, la familia se revoca en la BD y se
+añade a ``revoked``, un conjunto inmutable que ``auth.decode_token`` consulta
+en O(1) sin acceder a la base de datos.
+
+Un access token vive como mucho ``ACCESS_TOKEN_EXPIRE_MINUTES``, así que el
+índice solo necesita las familias revocadas en ese intervalo: su tamaño es
+proporcional a los logouts recientes, no al número de sesiones. Cada proceso
+(worker) lo recarga desde la BD cada ``SESSION_SYNC_SECONDS``, de modo que una
+revocación hecha en otro worker se aplica como mucho tras ese intervalo. Los
+refresh tokens se validan siempre contra la BD al rotar.
+
+La misma tarea borra cada ``SESSION_PRUNE_SECONDS`` las sesiones expiradas.
+"""
+
+import asyncio
+import datetime
+import logging
+import os
+import threading
+
+from sqlalchemy import delete, select
+
+from . import models, query_stats
+from .concurrency import run_in_db_thread
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+SESSION_SYNC_SECONDS = float(os.getenv("SESSION_SYNC_SECONDS", "5"))
+SESSION_PRUNE_SECONDS = float(os.getenv("SESSION_PRUNE_SECONDS", "3600"))
+# Vida máxima de un access token (misma variable que auth): tiempo durante el
+# que hay que recordar una familia revocada
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+
+
+def _utcnow():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class RevocationIndex:
+    """
+    Conjunto de familias de sesión revocadas (``sid`` como texto).
+
+    Las lecturas no usan lock: el conjunto es un ``frozenset`` que se sustituye
+    entero al añadir o recargar (las revocaciones son poco frecuentes).
+    """
+
+    def __init__(self, retention: float):
+        self.retention = retention
+        self._revoked: frozenset[str] = frozenset()
+        # Revocaciones locales desde el inicio de la última recarga
+        self._recent: set[str] = set()
+        self._lock = threading.Lock()
+        self.synced_at: datetime.datetime | None = None
+
+    def __contains__(self, family_id) -> bool:
+        return family_id in self._revoked
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def add(self, family_id):
+        """Registrar una revocación hecha en este proceso (ya confirmada en BD)"""
+        family_id = str(family_id)
+        with self._lock:
+            self._recent.add(family_id)
+            self._revoked = self._revoked | {family_id}
+
+    def replace(self, family_ids):
+        """
+        Sustituir el índice por las familias leídas de la BD, conservando las
+        revocaciones locales hechas mientras se leían
+        """
+        loaded = frozenset(str(family_id) for family_id in family_ids)
+        with self._lock:
+            self._revoked = loaded | self._recent
+            self._recent = set()
+            self.synced_at = _utcnow()
+
+    def clear(self):
+        with self._lock:
+            self._revoked = frozenset()
+            self._recent = set()
+
+
+revoked = RevocationIndex(retention=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
+def sync_revoked():
+    """Recargar ``revoked`` con las familias revocadas dentro de la retención"""
+    cutoff = _utcnow() - datetime.timedelta(seconds=revoked.retention)
+    with SessionLocal() as db:
+        family_ids = db.scalars(
+            select(models.RefreshSession.family_id)
+            .where(models.RefreshSession.revoked_at >= cutoff)
+            .distinct()
+        ).all()
+    revoked.replace(family_ids)
+
+
+def prune_expired() -> int:
+    """Borrar las sesiones cuyo refresh token ya ha expirado"""
+    with SessionLocal() as db:
+        result = db.execute(
+            delete(models.RefreshSession).where(
+                models.RefreshSession.expires_at < _utcnow()
+            )
+        )
+        db.commit()
+    return result.rowcount
+
+
+async def maintain():
+    """Tarea en segundo plano (lifespan): recargar el índice y podar sesiones"""
+    loop = asyncio.get_running_loop()
+    next_prune = loop.time()
+    with query_stats.background_queries():
+        while True:
+            try:
+                await run_in_db_thread(sync_revoked)
+                if loop.time() >= next_prune:
+                    pruned = await run_in_db_thread(prune_expired)
+                    if pruned:
+                        logger.info("Pruned %d expired refresh sessions", pruned)
+                    next_prune = loop.time() + SESSION_PRUNE_SECONDS
+            except Exception:
+                logger.exception("Refresh session maintenance failed")
+            await asyncio.sleep(SESSION_SYNC_SECONDS)
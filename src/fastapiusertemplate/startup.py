@@ -0,0 +1,155 @@
+"""
+Arranque de la aplicación: precalentamiento y disponibilidad (readiness).
+
+Importar ``main`` no tiene efectos: no conecta con la base de datos ni crea
+tablas. El trabajo de arranque se hace en el ``lifespan``, antes de aceptar
+tráfico:
+
+1. Crear el esquema solo si ``DATABASE_CREATE_SCHEMA`` está activado (en
+   producción, ``fastapiusertemplate-manage create-schema`` una vez por
+   despliegue).
+2. Abrir ``DB_POOL_PREWARM`` conexiones del pool (crea el motor y carga el
+   driver).
+3. Cargar el backend de hashing en los workers del executor de hashing.
+
+Si la base de datos no responde, el arranque no falla: el worker arranca y
+``/ready`` responde 503 hasta que la BD esté disponible. ``/`` sigue siendo la
+comprobación de vida (liveness).
+
+El tiempo desde la importación del paquete hasta estar listo se registra en
+el log, en ``/ready`` y en la métrica ``app_import_to_ready_seconds``.
+
+Variables de entorno:
+    DATABASE_CREATE_SCHEMA: Crear las tablas al arrancar (por defecto ``false``)
+    DB_POOL_PREWARM: Conexiones abiertas al arrancar (por defecto DB_POOL_SIZE)
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+from sqlalchemy import text
+
+from . import IMPORT_STARTED, database, passwords
+from .concurrency import run_in_db_thread, run_in_hash_executor
+from .metrics import CallbackGauge
+
+logger = logging.getLogger(__name__)
+
+DATABASE_CREATE_SCHEMA = os.getenv("DATABASE_CREATE_SCHEMA", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+DB_POOL_PREWARM = int(os.getenv("DB_POOL_PREWARM", os.getenv("DB_POOL_SIZE", "5")))
+
+
+class StartupState:
+    """Estado de arranque del proceso."""
+
+    def __init__(self):
+        self.ready = False
+        self.import_to_ready: float | None = None
+        self.startup_seconds: float | None = None
+
+
+state = StartupState()
+
+CallbackGauge(
+    "app_import_to_ready_seconds",
+    "Segundos desde la importación del paquete hasta estar listo",
+    (),
+    lambda: [((), state.import_to_ready)],
+)
+
+
+def create_schema():
+    """Crear las tablas que falten (no modifica las existentes)"""
+    from . import models
+
+    models.Base.metadata.create_all(bind=database.get_engine())
+
+
+def prewarm_pool(engine, connections: int):
+    """Abrir ``connections`` conexiones a la vez y devolverlas al pool"""
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(engine.connect())
+    finally:
+        for conn in opened:
+            conn.close()
+
+
+async def prewarm_async_pool(engine, connections: int):
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(await engine.connect())
+    finally:
+        for conn in opened:
+            await conn.close()
+
+
+async def prewarm_hashing():
+    """Cargar el backend de hashing en cada worker del executor"""
+    workers = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+    await asyncio.gather(
+        *(run_in_hash_executor(passwords.load_backends) for _ in range(workers))
+    )
+
+
+async def prewarm_database():
+    if DATABASE_CREATE_SCHEMA:
+        await run_in_db_thread(create_schema)
+    await run_in_db_thread(prewarm_pool, database.get_engine(), DB_POOL_PREWARM)
+    async_engine = database.get_async_engine()
+    if async_engine is not None:
+        await prewarm_async_pool(async_engine, DB_POOL_PREWARM)
+
+
+async def startup():
+    """Precalentar y marcar el proceso como listo (lifespan)"""
+    start = time.perf_counter()
+    try:
+        await prewarm_database()
+    except Exception:
+        logger.exception(
+            "Database prewarm failed; /ready reports 503 until it recovers"
+        )
+    await prewarm_hashing()
+    now = time.perf_counter()
+    state.startup_seconds = now - start
+    state.import_to_ready = now - IMPORT_STARTED
+    state.ready = True
+    logger.info(
+        "Ready in %.0f ms (startup %.0f ms)",
+        state.import_to_ready * 1000,
+        state.startup_seconds * 1000,
+    )
+
+
+def shutdown():
+    """Dejar de anunciarse como listo al empezar el apagado"""
+    state.ready = False
+
+
+def _ping():
+    with database.get_engine().connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+async def database_available() -> bool:
+    """Comprobar la conexión con el motor que usan las peticiones"""
+    try:
+        async_engine = database.get_async_engine()
+        if async_engine is not None:
+            async with async_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        else:
+            await run_in_db_thread(_ping)
+    except Exception:
+        logger.warning("Readiness check: database unavailable", exc_info=True)
+        return False
+    return True
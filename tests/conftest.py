@@ -0,0 +1,63 @@
+import pytest
+from dotenv import load_dotenv
+from fastapi.testclient import TestClient
+
+from fastapiusertemplate import auth, crud, schema
+from fastapiusertemplate.cache import token_cache, user_cache
+from fastapiusertemplate.database import SessionLocal, engine
+from fastapiusertemplate.main import app
+from fastapiusertemplate.models import Base
+
+load_dotenv()
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def admin_headers(monkeypatch):
+    """Activar la API de administración y devolver la cabecera necesaria"""
+    monkeypatch.setattr(auth, "ADMIN_API_KEY", "test-admin-token")
+    return {"X-Admin-Token": "test-admin-token"}
+
+
+@pytest.fixture(autouse=True)
+def setup_database():
+    """Recrear la base de datos y vaciar las cachés antes de cada test"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    user_cache.clear()
+    token_cache.clear()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+def register_and_login(client, username="testuser", password="testpassword123"):
+    """Registrar un usuario, iniciar sesión y devolver sus datos"""
+    user = client.post(
+        "/register",
+        json={
+            "email": f"{username}@example.com",
+            "username": username,
+            "password": password,
+        },
+    ).json()
+    response = client.post("/login", json={"username": username, "password": password})
+    assert response.status_code == 200
+    return user
+
+
+def create_users(count):
+    """Crear ``count`` usuarios directamente en la BD, sin pasar por bcrypt"""
+    with SessionLocal() as db:
+        for i in range(count):
+            crud.create_user(
+                db,
+                schema.CreateUser(
+                    email=f"user{i}@example.com", username=f"user{i}", password="x"
+                ),
+                hashed_password="not-a-real-hash",
+            )
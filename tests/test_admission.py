@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from fastapiusertemplate import admission
+from fastapiusertemplate.admission import (
+    ConcurrencyLimiter,
+    RoutePolicy,
+    TokenBucketLimiter,
+)
+
+from .conftest import register_and_login
+
+LOGIN = {"username": "testuser", "password": "testpassword123"}
+
+
+def test_token_bucket_limits_and_evicts():
+    limiter = TokenBucketLimiter(rate=0.01, burst=2, max_keys=2)
+    assert limiter.hit("a") == 0
+    assert limiter.hit("a") == 0
+    assert limiter.hit("a") > 0
+
+    limiter.hit("b")
+    limiter.hit("c")
+    stats = limiter.stats()
+    assert stats["keys"] == 2
+    assert stats["evictions"] == 1
+    # "a" fue expulsada: vuelve a empezar con el bucket lleno
+    assert limiter.hit("a") == 0
+
+
+def test_concurrency_limiter_queues_and_rejects():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, max_queue=1, queue_timeout=0.05)
+        await limiter.acquire()
+
+        # La cola admite uno; el siguiente se rechaza sin esperar
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as exc:
+            await limiter.acquire()
+        assert exc.value.status_code == 503
+
+        # Al liberar, el hueco pasa al que esperaba
+        limiter.release()
+        await waiter
+        assert limiter.active == 1
+
+        # Sin liberar, la espera expira con 503 y Retry-After
+        with pytest.raises(HTTPException) as exc:
+            await limiter.acquire()
+        assert exc.value.headers["Retry-After"] == "1"
+        assert limiter.stats()["timeouts"] == 1
+        assert limiter.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_login_rate_limited_per_username(client, monkeypatch):
+    register_and_login(client)
+    monkeypatch.setitem(
+        admission.policies,
+        "login",
+        RoutePolicy(per_username=TokenBucketLimiter(rate=0.01, burst=1)),
+    )
+
+    assert client.post("/login", json=LOGIN).status_code == 200
+    response = client.post("/login", json=LOGIN)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_login_rejected_when_saturated(client, monkeypatch):
+    register_and_login(client)
+    monkeypatch.setitem(
+        admission.policies,
+        "login",
+        RoutePolicy(concurrency=ConcurrencyLimiter(0, max_queue=0, queue_timeout=1)),
+    )
+
+    response = client.post("/login", json=LOGIN)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    # Las rutas baratas siguen respondiendo
+    assert client.get("/").status_code == 200
+    stats = client.get("/health/admission").json()["routes"]["login"]
+    assert stats["concurrency"]["rejected"] == 1
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from fastapiusertemplate import crud_async, schema
+from fastapiusertemplate.models import Base
+
+
+def test_async_crud_roundtrip(tmp_path):
+    """Las operaciones CRUD asíncronas funcionan con sqlite+aiosqlite"""
+
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        async with session_factory() as db:
+            new_user = schema.CreateUser(
+                email="async@example.com", username="asyncuser", password="secret"
+            )
+            created = await crud_async.create_user(db, new_user, "hashed")
+            assert (await crud_async.get_user(db, created.id)).username == "asyncuser"
+            assert await crud_async.get_user_by_email(db, "async@example.com")
+            assert await crud_async.get_user_by_username(db, "asyncuser")
+            assert len(await crud_async.get_users(db)) == 1
+
+            result = await crud_async.delete_user(db, created.id)
+            assert result == {"message": "User deleted successfully"}
+            assert await crud_async.get_user(db, created.id) is None
+
+        await engine.dispose()
+
+    asyncio.run(scenario())
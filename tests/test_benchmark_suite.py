@@ -0,0 +1,30 @@
+from benchmarks.suite import compare
+
+BASELINE = {
+    "micro": {"verify_token_cached": {"ops_per_sec": 1000.0}},
+    "load": {"me": {"rps": 500.0, "p95_ms": 10.0}},
+}
+
+
+def test_compare_within_threshold():
+    current = {
+        "micro": {"verify_token_cached": {"ops_per_sec": 950.0}},
+        "load": {"me": {"rps": 520.0, "p95_ms": 10.5}},
+    }
+    assert compare(BASELINE, current, threshold=0.10) == []
+
+
+def test_compare_flags_throughput_and_latency_regressions():
+    current = {
+        "micro": {"verify_token_cached": {"ops_per_sec": 800.0}},
+        "load": {"me": {"rps": 500.0, "p95_ms": 15.0}},
+    }
+    regressions = compare(BASELINE, current, threshold=0.10)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("micro.verify_token_cached.ops_per_sec")
+    assert regressions[1].startswith("load.me.p95_ms")
+
+
+def test_compare_ignores_new_benchmarks():
+    current = {"micro": {"new_benchmark": {"ops_per_sec": 1.0}}}
+    assert compare(BASELINE, current, threshold=0.10) == []
@@ -0,0 +1,50 @@
+import json
+
+from fastapiusertemplate import auth
+
+from .conftest import create_users
+
+
+def _ndjson(records):
+    return "\n".join(json.dumps(record) for record in records) + "\n"
+
+
+def test_bulk_import_inserts_and_reports_conflicts(client, admin_headers):
+    """La importación inserta por lotes e informa de cada fila rechazada"""
+    create_users(1)  # user0 ya existe
+    prehashed = auth.get_password_hash("prehashed-password")
+    body = _ndjson(
+        [
+            {"email": "new1@example.com", "username": "new1", "password": "pw1"},
+            {
+                "email": "new2@example.com",
+                "username": "new2",
+                "hashed_password": prehashed,
+            },
+            {"email": "user0@example.com", "username": "other", "password": "pw"},
+            {"email": "new3@example.com", "username": "new1", "password": "pw"},
+            {"email": "bad@example.com", "username": "bad", "hashed_password": "plain"},
+            {"username": "incomplete"},
+        ]
+    )
+
+    response = client.post(
+        "/users/import",
+        content=body,
+        params={"batch_size": 2},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["inserted"] == 2
+    assert {(r["line"], r["reason"]) for r in result["rejected"]} == {
+        (3, "Email already registered"),
+        (4, "Username already registered"),
+        (5, "Unsupported password hash"),
+        (6, "Invalid record: Field required"),
+    }
+
+    login = client.post(
+        "/login", json={"username": "new2", "password": "prehashed-password"}
+    )
+    assert login.status_code == 200
@@ -0,0 +1,71 @@
+import uuid
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from fastapiusertemplate import auth, schema
+from fastapiusertemplate.cache import user_cache
+from fastapiusertemplate.database import SessionLocal
+from fastapiusertemplate.models import User
+
+from .conftest import register_and_login
+
+
+@pytest.fixture
+def claims_only(monkeypatch):
+    monkeypatch.setattr(auth, "AUTH_CLAIMS_ONLY", True)
+
+
+def _remove_user_row(user_id):
+    user_id = uuid.UUID(user_id)
+    with SessionLocal() as db:
+        db.query(User).filter(User.id == user_id).delete()
+        db.commit()
+    user_cache.clear()
+
+
+def test_claims_only_me_skips_database(client, claims_only):
+    """En modo claims-only, /me y /protected se sirven solo con el token"""
+    user = register_and_login(client)
+    _remove_user_row(user["id"])
+
+    me = client.get("/me")
+    assert me.status_code == 200
+    assert me.json() == user
+    assert client.get("/protected").json()["username"] == user["username"]
+
+
+def test_default_mode_still_loads_user(client):
+    """Sin el modo activado, /me sigue validando el usuario contra la BD"""
+    user = register_and_login(client)
+    _remove_user_row(user["id"])
+
+    assert client.get("/me").status_code == 401
+
+
+def _dependency_client(client, dependency):
+    """App mínima con una ruta que usa ``dependency`` y las cookies de ``client``"""
+    test_app = FastAPI()
+
+    @test_app.get("/whoami")
+    async def whoami(current_user: schema.User = Depends(dependency)):
+        return {"username": current_user.username}
+
+    return TestClient(test_app, cookies=dict(client.cookies))
+
+
+def test_fresh_user_always_reads_the_database(client, claims_only):
+    """get_fresh_user rechaza a un usuario eliminado aunque esté en caché"""
+    user = register_and_login(client)
+    cached = _dependency_client(client, auth.get_current_user)
+    fresh = _dependency_client(client, auth.get_fresh_user)
+    assert cached.get("/whoami").json() == {"username": user["username"]}
+
+    with SessionLocal() as db:
+        db.query(User).filter(User.id == uuid.UUID(user["id"])).delete()
+        db.commit()
+
+    assert client.get("/me").status_code == 200
+    assert cached.get("/whoami").status_code == 200
+    assert fresh.get("/whoami").status_code == 401
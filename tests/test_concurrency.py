@@ -0,0 +1,30 @@
+import threading
+
+import anyio
+
+from fastapiusertemplate.concurrency import run_db, run_in_hash_executor
+
+
+def test_blocking_work_runs_outside_the_event_loop_thread():
+    """Las operaciones síncronas de BD y el hashing no ocupan el hilo del loop"""
+
+    async def main():
+        loop_thread = threading.get_ident()
+        db_thread = await run_db(threading.get_ident)
+        hash_thread = await run_in_hash_executor(threading.get_ident)
+        return loop_thread, db_thread, hash_thread
+
+    loop_thread, db_thread, hash_thread = anyio.run(main)
+    assert db_thread != loop_thread
+    assert hash_thread != loop_thread
+
+
+def test_async_functions_are_awaited_directly():
+    async def query():
+        return threading.get_ident()
+
+    async def main():
+        return threading.get_ident(), await run_db(query)
+
+    loop_thread, query_thread = anyio.run(main)
+    assert query_thread == loop_thread
@@ -0,0 +1,86 @@
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from fastapiusertemplate import auth, crud
+from fastapiusertemplate.database import SessionLocal
+from fastapiusertemplate.models import User
+from fastapiusertemplate.query_stats import assert_max_queries
+
+from .conftest import create_users, register_and_login
+
+
+def _first_user_id():
+    with SessionLocal() as db:
+        return db.scalars(select(User.id).order_by(User.username)).first()
+
+
+def test_user_not_modified(client):
+    create_users(1)
+    user_id = _first_user_id()
+
+    response = client.get(f"/users/{user_id}")
+    assert response.status_code == 200
+    assert "version" not in response.json()
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+
+    # Con el usuario en caché, el 304 no consulta la BD
+    with assert_max_queries(0):
+        response = client.get(f"/users/{user_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    response = client.get(f"/users/{user_id}", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
+def test_etag_changes_when_user_changes(client):
+    create_users(1)
+    user_id = _first_user_id()
+    etag = client.get(f"/users/{user_id}").headers["etag"]
+
+    with SessionLocal() as db:
+        crud.update_password_hash(db, user_id, "another-hash")
+
+    response = client.get(f"/users/{user_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_unknown_user_still_404(client):
+    response = client.get(f"/users/{uuid.uuid4()}", headers={"If-None-Match": "*"})
+    assert response.status_code == 404
+
+
+def test_users_page_etag(client):
+    create_users(3)
+    response = client.get("/users", params={"limit": 2})
+    etag = response.headers["etag"]
+    first_id = uuid.UUID(response.json()["items"][0]["id"])
+
+    response = client.get(
+        "/users", params={"limit": 2}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    # Otra página u otro contenido producen otro ETag
+    assert client.get("/users", params={"limit": 3}).headers["etag"] != etag
+    with SessionLocal() as db:
+        crud.update_password_hash(db, first_id, "another-hash")
+    response = client.get(
+        "/users", params={"limit": 2}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.skipif(auth.AUTH_CLAIMS_ONLY, reason="no version without a DB lookup")
+def test_me_etag(client):
+    register_and_login(client)
+    response = client.get("/me")
+    assert response.headers["cache-control"] == "private, no-cache"
+    etag = response.headers["etag"]
+    response = client.get("/me", headers={"If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
@@ -0,0 +1,31 @@
+import csv
+import io
+import json
+
+from .conftest import create_users
+
+
+def test_export_requires_admin_token(client, admin_headers):
+    """La exportación exige la cabecera X-Admin-Token correcta"""
+    assert client.get("/users/export").status_code == 403
+    bad = client.get("/users/export", headers={"X-Admin-Token": "wrong"})
+    assert bad.status_code == 403
+
+
+def test_export_ndjson_and_csv(client, admin_headers):
+    """La exportación devuelve todos los usuarios en NDJSON y en CSV"""
+    create_users(3)
+
+    ndjson = client.get(
+        "/users/export", params={"batch_size": 2}, headers=admin_headers
+    )
+    assert ndjson.status_code == 200
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    users = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert sorted(user["username"] for user in users) == ["user0", "user1", "user2"]
+
+    csv_response = client.get(
+        "/users/export", params={"format": "csv"}, headers=admin_headers
+    )
+    rows = list(csv.DictReader(io.StringIO(csv_response.text)))
+    assert [row["id"] for row in rows] == [user["id"] for user in users]
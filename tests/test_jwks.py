@@ -0,0 +1,60 @@
+import uuid
+
+import jwt
+import pytest
+
+pytest.importorskip("cryptography")
+
+from fastapiusertemplate import auth
+from fastapiusertemplate.keys import KeyRing, generate_private_key_pem, load_private_key
+
+
+@pytest.fixture
+def eddsa_keyring(monkeypatch):
+    keyring = KeyRing()
+    keyring.add(
+        load_private_key("EdDSA", generate_private_key_pem("EdDSA"), "key-1"),
+        activate=True,
+    )
+    monkeypatch.setattr(auth, "keyring", keyring)
+    return keyring
+
+
+def test_hmac_keys_are_not_published(client):
+    """Con HMAC no se publica ninguna clave en el JWKS"""
+    response = client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert response.json() == {"keys": []}
+    assert "max-age" in response.headers["cache-control"]
+
+
+def test_rotation_keeps_previous_keys_verifiable(client, eddsa_keyring):
+    """Tras rotar, los tokens antiguos siguen siendo válidos hasta retirar su clave"""
+    user_id = uuid.uuid4()
+    old_token = auth.create_access_token({"sub": str(user_id)})
+    assert jwt.get_unverified_header(old_token)["kid"] == "key-1"
+
+    eddsa_keyring.rotate(
+        load_private_key("EdDSA", generate_private_key_pem("EdDSA"), "key-2")
+    )
+    new_token = auth.create_access_token({"sub": str(user_id)})
+    assert jwt.get_unverified_header(new_token)["kid"] == "key-2"
+    assert auth.verify_token(old_token) == user_id
+    assert auth.verify_token(new_token) == user_id
+
+    jwks = client.get("/.well-known/jwks.json").json()
+    assert {key["kid"] for key in jwks["keys"]} == {"key-1", "key-2"}
+
+    # El token antiguo está en la caché de tokens: retirar la clave basta
+    eddsa_keyring.retire("key-1")
+    assert auth.verify_token(old_token) is None
+    assert auth.verify_token(new_token) == user_id
+
+
+def test_published_jwk_verifies_tokens(client, eddsa_keyring):
+    """Un servicio externo puede verificar el token con la clave del JWKS"""
+    token = auth.create_access_token({"sub": str(uuid.uuid4())})
+    jwk = client.get("/.well-known/jwks.json").json()["keys"][0]
+
+    public_key = jwt.PyJWK(jwk).key
+    assert jwt.decode(token, public_key, algorithms=["EdDSA"])["sub"]
@@ -0,0 +1,78 @@
+import threading
+
+from fastapiusertemplate import database
+from fastapiusertemplate.metrics import Counter, Histogram, Registry
+
+from .conftest import register_and_login
+
+
+def _sample(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_histogram_render_is_cumulative_across_threads():
+    registry = Registry()
+    histogram = Histogram(
+        "latency_seconds", "Latencia", ("route",), buckets=(0.1, 1), registry=registry
+    )
+
+    def observe():
+        for value in (0.05, 0.5, 5):
+            histogram.labels("/a").observe(value)
+
+    threads = [threading.Thread(target=observe) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 4' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 8' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 12' in text
+    assert 'latency_seconds_count{route="/a"} 12' in text
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    counter = Counter("events_total", "Eventos", ("name",), registry=registry)
+    counter.labels('a"b\\c').inc()
+    assert 'events_total{name="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_metrics_endpoint_reports_routes_and_auth(client):
+    before = client.get("/metrics").text
+    register_and_login(client)
+    client.post("/login", json={"username": "testuser", "password": "wrong"})
+    client.get("/users/00000000-0000-0000-0000-000000000000")
+    client.cookies.set("access_token", "not-a-token")
+    client.get("/me")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+
+    def delta(name):
+        return _sample(text, name) - _sample(before, name)
+
+    assert delta('auth_login_attempts_total{result="success"}') == 1
+    assert delta('auth_login_attempts_total{result="failure"}') == 1
+    assert delta('auth_token_verification_failures_total{reason="invalid"}') == 1
+    assert (
+        delta('http_requests_total{method="GET",route="/users/{user_id}",status="404"}')
+        == 1
+    )
+    assert delta('password_hash_duration_seconds_count{operation="hash"}') == 1
+    assert delta('db_queries_total{operation="INSERT"}') >= 1
+    assert "http_requests_in_flight 1" in text
+
+
+def test_queries_are_timed_by_a_single_listener_pair():
+    """Métricas y consultas por petición comparten un único par de eventos"""
+    engine = database.get_engine()
+    assert len(engine.dispatch.before_cursor_execute) == 1
+    assert len(engine.dispatch.after_cursor_execute) == 1
@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from .conftest import create_users
+
+
+def test_cursor_pagination_walks_all_users(client):
+    """Recorrer /users con next_cursor devuelve cada usuario una sola vez"""
+    create_users(5)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+        page = client.get("/users", params=params).json()
+        seen.extend(user["id"] for user in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert seen == sorted(seen)
+
+
+def test_pagination_rejects_invalid_input(client):
+    """Cursores inválidos y límites fuera de rango se rechazan"""
+    assert client.get("/users", params={"cursor": "???"}).status_code == 400
+    assert client.get("/users", params={"limit": 10_000}).status_code == 422
+
+
+def test_default_limit_never_exceeds_max_page_size(tmp_path):
+    """Sin ``limit``, /users respeta un MAX_PAGE_SIZE menor que 100"""
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'page.db'}",
+        "DATABASE_ASYNC": "0",
+        "MAX_PAGE_SIZE": "2",
+    }
+    script = textwrap.dedent("""
+        from fastapi.testclient import TestClient
+        from fastapiusertemplate.main import app
+        from fastapiusertemplate.startup import create_schema
+        from tests.conftest import create_users
+
+        create_schema()
+        with TestClient(app) as client:
+            create_users(3)
+            print(len(client.get("/users").json()["items"]))
+        """)
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip().splitlines()[-1] == "2"
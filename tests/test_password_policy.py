@@ -0,0 +1,59 @@
+from fastapiusertemplate import auth, crud, schema
+from fastapiusertemplate.database import SessionLocal
+from fastapiusertemplate.passwords import build_context, calibrate
+
+
+def _create_user_with_rounds(rounds):
+    hashed = build_context(["bcrypt"], rounds).hash("testpassword123")
+    with SessionLocal() as db:
+        user = crud.create_user(
+            db,
+            schema.CreateUser(
+                email="testuser@example.com",
+                username="testuser",
+                password="testpassword123",
+            ),
+            hashed_password=hashed,
+        )
+    return user.id
+
+
+def _stored_hash(user_id):
+    with SessionLocal() as db:
+        return crud.get_user(db, user_id).hashed_password
+
+
+def test_login_rehashes_outdated_hash(client, monkeypatch):
+    user_id = _create_user_with_rounds(4)
+    monkeypatch.setattr(auth, "pwd_context", build_context(["bcrypt"], 5))
+
+    response = client.post(
+        "/login", json={"username": "testuser", "password": "testpassword123"}
+    )
+    assert response.status_code == 200
+    assert _stored_hash(user_id).startswith("$2b$05$")
+
+    # El hash nuevo sigue siendo válido y ya no se regenera
+    response = client.post(
+        "/login", json={"username": "testuser", "password": "testpassword123"}
+    )
+    assert response.status_code == 200
+    assert _stored_hash(user_id).startswith("$2b$05$")
+
+
+def test_failed_login_does_not_rehash(client, monkeypatch):
+    user_id = _create_user_with_rounds(4)
+    monkeypatch.setattr(auth, "pwd_context", build_context(["bcrypt"], 5))
+
+    response = client.post(
+        "/login", json={"username": "testuser", "password": "wrong-password"}
+    )
+    assert response.status_code == 401
+    assert _stored_hash(user_id).startswith("$2b$04$")
+
+
+def test_calibrate_recommends_rounds():
+    # Ningún coste cumple el objetivo: se mide solo el mínimo y se recomienda
+    report = calibrate(target_ms=0.001, samples=1)
+    assert [m["rounds"] for m in report["measurements"]] == [4]
+    assert report["recommended_rounds"] == 4
@@ -0,0 +1,38 @@
+from fastapiusertemplate import database
+from fastapiusertemplate.pool_stats import InstrumentedQueuePool
+
+
+def test_pool_options_come_from_configuration():
+    options = database.pool_options("postgresql://u@db/app", InstrumentedQueuePool)
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == database.DB_POOL_SIZE
+    assert options["max_overflow"] == database.DB_MAX_OVERFLOW
+    assert options["pool_timeout"] == database.DB_POOL_TIMEOUT
+
+
+def test_in_memory_sqlite_keeps_its_single_connection_pool():
+    assert "poolclass" not in database.pool_options("sqlite://", InstrumentedQueuePool)
+
+
+def test_pool_instrumentation_counts_checkouts_and_waits(tmp_path):
+    engine, stats = database.build_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    try:
+        for _ in range(3):
+            with engine.connect():
+                pass
+        snapshot = stats.snapshot(engine.pool)
+    finally:
+        engine.dispose()
+
+    assert snapshot["pool_class"] == "InstrumentedQueuePool"
+    assert snapshot["connections_created_total"] == 1
+    assert snapshot["checkouts_total"] == snapshot["checkins_total"] == 3
+    assert snapshot["checkout_wait_seconds"]["count"] == 3
+    assert snapshot["checked_out"] == 0
+
+
+def test_health_db_reports_pool_status(client):
+    pools = client.get("/health/db").json()["pools"]
+    assert pools
+    for pool in pools.values():
+        assert {"checked_out", "overflow_in_use", "checkout_wait_seconds"} <= set(pool)
@@ -0,0 +1,82 @@
+import time
+from collections import deque
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from fastapiusertemplate import profiling
+from fastapiusertemplate.concurrency import run_in_db_thread
+from fastapiusertemplate.main import app
+
+
+def _burn_cpu(seconds=0.05):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.fixture
+def profiled_client(monkeypatch):
+    """App mínima con el profiler activado y la clave ``secret``"""
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling, "profiles", deque(maxlen=10))
+    test_app = FastAPI()
+
+    @test_app.get("/loop")
+    async def busy_loop():
+        _burn_cpu()
+        return {}
+
+    @test_app.get("/thread")
+    async def busy_thread():
+        await run_in_db_thread(_burn_cpu)
+        return {}
+
+    test_app.add_middleware(profiling.ProfilingMiddleware, admin_key=lambda: "secret")
+    with TestClient(test_app) as c:
+        yield c
+
+
+@pytest.mark.skipif(profiling.PROFILING_ENABLED, reason="PROFILING_ENABLED is set")
+def test_disabled_by_default(client, admin_headers):
+    middleware = [m.cls for m in app.user_middleware]
+    assert profiling.ProfilingMiddleware not in middleware
+    assert client.get("/debug/profiles", headers=admin_headers).status_code == 404
+
+
+def test_profiles_only_authorized_requests(profiled_client):
+    profiled_client.get("/loop")
+    profiled_client.get("/loop", headers={"X-Profile-Token": "wrong"})
+    assert len(profiling.profiles) == 0
+
+    profiled_client.get("/loop", headers={"X-Profile-Token": "secret"})
+    [record] = profiling.profiles
+    assert record.route == "/loop"
+    assert record.status == 200
+    assert record.samples > 0
+    assert any("_burn_cpu" in stack for stack, _ in record.stacks)
+
+
+def test_samples_worker_threads(profiled_client):
+    profiled_client.get("/thread", headers={"X-Profile-Token": "secret"})
+    text = profiling.collapsed("/thread")
+    lines = text.splitlines()
+    assert lines
+    assert all(line.startswith("GET /thread;") for line in lines)
+    assert any(";db-thread;" in line and "_burn_cpu" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_debug_profiles_endpoint(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling, "profiles", deque(maxlen=10))
+    profiling.profiles.append(
+        profiling.ProfileRecord("POST", "/login", 200, 250.0, 3, [("a;b", 3)])
+    )
+
+    assert client.get("/debug/profiles").status_code == 403
+    response = client.get("/debug/profiles", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.text == "POST /login;a;b 3\n"
+    assert client.get("/debug/profiles?route=/me", headers=admin_headers).text == ""
@@ -0,0 +1,130 @@
+"""Presupuesto de consultas SQL de cada ruta de main.py"""
+
+import logging
+
+import pytest
+
+from fastapiusertemplate import query_stats
+from fastapiusertemplate.cache import user_cache
+from fastapiusertemplate.query_stats import assert_max_queries
+
+from .conftest import create_users, register_and_login
+
+NDJSON_USER = b'{"email": "bulk@example.com", "username": "bulk", "password": "x"}\n'
+
+
+@pytest.fixture
+def user(client):
+    return register_and_login(client)
+
+
+def test_register_budget(client):
+    with assert_max_queries(1):
+        response = client.post(
+            "/register",
+            json={"email": "a@example.com", "username": "a", "password": "pw"},
+        )
+    assert response.status_code == 200
+
+
+def test_login_budget(client, user):
+    # Usuario y sesión de refresh nueva
+    with assert_max_queries(2):
+        response = client.post(
+            "/login", json={"username": "testuser", "password": "testpassword123"}
+        )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("path", ["/me", "/protected"])
+def test_authenticated_reads_budget(client, user, path):
+    user_cache.clear()
+    with assert_max_queries(1):
+        assert client.get(path).status_code == 200
+    # Con la caché de usuarios caliente no hay consultas
+    with assert_max_queries(0):
+        assert client.get(path).status_code == 200
+
+
+def test_user_detail_budget(client, user):
+    with assert_max_queries(1):
+        assert client.get(f"/users/{user['id']}").status_code == 200
+
+
+@pytest.mark.parametrize("query", ["", "?limit=5", "?skip=0&limit=5"])
+def test_list_users_budget(client, query):
+    create_users(30)
+    with assert_max_queries(1):
+        assert client.get(f"/users{query}").status_code == 200
+
+
+def test_refresh_budget(client, user):
+    # Rotación (UPDATE ... RETURNING + INSERT) y usuario
+    with assert_max_queries(3):
+        assert client.post("/refresh").status_code == 200
+
+
+def test_delete_user_budget(client, user):
+    with assert_max_queries(2):
+        assert client.delete(f"/users/{user['id']}").status_code == 200
+
+
+def test_export_budget(client, admin_headers):
+    create_users(30)
+    with assert_max_queries(1):
+        response = client.get("/users/export", headers=admin_headers)
+    assert response.status_code == 200
+
+
+def test_import_budget(client, admin_headers):
+    # Una consulta de conflictos y un INSERT por lote
+    with assert_max_queries(2):
+        response = client.post(
+            "/users/import", headers=admin_headers, content=NDJSON_USER
+        )
+    assert response.json()["inserted"] == 1
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/",
+        "/health/db",
+        "/health/cache",
+        "/health/admission",
+        "/metrics",
+        "/.well-known/jwks.json",
+    ],
+)
+def test_routes_without_queries(client, path):
+    with assert_max_queries(0):
+        assert client.get(path).status_code == 200
+
+
+def test_logout_budget(client, user):
+    # Revocación de la sesión
+    with assert_max_queries(1):
+        assert client.post("/logout").status_code == 200
+
+
+def test_budget_violation_lists_statements(client):
+    create_users(3)
+    with pytest.raises(AssertionError, match="Expected at most 0 queries, got 1"):
+        with assert_max_queries(0):
+            client.get("/users")
+
+
+def test_slow_queries_are_logged(client, monkeypatch, caplog):
+    monkeypatch.setattr(query_stats, "SLOW_QUERY_MS", 0)
+    with caplog.at_level(logging.WARNING, logger=query_stats.__name__):
+        client.get("/users")
+    assert any("Slow query" in record.message for record in caplog.records)
+
+
+def test_repeated_statements_are_detected():
+    log = query_stats.QueryLog()
+    for _ in range(3):
+        log.record("SELECT 1", 0.001)
+    log.record("SELECT 2", 0.001)
+    assert log.repeated(2) == [("SELECT 1", 3)]
+    assert log.count == 4
@@ -0,0 +1,76 @@
+import asyncio
+
+import httpx
+from sqlalchemy.exc import IntegrityError
+
+from fastapiusertemplate.crud import DuplicateUserError
+from fastapiusertemplate.main import app
+
+
+def _register_concurrently(payloads):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            return await asyncio.gather(
+                *(c.post("/register", json=p) for p in payloads)
+            )
+
+    return asyncio.run(scenario())
+
+
+def test_parallel_duplicate_usernames_register_once(client):
+    """Registros simultáneos con el mismo username: solo uno tiene éxito"""
+    responses = _register_concurrently(
+        [
+            {"email": f"racer{i}@example.com", "username": "racer", "password": "pw"}
+            for i in range(8)
+        ]
+    )
+
+    assert sorted(r.status_code for r in responses) == [200] + [400] * 7
+    rejected = [r.json()["detail"] for r in responses if r.status_code == 400]
+    assert set(rejected) == {"Username already registered"}
+
+
+def test_parallel_duplicate_emails_register_once(client):
+    """Registros simultáneos con el mismo email: solo uno tiene éxito"""
+    responses = _register_concurrently(
+        [
+            {"email": "same@example.com", "username": f"racer{i}", "password": "pw"}
+            for i in range(8)
+        ]
+    )
+
+    assert sorted(r.status_code for r in responses) == [200] + [400] * 7
+    rejected = [r.json()["detail"] for r in responses if r.status_code == 400]
+    assert set(rejected) == {"Email already registered"}
+
+
+def test_duplicate_email_containing_username_is_reported_as_email(client):
+    payload = {"email": "username@corp.com", "username": "first", "password": "pw"}
+    assert client.post("/register", json=payload).status_code == 200
+    response = client.post("/register", json=payload | {"username": "second"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+
+
+class _PostgresUniqueViolation(Exception):
+    """Error de psycopg2: el nombre de la restricción está en ``diag``"""
+
+    def __init__(self, constraint_name, message):
+        super().__init__(message)
+        self.diag = type("Diag", (), {"constraint_name": constraint_name})()
+
+
+def test_postgres_duplicate_field_uses_constraint_name():
+    orig = _PostgresUniqueViolation(
+        "ix_users_email",
+        'duplicate key value violates unique constraint "ix_users_email"\n'
+        "DETAIL:  Key (email)=(username@corp.com) already exists.",
+    )
+    error = DuplicateUserError.from_integrity_error(IntegrityError("", {}, orig))
+    assert error.field == "email"
+
+    orig = _PostgresUniqueViolation("ix_users_username", "duplicate key ...")
+    error = DuplicateUserError.from_integrity_error(IntegrityError("", {}, orig))
+    assert error.field == "username"
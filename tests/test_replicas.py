@@ -0,0 +1,80 @@
+import os
+
+import pytest
+from sqlalchemy import text
+
+from fastapiusertemplate import replicas
+
+from .conftest import create_users
+
+
+@pytest.fixture
+def replica_set(monkeypatch):
+    """Dos "réplicas" que apuntan a la misma base de datos de test"""
+    url = os.environ["DATABASE_URL"]
+    replica_set = replicas.ReplicaSet([url, url])
+    monkeypatch.setattr(replicas, "replica_set", replica_set)
+    yield replica_set
+    for replica in replica_set.replicas:
+        replica.engine.dispose()
+
+
+def _reads(replica_set):
+    return [replica.reads for replica in replica_set.replicas]
+
+
+def test_reads_round_robin_across_replicas(client, replica_set):
+    create_users(3)
+    for _ in range(4):
+        assert client.get("/users").status_code == 200
+    assert _reads(replica_set) == [2, 2]
+
+    status = client.get("/health/db").json()["replicas"]
+    assert [replica["name"] for replica in status] == ["replica-0", "replica-1"]
+
+
+def test_unhealthy_replicas_are_skipped(client, replica_set):
+    create_users(1)
+    replica_set.replicas[0].eject("connection refused")
+    for _ in range(2):
+        client.get("/users")
+    assert _reads(replica_set) == [0, 2]
+
+    # Sin réplicas sanas se lee del primario
+    replica_set.replicas[1].eject("connection refused")
+    assert client.get("/users").status_code == 200
+    assert _reads(replica_set) == [0, 2]
+
+
+def test_lag_guard(replica_set):
+    replica = replica_set.replicas[0]
+    replica.lag_query = text(f"SELECT {replicas.REPLICA_MAX_LAG_SECONDS + 1}")
+    replica.check()
+    assert not replica.healthy
+    assert "lag" in replica.error
+
+    replica.lag_query = text("SELECT 0")
+    replica.check()
+    assert replica.healthy
+    assert replica.lag == 0
+
+
+def test_writes_pin_reads_to_primary(client, replica_set):
+    response = client.post(
+        "/register",
+        json={"email": "a@example.com", "username": "a", "password": "pw"},
+    )
+    assert response.status_code == 200
+    assert replicas.PRIMARY_PIN_COOKIE in response.cookies
+
+    user = client.get(f"/users/{response.json()['id']}")
+    assert user.status_code == 200
+    assert _reads(replica_set) == [0, 0]
+
+
+def test_no_pin_cookie_without_replicas(client):
+    response = client.post(
+        "/register",
+        json={"email": "a@example.com", "username": "a", "password": "pw"},
+    )
+    assert replicas.PRIMARY_PIN_COOKIE not in response.cookies
@@ -0,0 +1,40 @@
+import pytest
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from fastapiusertemplate import crud, responses
+from fastapiusertemplate.database import SessionLocal
+
+from .conftest import create_users
+
+
+def test_user_payloads_match_response_model(client):
+    """La ruta rápida produce el mismo JSON que el response_model"""
+    create_users(3)
+    page = client.get("/users")
+    assert page.headers["content-type"] == "application/json"
+    items = page.json()["items"]
+    assert [set(item) for item in items] == [{"id", "email", "username"}] * 3
+    assert page.json()["next_cursor"] is None
+
+    user = client.get(f"/users/{items[0]['id']}")
+    assert user.headers["content-type"] == "application/json"
+    assert user.json() == items[0]
+
+
+def test_get_users_returns_column_rows():
+    create_users(2)
+    with SessionLocal() as db:
+        rows = crud.get_users(db)
+        assert len(rows) == 2
+        assert not hasattr(rows[0], "hashed_password")
+        assert len(db.identity_map) == 0
+
+
+def test_default_response_class(monkeypatch):
+    monkeypatch.setattr(responses, "JSON_RESPONSE", "json")
+    assert responses.default_response_class() is JSONResponse
+    monkeypatch.setattr(responses, "JSON_RESPONSE", "orjson")
+    assert responses.default_response_class() is ORJSONResponse
+    monkeypatch.setattr(responses, "JSON_RESPONSE", "msgpack")
+    with pytest.raises(ValueError):
+        responses.default_response_class()
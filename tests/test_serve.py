@@ -0,0 +1,49 @@
+import argparse
+
+from fastapi.testclient import TestClient
+
+from fastapiusertemplate import database, serve
+from fastapiusertemplate.main import app
+
+
+def _args(**overrides):
+    values = {"host": "127.0.0.1", "port": 8000, "workers": 4, "reload": False}
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+def test_server_options_use_fast_implementations_when_installed(monkeypatch):
+    monkeypatch.setattr(serve, "_installed", lambda module: True)
+    options = serve.server_options(_args())
+    assert options["workers"] == 4
+    assert options["reload"] is False
+    assert (options["loop"], options["http"]) == ("uvloop", "httptools")
+
+
+def test_server_options_fall_back_without_extras(monkeypatch):
+    monkeypatch.setattr(serve, "_installed", lambda module: False)
+    options = serve.server_options(_args())
+    assert (options["loop"], options["http"]) == ("asyncio", "h11")
+
+
+def test_reload_runs_a_single_worker():
+    assert serve.server_options(_args(reload=True))["workers"] == 1
+
+
+def test_hash_workers_split_across_processes(monkeypatch):
+    monkeypatch.delenv("PASSWORD_HASH_WORKERS", raising=False)
+    monkeypatch.setattr(serve.os, "cpu_count", lambda: 8)
+    serve.split_hash_workers(4)
+    assert serve.os.environ["PASSWORD_HASH_WORKERS"] == "2"
+
+
+def test_shutdown_disposes_connection_pool():
+    with TestClient(app):
+        assert database.get_engine().pool.checkedin() > 0
+    assert database.get_engine().pool.checkedin() == 0
+
+
+def test_worker_count_is_exported_to_workers(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    serve.export_worker_count(4)
+    assert serve.os.environ["WEB_CONCURRENCY"] == "4"
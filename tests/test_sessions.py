@@ -0,0 +1,108 @@
+import datetime
+import uuid
+
+from sqlalchemy import select, update
+
+from fastapiusertemplate import sessions
+from fastapiusertemplate.database import SessionLocal
+from fastapiusertemplate.models import RefreshSession
+
+from .conftest import register_and_login
+
+
+def _with_cookie(client, method, path, name, value):
+    client.cookies.clear()
+    return client.request(method, path, headers={"Cookie": f"{name}={value}"})
+
+
+def _tokens(client):
+    return client.cookies["access_token"], client.cookies["refresh_token"]
+
+
+def test_refresh_rotates_token(client):
+    register_and_login(client)
+    _, first = _tokens(client)
+
+    assert client.post("/refresh").status_code == 200
+    access, second = _tokens(client)
+    assert second != first
+    assert _with_cookie(client, "GET", "/me", "access_token", access).status_code == 200
+
+    # El token rotado sigue funcionando una vez
+    response = _with_cookie(client, "POST", "/refresh", "refresh_token", second)
+    assert response.status_code == 200
+    with SessionLocal() as db:
+        rows = db.scalars(select(RefreshSession)).all()
+    assert len(rows) == 3
+    assert len({row.family_id for row in rows}) == 1
+
+
+def test_reuse_revokes_the_session(client):
+    register_and_login(client)
+    _, stolen = _tokens(client)
+    client.post("/refresh")
+    access, current = _tokens(client)
+
+    response = _with_cookie(client, "POST", "/refresh", "refresh_token", stolen)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Refresh token reuse detected"
+
+    # La familia entera queda revocada: refresh y access tokens vigentes
+    response = _with_cookie(client, "POST", "/refresh", "refresh_token", current)
+    assert response.status_code == 401
+    assert _with_cookie(client, "GET", "/me", "access_token", access).status_code == 401
+
+
+def test_logout_revokes_tokens(client):
+    register_and_login(client)
+    access, refresh = _tokens(client)
+    assert client.post("/logout").status_code == 200
+
+    assert _with_cookie(client, "GET", "/me", "access_token", access).status_code == 401
+    response = _with_cookie(client, "POST", "/refresh", "refresh_token", refresh)
+    assert response.status_code == 401
+
+    # Otras sesiones del mismo usuario no se ven afectadas
+    register_and_login(client)
+    assert client.get("/me").status_code == 200
+
+
+def test_refresh_token_is_not_an_access_token(client):
+    register_and_login(client)
+    _, refresh = _tokens(client)
+    response = _with_cookie(client, "GET", "/me", "access_token", refresh)
+    assert response.status_code == 401
+
+
+def test_index_syncs_revocations_from_database(client):
+    """Revocaciones hechas por otro worker se aplican tras la recarga"""
+    register_and_login(client)
+    access, _ = _tokens(client)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    with SessionLocal() as db:
+        db.execute(update(RefreshSession).values(revoked_at=now))
+        db.commit()
+    assert client.get("/me").status_code == 200
+
+    sessions.sync_revoked()
+    assert _with_cookie(client, "GET", "/me", "access_token", access).status_code == 401
+
+
+def test_prune_expired_sessions(client):
+    register_and_login(client)
+    past = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=1)
+    with SessionLocal() as db:
+        user_id = db.scalar(select(RefreshSession.user_id))
+        db.add(
+            RefreshSession(
+                jti=uuid.uuid4(),
+                family_id=uuid.uuid4(),
+                user_id=user_id,
+                expires_at=past,
+            )
+        )
+        db.commit()
+
+    assert sessions.prune_expired() == 1
+    with SessionLocal() as db:
+        assert len(db.scalars(select(RefreshSession)).all()) == 1
@@ -0,0 +1,74 @@
+import uuid
+
+from fastapiusertemplate.cache import user_cache
+from fastapiusertemplate.query_stats import capture_queries
+
+from .conftest import create_users
+
+
+def _selected_columns(log):
+    (statement,) = [sql for sql in log.statements if sql.startswith("SELECT")]
+    return statement.split("FROM")[0]
+
+
+def test_users_fields_narrow_select_and_response(client):
+    create_users(3)
+    with capture_queries() as log:
+        page = client.get("/users", params={"fields": "username"})
+    assert page.status_code == 200
+    assert [set(item) for item in page.json()["items"]] == [{"id", "username"}] * 3
+    columns = _selected_columns(log)
+    assert "username" in columns
+    assert "email" not in columns and "hashed_password" not in columns
+
+
+def test_user_fields_without_cache_reads_only_requested_columns(client):
+    create_users(1)
+    user_id = client.get("/users").json()["items"][0]["id"]
+
+    with capture_queries() as log:
+        response = client.get(f"/users/{user_id}", params={"fields": "email"})
+    assert response.json() == {"id": user_id, "email": "user0@example.com"}
+    assert "username" not in _selected_columns(log)
+    assert user_cache.get(uuid.UUID(user_id)) is None
+
+    full = client.get(f"/users/{user_id}")
+    assert set(full.json()) == {"id", "email", "username"}
+    assert full.headers["ETag"] != response.headers["ETag"]
+
+    # Con el usuario en caché la proyección no consulta la BD
+    with capture_queries() as log:
+        cached = client.get(f"/users/{user_id}", params={"fields": "email"})
+    assert log.count == 0
+    assert cached.json() == response.json()
+    assert cached.headers["ETag"] == response.headers["ETag"]
+
+
+def test_fields_reject_unknown_and_private_columns(client):
+    create_users(1)
+    user_id = client.get("/users").json()["items"][0]["id"]
+    for fields in ("hashed_password", "id,password", "version"):
+        assert client.get("/users", params={"fields": fields}).status_code == 400
+        assert (
+            client.get(f"/users/{user_id}", params={"fields": fields}).status_code
+            == 400
+        )
+
+
+def test_all_fields_is_the_full_representation(client):
+    create_users(1)
+    full = client.get("/users")
+    explicit = client.get("/users", params={"fields": "username,email,id"})
+    assert explicit.json() == full.json()
+    assert explicit.headers["ETag"] == full.headers["ETag"]
+
+
+def test_empty_fields_are_rejected(client):
+    """``fields=`` vacío no devuelve una respuesta con solo ``id``"""
+    create_users(1)
+    user_id = client.get("/users").json()["items"][0]["id"]
+    for fields in ("", "  ", " , ,"):
+        for path in ("/users", f"/users/{user_id}"):
+            response = client.get(path, params={"fields": fields})
+            assert response.status_code == 400
+            assert response.json()["detail"] == "No fields requested"
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect
+
+from fastapiusertemplate import manage, startup
+from fastapiusertemplate.database import engine
+from fastapiusertemplate.main import app
+from fastapiusertemplate.models import Base
+
+
+def test_import_has_no_side_effects(tmp_path):
+    """Importar la aplicación no conecta, no crea tablas ni imprime la URL"""
+    db_path = tmp_path / "untouched.db"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}"}
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import fastapiusertemplate.main, fastapiusertemplate.database as d;"
+            "print(sorted(d._engines))",
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
+    assert "Database URL" not in result.stdout
+    assert not db_path.exists()
+
+
+def test_ready_after_startup(client):
+    response = client.get("/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["import_to_ready_seconds"] >= body["startup_seconds"] > 0
+
+
+def test_not_ready_while_starting_or_without_database(client, monkeypatch):
+    monkeypatch.setattr(startup.state, "ready", False)
+    assert client.get("/ready").status_code == 503
+
+    monkeypatch.setattr(startup.state, "ready", True)
+
+    async def unavailable():
+        return False
+
+    monkeypatch.setattr(startup, "database_available", unavailable)
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "unavailable"
+
+
+def test_create_schema_command():
+    Base.metadata.drop_all(bind=engine)
+    assert manage.main(["create-schema"]) == 0
+    assert {"users", "refresh_sessions"} <= set(inspect(engine).get_table_names())
+
+
+def test_schema_created_on_startup_when_enabled(monkeypatch):
+    Base.metadata.drop_all(bind=engine)
+    monkeypatch.setattr(startup, "DATABASE_CREATE_SCHEMA", True)
+    with TestClient(app):
+        assert "users" in inspect(engine).get_table_names()
@@ -0,0 +1,69 @@
+import uuid
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import select
+
+from fastapiusertemplate import schema
+from fastapiusertemplate.cache import user_cache
+from fastapiusertemplate.database import SessionLocal
+from fastapiusertemplate.models import User
+from fastapiusertemplate.query_stats import assert_max_queries
+
+from .conftest import create_users
+
+
+def _user_ids():
+    with SessionLocal() as db:
+        user_ids = db.scalars(select(User.id).order_by(User.username))
+        return [str(user_id) for user_id in user_ids]
+
+
+def test_batch_resolves_users_in_one_query(client):
+    create_users(5)
+    ids = _user_ids()
+    unknown = str(uuid.uuid4())
+
+    with assert_max_queries(1):
+        response = client.post("/users/batch", json={"ids": ids + [unknown, ids[0]]})
+    assert response.status_code == 200
+    body = response.json()
+    assert list(body["users"]) == ids
+    assert body["users"][ids[0]]["username"] == "user0"
+    assert "hashed_password" not in body["users"][ids[0]]
+    assert body["missing"] == [unknown]
+
+
+def test_batch_served_from_cache(client):
+    create_users(3)
+    ids = _user_ids()
+    client.post("/users/batch", json={"ids": ids})
+
+    hits = user_cache.hits
+    with assert_max_queries(0):
+        response = client.post("/users/batch", json={"ids": ids})
+    assert list(response.json()["users"]) == ids
+    assert user_cache.hits == hits + 3
+
+    # Solo los ids que faltan en caché van a la BD
+    user_cache.invalidate(uuid.UUID(ids[1]))
+    with assert_max_queries(1) as queries:
+        response = client.post("/users/batch", json={"ids": ids})
+    assert list(response.json()["users"]) == ids
+    assert queries.count == 1
+
+
+def test_batch_limits(client):
+    ids = [str(uuid.uuid4()) for _ in range(schema.MAX_BATCH_IDS + 1)]
+    response = client.post("/users/batch", json={"ids": ids})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "too_long"
+    assert client.post("/users/batch", json={"ids": []}).status_code == 422
+
+
+def test_batch_limit_is_checked_before_parsing_ids():
+    """Una lista demasiado larga se rechaza aunque sus ids no sean válidos"""
+    ids = ["not-a-uuid"] * (schema.MAX_BATCH_IDS + 1)
+    with pytest.raises(ValidationError) as exc_info:
+        schema.UserBatchRequest(ids=ids)
+    assert [error["type"] for error in exc_info.value.errors()] == ["too_long"]
@@ -0,0 +1,105 @@
+import datetime
+import uuid
+
+import jwt
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from fastapiusertemplate import auth, schema
+from fastapiusertemplate.cache import (
+    TTLLRUCache,
+    token_cache,
+    user_cache,
+    user_cache_ttl,
+)
+
+from .conftest import register_and_login
+
+
+def test_me_is_served_from_cache(client):
+    """Tras la primera petición, /me se sirve desde la caché de usuarios"""
+    register_and_login(client)
+
+    assert client.get("/me").status_code == 200
+    hits = user_cache.hits
+    assert client.get("/me").status_code == 200
+    assert user_cache.hits == hits + 1
+
+
+def test_get_current_user_is_served_from_cache(client):
+    """Las rutas con Depends(auth.get_current_user) también usan la caché"""
+    user = register_and_login(client)
+    test_app = FastAPI()
+
+    @test_app.get("/whoami")
+    async def whoami(current_user: schema.User = Depends(auth.get_current_user)):
+        return {"id": str(current_user.id)}
+
+    with TestClient(test_app, cookies=dict(client.cookies)) as other:
+        assert other.get("/whoami").json() == {"id": user["id"]}
+        hits = user_cache.hits
+        assert other.get("/whoami").json() == {"id": user["id"]}
+    assert user_cache.hits == hits + 1
+
+
+def test_delete_user_invalidates_cache(client):
+    """Eliminar un usuario invalida su entrada y /me deja de funcionar"""
+    user = register_and_login(client)
+    assert client.get("/me").status_code == 200
+
+    client.delete(f"/users/{user['id']}")
+
+    assert user_cache.get(user["id"]) is None
+    assert client.get("/me").status_code == 401
+
+
+def test_ttl_lru_cache_evicts_and_expires():
+    """La caché en memoria respeta el tamaño máximo y el TTL"""
+    cache = TTLLRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.evictions == 1
+
+    cache.set("d", 4, ttl=0)
+    assert cache.get("d") is None
+
+
+def test_verified_tokens_are_cached():
+    """Un token ya verificado se sirve desde la caché de tokens"""
+    user_id = uuid.uuid4()
+    token = auth.create_access_token({"sub": str(user_id)})
+
+    assert auth.verify_token(token) == user_id
+    hits = token_cache.hits
+    assert auth.verify_token(token) == user_id
+    assert token_cache.hits == hits + 1
+
+
+def test_invalid_and_expired_tokens_are_not_cached():
+    """Los tokens inválidos o caducados nunca entran en la caché"""
+    expired = jwt.encode(
+        {
+            "sub": str(uuid.uuid4()),
+            "exp": datetime.datetime.now(datetime.timezone.utc)
+            - datetime.timedelta(minutes=1),
+        },
+        auth.SECRET_KEY,
+        algorithm=auth.ALGORITHM,
+    )
+    assert auth.verify_token(expired) is None
+    assert auth.verify_token("not-a-token") is None
+    assert token_cache.get(expired) is None
+
+
+def test_user_cache_ttl_is_shorter_with_several_workers(monkeypatch):
+    monkeypatch.delenv("USER_CACHE_TTL_SECONDS", raising=False)
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert user_cache_ttl() == 60
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    assert user_cache_ttl() == 5
+    monkeypatch.setenv("USER_CACHE_TTL_SECONDS", "30")
+    assert user_cache_ttl() == 30